@@ -0,0 +1,179 @@
+"""
+End-to-end benchmarks of the ranking scripts against a local DBLP stand-in
+(see standin.py): each script runs in a process of its own, pointed at the
+stand-in through DBLP_BASE_URL, and is reported with the requests it made,
+its wall and CPU time and its peak RSS.
+
+    python benchmarks/bench.py                              # every target, no latency
+    python benchmarks/bench.py dsn-ranking --latency 0.05   # DBLP-like latency
+    python benchmarks/bench.py --error-rate 0.02 --json bench.json
+
+Benchmark runs start cold: each one gets a new temporary directory, which is
+the working directory of dsn-ranking (no snapshots, memo or cache of earlier
+runs) and where the ISCA scripts keep their response cache, journal and
+reports instead of /nobackup/iscaHOF.
+Unless --rate-limit is given, the scripts' DBLP rate limits are lifted, so the
+numbers measure the scripts rather than the limiter.
+"""
+import os
+import sys
+import json
+import builtins
+import time
+import runpy
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import standin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ISCA_DIR = '/nobackup/iscaHOF'
+# target -> script
+TARGETS = {
+    'dsn-ranking': 'dsn-ranking.py',
+    'isca': 'isca.py',
+    'isca-parallel': 'isca-parallel.py',
+}
+
+
+def run_child(target, workdir, rate_limit, parse_workers=0):
+    """Run `target` in this process (the child of a benchmark), in `workdir`."""
+    sys.path.insert(0, ROOT)
+    import dblp
+    import dblp.cache
+    import dblp.journal
+
+    configure = dblp.configure
+    if not rate_limit:
+        def unlimited(**kwargs):
+            kwargs.pop('rate', None)
+            return configure(**kwargs)
+        dblp.configure = unlimited
+
+    script = os.path.join(ROOT, TARGETS[target])
+    os.chdir(workdir)
+    if target == 'dsn-ranking':
+        spec = importlib.util.spec_from_file_location('dsn_ranking', script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.main()
+    else:
+        # the ISCA scripts open their cache, journal and reports in ISCA_DIR: use new ones in `workdir` instead
+        def redirect(path):
+            if isinstance(path, str) and path.startswith(ISCA_DIR + '/'):
+                return os.path.join(workdir, path[len(ISCA_DIR) + 1:])
+            return path
+
+        builtin_open = builtins.open
+        builtins.open = lambda file, *args, **kwargs: builtin_open(redirect(file), *args, **kwargs)
+        set_cache = dblp.set_cache
+        dblp.set_cache = lambda cache: set_cache(dblp.cache.SQLiteCache(
+            redirect(cache.path), ttl=cache.ttl, max_bytes=cache.max_bytes))
+
+        class Journal(dblp.journal.Journal):
+            def __init__(self, path, resume=False):
+                super(Journal, self).__init__(redirect(path), resume)
+
+        dblp.journal.Journal = Journal
+        sys.argv = [script]
+        if target == 'isca-parallel' and parse_workers:
+            sys.argv += ['--parse-workers', str(parse_workers)]
+        runpy.run_path(script, run_name='__main__')
+
+
+def server_stats(base_url, reset=False):
+    with urllib.request.urlopen(base_url + ('_reset' if reset else '_stats')) as resp:
+        return json.loads(resp.read().decode('utf-8'))
+
+
+def run(target, base_url, rate_limit=False, parse_workers=0):
+    """Run `target` against the stand-in at `base_url`.
+    Returns:
+        A dict of the measures of the run.
+    """
+    server_stats(base_url, reset=True)
+    workdir = tempfile.mkdtemp(prefix='bench-' + target + '-')
+    env = dict(os.environ, DBLP_BASE_URL=base_url)
+    command = [sys.executable, os.path.abspath(__file__), '--child', target, '--workdir', workdir]
+    if rate_limit:
+        command.append('--rate-limit')
+    if parse_workers:
+        command += ['--parse-workers', str(parse_workers)]
+
+    with open(os.path.join(workdir, 'output.log'), mode='wb') as log:
+        start = time.perf_counter()
+        child = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(child.pid, 0)
+        wall = time.perf_counter() - start
+
+    requests = server_stats(base_url)
+    errors = requests.pop('errors', 0)
+    return {
+        'target': target,
+        'status': os.waitstatus_to_exitcode(status),
+        'requests': sum(requests.values()),
+        'endpoints': requests,
+        'injected_errors': errors,
+        'wall': wall,
+        'cpu': usage.ru_utime + usage.ru_stime,
+        # kilobytes on Linux
+        'max_rss_mb': usage.ru_maxrss / 1024.0,
+        'log': os.path.join(workdir, 'output.log'),
+    }
+
+
+def format_results(results):
+    lines = ['{:<16}{:>8}{:>10}{:>8}{:>9}{:>9}{:>11}{:>10}'.format(
+        'target', 'status', 'requests', 'errors', 'wall s', 'cpu s', 'req/s', 'RSS MB')]
+    for r in results:
+        lines.append('{:<16}{:>8}{:>10}{:>8}{:>9.1f}{:>9.1f}{:>11.1f}{:>10.1f}'.format(
+            r['target'], r['status'], r['requests'], r['injected_errors'], r['wall'], r['cpu'],
+            r['requests'] / r['wall'] if r['wall'] else 0.0, r['max_rss_mb']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ranking scripts against a local DBLP stand-in.')
+    parser.add_argument('targets', nargs='*', metavar='target',
+                        help='scripts to run: {} (default: all)'.format(', '.join(sorted(TARGETS))))
+    parser.add_argument('--repeat', type=int, default=1, help='runs of each target')
+    parser.add_argument('--rate-limit', action='store_true', help="keep the scripts' DBLP rate limits")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='processes decoding the DBLP pages of isca-parallel (see its --parse-workers)')
+    parser.add_argument('--json', help='also write the results to this JSON file')
+    parser.add_argument('--child', choices=sorted(TARGETS), help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    standin.add_arguments(parser)
+    args = parser.parse_args()
+
+    for target in args.targets:
+        if target not in TARGETS:
+            parser.error('unknown target {}'.format(target))
+    if args.child:
+        run_child(args.child, args.workdir, args.rate_limit, args.parse_workers)
+        return
+
+    server = standin.serve(standin.from_arguments(args))
+    base_url = 'http://127.0.0.1:{}/'.format(server.server_address[1])
+    results = []
+    for target in args.targets or sorted(TARGETS):
+        for i in range(args.repeat):
+            print('Running {} ({}/{})'.format(target, i + 1, args.repeat))
+            results.append(run(target, base_url, args.rate_limit, args.parse_workers))
+            if results[-1]['status'] != 0:
+                print('{} failed, see {}'.format(target, results[-1]['log']))
+    server.shutdown()
+
+    print(format_results(results))
+    if args.json:
+        with open(args.json, mode='w', encoding='utf-8') as jsonFile:
+            json.dump({'settings': {k: v for k, v in vars(args).items() if k not in ('child', 'workdir', 'json')},
+                       'results': results}, jsonFile, indent=4)
+
+
+if __name__ == '__main__':
+    main()
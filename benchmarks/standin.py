@@ -0,0 +1,309 @@
+"""
+A local stand-in for the DBLP endpoints used by the dblp module, for
+benchmarks and for running the scripts without the live service:
+search/publ/api (JSON), search/author (XML), search/author/api (JSON),
+pers/xk, pers/xx and rec/{key}.xml.
+
+Answers are synthetic, generated deterministically from the request (the
+same query always gets the same answer, in every run), or replayed from a
+dblp.cache recorded against the real DBLP. Latency and errors (429 and 503
+with a Retry-After) can be injected.
+
+Run it on its own, then point the dblp module at it:
+
+    python benchmarks/standin.py --port 8800 --latency 0.02 --error-rate 0.01
+    DBLP_BASE_URL=http://127.0.0.1:8800/ python dsn-ranking.py
+
+GET /_stats returns the number of requests served per endpoint, and
+/_reset resets them.
+"""
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import datetime
+import threading
+from xml.sax.saxutils import escape, quoteattr
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIRST_NAMES = ['Alice', 'Bo', 'Carlos', 'Dana', 'Emeka', 'Fatima', 'Guo', 'Hiro', 'Ines', 'Jun', 'Karim', 'Lena',
+               'Mei', 'Nikhil', 'Olga', 'Pedro', 'Qing', 'Rosa', 'Saurabh', 'Tomas']
+LAST_NAMES = ['Adams', 'Bagchi', 'Chen', 'Dubois', 'Eze', 'Fischer', 'Garcia', 'Hill', 'Iyer', 'Jones', 'Kim',
+              'Lopez', 'Moreau', 'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Sato', 'Tanaka', 'Wang']
+# venues of the papers of a person page, besides the ones of the hall of fame
+OTHER_VENUES = ['MICRO', 'HPCA', 'ASPLOS', 'SOSP', 'EuroSys', 'SRDS', 'PRDC', 'EDCC']
+
+
+def seeded(*parts):
+    """Returns a random.Random seeded by `parts`, the same in every run."""
+    return random.Random(hashlib.sha1('\n'.join(str(p) for p in parts).encode('utf-8')).hexdigest())
+
+
+class World(object):
+    """
+    The synthetic DBLP: a pool of authors publishing in DSN/FTCS and ISCA
+    every year (a few prolific ones, many occasional ones), and a person page
+    for any name searched.
+
+    Attributes:
+    seed - changes every answer
+    authors - size of the pool of conference authors
+    papers - papers per venue-year
+    last_year - last year of the conferences
+    """
+    VENUES = {'dsn': ('DSN', 2000, None), 'ftcs': ('FTCS', 1988, 1999), 'isca': ('ISCA', 1973, None)}
+
+    def __init__(self, seed=0, authors=3000, papers=60, last_year=None):
+        self.seed = seed
+        self.authors = authors
+        self.papers = papers
+        self.last_year = last_year or datetime.datetime.now().year
+        # Zipf-like weights: author i writes about 1 / (i + 1) as many papers as author 0
+        self.weights = [1.0 / (i + 1) for i in range(authors)]
+
+    @staticmethod
+    def name(i):
+        return '{} {} {:04d}'.format(FIRST_NAMES[i % len(FIRST_NAMES)],
+                                     LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)], i)
+
+    @staticmethod
+    def pid(i):
+        return '{}/{}'.format(i % 100, i)
+
+    def urlpt(self, name, homonym=None):
+        digest = hashlib.sha1('{}\n{}'.format(self.seed, name).encode('utf-8')).hexdigest()[:8]
+        return 's/{}{}'.format(digest, '' if homonym is None else '-{}'.format(homonym))
+
+    def venue_hits(self, venue):
+        """Returns the `info` dicts of the publication search of a venue-year, e.g. conf/dsn/2019."""
+        parts = venue.split('/')
+        if len(parts) != 3 or parts[0] != 'conf' or parts[1] not in self.VENUES or not parts[2].isdigit():
+            return []
+        name, first, last = self.VENUES[parts[1]]
+        year = int(parts[2])
+        if year < first or year > (last or self.last_year):
+            return []
+
+        rng = seeded(self.seed, venue)
+        hits = []
+        for i in range(self.papers):
+            authors = sorted(set(rng.choices(range(self.authors), self.weights, k=rng.randint(1, 5))))
+            info = {
+                'key': 'conf/{}/P{:03d}-{}'.format(parts[1], i, year),
+                'title': 'Paper {} of {} {}.'.format(i, name, year),
+                'venue': name,
+                'year': str(year),
+                'type': 'Conference and Workshop Papers',
+                'pages': '{}-{}'.format(10 * i + 1, 10 * i + rng.randint(2, 14)) if rng.random() > 0.1 else str(i),
+                'authors': {'author': [{'@pid': self.pid(a), 'text': self.name(a)} for a in authors]},
+            }
+            if name == 'ISCA' and i == 0:
+                info['title'] = 'Proceedings of the {}th Annual International Symposium on Computer Architecture.'.format(
+                    year - 1973)
+            if name != 'ISCA' and rng.random() > 0.05:
+                track = name if rng.random() > 0.15 else name + '-W'
+                info['doi'] = '10.1109/{}.{}.{:05d}'.format(track, year, i)
+            if len(info['authors']['author']) == 1:
+                info['authors']['author'] = info['authors']['author'][0]
+            hits.append({'@score': '1', '@id': str(i), 'info': info})
+        return hits
+
+    def person(self, urlpt):
+        """Returns (name, publication keys, homonym urlpts) of a person page."""
+        rng = seeded(self.seed, urlpt)
+        name = 'Person ' + urlpt.split('/')[-1]
+        # some names are shared: the page of the name lists its homonyms
+        if '-' not in urlpt and rng.random() < 0.05:
+            return name, [], [urlpt + '-1', urlpt + '-2']
+        keys = []
+        for j in range(int(rng.paretovariate(1.2) * 3)):
+            venue = 'ISCA' if rng.random() < 0.4 else rng.choice(OTHER_VENUES)
+            year = rng.randint(1973, self.last_year)
+            keys.append('conf/{}/{}{}-{}'.format(venue.lower(), urlpt.replace('/', ''), j, year))
+        return name, keys, []
+
+    def record(self, key, author=None):
+        """Returns the XML record of a publication key."""
+        rng = seeded(self.seed, key)
+        parts = key.split('/')
+        venue = parts[1].upper() if len(parts) == 3 else 'CoRR'
+        year = int(key.rsplit('-', 1)[-1]) if key.rsplit('-', 1)[-1].isdigit() else 2000
+        title = 'Paper {}.'.format(key)
+        if venue == 'ISCA' and rng.random() < 0.03:
+            title = 'Proceedings of the {}th International Symposium on Computer Architecture.'.format(year - 1973)
+        pages = '{}-{}'.format(rng.randint(1, 500), rng.randint(501, 520)) if rng.random() > 0.1 else str(rng.randint(1, 500))
+        authors = ([author] if author else []) + [self.name(a) for a in rng.sample(range(self.authors), rng.randint(0, 3))]
+        return ('<inproceedings key={} mdate="2020-01-01">{}<title>{}</title><pages>{}</pages><year>{}</year>'
+                '<booktitle>{}</booktitle><ee>https://doi.org/10.1145/{}</ee><crossref>conf/{}/{}</crossref>'
+                '<url>db/conf/{}/{}{}.html</url></inproceedings>').format(
+            quoteattr(key), ''.join('<author>{}</author>'.format(escape(a)) for a in authors), escape(title),
+            pages, year, venue, escape(key), venue.lower(), year, venue.lower(), venue.lower(), year)
+
+
+class StandIn(object):
+    """
+    Answers DBLP requests from a World, or from a recorded dblp.cache.
+
+    Attributes:
+    world - the synthetic World
+    replay - a dblp.cache.ResponseCache recorded against `replay_base`, or None
+    latency - seconds added to every answer (plus up to `jitter` seconds)
+    error_rate - fraction of requests answered 429 or 503
+    retry_after - Retry-After of these answers, in seconds
+    counts - dict endpoint -> requests served
+    """
+    def __init__(self, world, replay=None, replay_base='http://dblp.uni-trier.de/', latency=0.0, jitter=0.0,
+                 error_rate=0.0, retry_after=1):
+        self.world = world
+        self.replay = replay
+        self.replay_base = replay_base
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.random = random.Random(world.seed)
+
+    def count(self, endpoint):
+        with self.lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def answer(self, path, query):
+        """Returns (status, headers, content type, body) for a request."""
+        params = dict((name, values[0]) for name, values in parse_qs(query).items())
+        if path == '/_stats':
+            with self.lock:
+                return 200, {}, 'application/json', json.dumps(self.counts)
+        if path == '/_reset':
+            with self.lock:
+                self.counts = {}
+            return 200, {}, 'application/json', '{}'
+
+        endpoint = path.strip('/').split('/')[0] if not path.startswith('/search/') else path.strip('/')
+        self.count(endpoint)
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.count('errors')
+            status = 429 if self.random.random() < 0.5 else 503
+            return status, {'Retry-After': str(self.retry_after)}, 'text/plain', 'Too Many Requests'
+
+        if self.replay is not None:
+            resp = self.replay.get(self.replay_base + path.lstrip('/'), params or None)
+            if resp is not None:
+                return resp.status_code, {}, 'text/xml', resp.content
+
+        world = self.world
+        if path == '/search/publ/api':
+            hits = world.venue_hits(params.get('q', ''))
+            first = int(params.get('f', 0))
+            page = hits[first:first + int(params.get('h', 30))]
+            result = {'@total': str(len(hits)), '@computed': str(len(hits)), '@sent': str(len(page)),
+                      '@first': str(first)}
+            if page:
+                result['hit'] = page
+            return 200, {}, 'application/json', json.dumps({'result': {'hits': result}})
+        if path == '/search/author':
+            name = params.get('xauthor', '')
+            return 200, {}, 'text/xml', '<authors><author urlpt={}>{}</author></authors>'.format(
+                quoteattr(world.urlpt(name)), escape(name))
+        if path == '/search/author/api':
+            name = params.get('q', '')
+            index = name.rsplit(' ', 1)[-1]
+            pid = world.pid(int(index)) if index.isdigit() else world.urlpt(name)
+            hit = {'info': {'author': name, 'url': 'https://dblp.org/pid/' + pid,
+                            'notes': {'note': {'@type': 'affiliation', 'text': 'University ' + pid}}}}
+            return 200, {}, 'application/json', json.dumps({'result': {'hits': {'@total': '1', 'hit': [hit]}}})
+        if path.startswith('/pers/xk/') or path.startswith('/pers/xx/'):
+            urlpt = unquote(path[len('/pers/xk/'):])
+            name, keys, homonyms = world.person(urlpt)
+            homonyms = ''.join('<homonym>{}</homonym>'.format(h) for h in homonyms)
+            if path.startswith('/pers/xk/'):
+                return 200, {}, 'text/xml', '<dblpperson name={} n="{}"><dblpkey type="person record">homepages/{}</dblpkey>{}{}</dblpperson>'.format(
+                    quoteattr(name), len(keys), urlpt, ''.join('<dblpkey>{}</dblpkey>'.format(k) for k in keys), homonyms)
+            return 200, {}, 'text/xml', ('<dblpperson name={} pid="{}" n="{}"><person key="homepages/{}" mdate="2020-01-01">'
+                                         '<author pid="{}">{}</author><note type="affiliation">University {}</note></person>{}{}'
+                                         '</dblpperson>').format(
+                quoteattr(name), urlpt, len(keys), urlpt, urlpt, escape(name), urlpt,
+                ''.join('<r>{}</r>'.format(world.record(k, name)) for k in keys), homonyms)
+        if path.startswith('/rec/') and path.endswith('.xml'):
+            return 200, {}, 'text/xml', '<dblp>{}</dblp>'.format(world.record(unquote(path[len('/rec/'):-len('.xml')])))
+        return 404, {}, 'text/plain', 'Not Found'
+
+
+def serve(standin, port=0):
+    """Serve `standin` on 127.0.0.1:`port` (0 for any free port) from a background thread.
+    Returns:
+        The server; its base URL is 'http://127.0.0.1:{}/'.format(server.server_address[1]).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body are written separately: without this, keep-alive clients wait for a delayed ACK each time
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, headers, content_type, body = standin.answer(url.path, url.query)
+            body = body if isinstance(body, bytes) else body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def open_replay(path):
+    """Open a recorded response cache: an SQLite file, or a dblp.cache.DirectoryCache directory."""
+    import dblp.cache
+    if path.endswith('.sqlite'):
+        return dblp.cache.SQLiteCache(path)
+    return dblp.cache.DirectoryCache(path)
+
+
+def add_arguments(parser):
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic answers')
+    parser.add_argument('--authors', type=int, default=3000, help='number of conference authors')
+    parser.add_argument('--papers', type=int, default=60, help='papers per venue-year')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every answer')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 429 or 503')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After of the 429/503 answers, in seconds')
+    parser.add_argument('--replay', help='answer from this recorded dblp.cache (.sqlite file or directory) when it '
+                                         'has the request, synthetic answers otherwise')
+
+
+def from_arguments(args):
+    return StandIn(World(args.seed, args.authors, args.papers),
+                   open_replay(args.replay) if args.replay else None,
+                   latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                   retry_after=args.retry_after)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve a local stand-in of the DBLP API.')
+    parser.add_argument('--port', type=int, default=8800)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = serve(from_arguments(args), args.port)
+    print('Serving DBLP stand-in on http://127.0.0.1:{}/'.format(server.server_address[1]))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
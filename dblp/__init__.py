@@ -1,9 +1,21 @@
+import os
+import sys
 import json
-import requests
+import time
+import weakref
+import threading
+import multiprocessing
+from io import BytesIO
 from lxml import etree
-from collections import namedtuple
-
-DBLP_BASE_URL = 'http://dblp.uni-trier.de/'
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .client import Client
+from .cache import CachedResponse
+from .retry import PARSE_ERRORS, ParseError, RetryError, check_status
+from . import stats
+
+# DBLP_BASE_URL in the environment points the module at a mirror or a local stand-in (see benchmarks/standin.py)
+DBLP_BASE_URL = os.environ.get('DBLP_BASE_URL', 'http://dblp.uni-trier.de/').rstrip('/') + '/'
 DBLP_AUTHOR_SEARCH_URL = DBLP_BASE_URL + 'search/author'
 DBLP_AUTHOR_SEARCH_URL2 = DBLP_BASE_URL + 'search/author/api'
 DBLP_PUBL_SEARCH_URL = DBLP_BASE_URL + 'search/publ/api'
@@ -13,17 +25,220 @@ DBLP_PERSON_URL2 = DBLP_BASE_URL + 'pers/xx/{urlpt}'
 # per DBLP staff, rec/conf/... instead of rec/bibtex/conf/... is the "new" format
 DBLP_PUBLICATION_URL = DBLP_BASE_URL + 'rec/{key}.xml'
 
+# keep the raw record of every loaded Publication in its `xml` attribute (off: they would stay in memory for the
+# whole crawl)
+KEEP_XML = False
+
+# queries of the parsers below, compiled once; they return plain strings, since lxml's "smart" strings keep the
+# whole tree of the page they came from alive
+PERSON_KEYS_XPATH = etree.XPath('/dblpperson/dblpkey[not(@type)]/text()', smart_strings=False)
+PERSON_HOMEPAGES_XPATH = etree.XPath('/dblpperson/dblpkey[@type="person record"]/text()', smart_strings=False)
+PERSON_HOMONYMS_XPATH = etree.XPath('/dblpperson/homonym/text()', smart_strings=False)
+PUBLICATION_XPATH = etree.XPath('/dblp/*[1]')
+AUTHOR_SEARCH_XPATH = etree.XPath('/authors/author/@urlpt', smart_strings=False)
+
+# every request below goes through this client (pooled session, rate limit, cache)
+_client = Client()
+
+def configure(**kwargs):
+    """Replace the shared client, e.g. configure(pool_size=8, rate=10). Takes the
+    arguments of dblp.client.Client; the current cache and retry policy are kept
+    unless new ones are given.
+
+    Returns:
+        The new client.
+    """
+    global _client
+    kwargs.setdefault('cache', _client.cache)
+    kwargs.setdefault('retry', _client.retry)
+    _client = Client(**kwargs)
+    return _client
+
+def get_client():
+    return _client
+
+def set_cache(cache):
+    """Route every DBLP request through `cache` (a dblp.cache.ResponseCache), or
+    disable caching if `cache` is None."""
+    _client.cache = cache
+
+def get_cache():
+    return _client.cache
+
+# pool decoding the person pages and records (see set_parse_pool), None to decode them in the calling thread
+_parse_pool = None
+
+def set_parse_pool(pool):
+    """Decode person pages and publication records in `pool` (a
+    concurrent.futures.ProcessPoolExecutor), or in the calling thread if `pool`
+    is None. Fetching stays in the calling threads: only the XML decoding, which
+    holds the GIL, moves to other processes, which send back plain tuples (see
+    decode_full_person). The objects themselves are built in this process."""
+    global _parse_pool
+    _parse_pool = pool
+
+def get_parse_pool():
+    return _parse_pool
+
+def start_parse_pool(workers=None):
+    """Start a pool of `workers` processes (default: one per core) and decode the
+    DBLP pages in it (see set_parse_pool). The processes are forked right away,
+    so call it before starting any thread.
+    Returns:
+        The pool; call set_parse_pool(None) and its shutdown() once done.
+    """
+    # fork: the workers inherit the imported modules, without running the script (__main__) again as spawn would
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    pool = ProcessPoolExecutor(workers, mp_context=context)
+    # the first task starts every worker
+    pool.submit(int).result()
+    set_parse_pool(pool)
+    return pool
+
+def pooled_decode(fn, content):
+    """Returns fn(content), in a worker of the parse pool. The syntax errors of
+    lxml cannot be pickled back to the caller: they are raised as plain
+    SyntaxErrors, which are retried the same way (see dblp.retry.PARSE_ERRORS)."""
+    try:
+        return fn(content)
+    except etree.XMLSyntaxError as e:
+        raise SyntaxError(str(e)) from None
+
+def decode(fn, content):
+    """Returns fn(content), computed in the parse pool if there is one."""
+    if _parse_pool is None:
+        return fn(content)
+    return _parse_pool.submit(pooled_decode, fn, content).result()
+
+def _get(url, params=None):
+    return _client.get(url, params)
+
+def _fetch(url, params, parse, what, endpoint, loader):
+    """Fetch `url` and parse the answer, with the retry policy of the shared
+    client (see dblp.retry): throttling, server errors, connection errors and
+    fresh answers that cannot be parsed are retried with backoff. The call is
+    reported to the hooks of dblp.stats, as an `endpoint` call made by
+    `loader` (the public function or method that needed the data).
+    Returns:
+        The value returned by `parse(resp)`.
+    Raises:
+        RetryError, if every attempt failed or DBLP answered e.g. 404. Other
+        errors of `parse` (e.g. a cached answer that cannot be parsed, a
+        missing field) are raised at once, without retrying.
+    """
+    timing = {'attempts': 0, 'cached': False, 'bytes': 0, 'fetch': 0.0, 'parse': 0.0}
+
+    def attempt():
+        timing['attempts'] += 1
+        start = time.monotonic()
+        try:
+            resp = _get(url, params)
+        finally:
+            parsing = time.monotonic()
+            timing['fetch'] += parsing - start
+        timing['cached'] = isinstance(resp, CachedResponse)
+        try:
+            check_status(resp.status_code, getattr(resp, 'headers', None), what)
+            result = parse(resp)
+        except PARSE_ERRORS as e:
+            # never parse that answer again; a cached one fails the same way every time, a fresh one is retried
+            if _client.cache is not None:
+                _client.cache.delete(url, params)
+            if timing['cached']:
+                raise
+            raise ParseError(what, e)
+        finally:
+            timing['parse'] += time.monotonic() - parsing
+        timing['bytes'] = len(resp.content)
+        return result
+
+    start = time.monotonic()
+    error = None
+    try:
+        return _client.retry.call(attempt, what)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        # whatever was not spent fetching or parsing was spent backing off (or waiting for the circuit breaker)
+        retry = max(time.monotonic() - start - timing['fetch'] - timing['parse'], 0.0)
+        stats.emit(stats.Event(endpoint, loader, what, timing['attempts'], timing['cached'],
+                               timing['bytes'] if error is None else 0, timing['fetch'], timing['parse'], retry,
+                               error))
+
+# fields of the DBLP objects: their data is a tuple of these fields, in this order
+AUTHOR_FIELDS = ('name', 'publications', 'homepages', 'homonyms')
+PUBLICATION_FIELDS = ('type', 'sub_type', 'mdate', 'authors', 'editors', 'title', 'year', 'month', 'journal', 'volume',
+                      'number', 'chapter', 'pages', 'ee', 'isbn', 'url', 'booktitle', 'crossref', 'publisher',
+                      'school', 'citations', 'series')
+AuthorData = namedtuple('AuthorData', AUTHOR_FIELDS)
+PublicationData = namedtuple('PublicationData', PUBLICATION_FIELDS)
+
+# fields of a Publication with few distinct values, interned: e.g. every ISCA paper shares one 'ISCA' string
+INTERNED_FIELDS = ('type', 'sub_type', 'mdate', 'journal', 'booktitle', 'publisher', 'school')
+INTERNED_INDEXES = tuple(PUBLICATION_FIELDS.index(field) for field in INTERNED_FIELDS)
+
+class LazyField(object):
+    """A lazily loaded attribute of a LazyAPIData: the value at `index` in its
+    data, which is loaded by the first access."""
+    __slots__ = ('name', 'index')
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        data = obj.data
+        if data is None:
+            data = obj.load()
+        return data[self.index]
+
 class LazyAPIData(object):
-    def __init__(self, lazy_attrs):
-        self.lazy_attrs = set(lazy_attrs)
-        self.data = None
+    """
+    Base class of lazily loaded DBLP objects. Loading is thread-safe: the first
+    access to a lazy attribute loads the data, and threads accessing the same
+    object at the same time wait for that load instead of issuing their own.
+    Threads working on other objects are not blocked. If the load fails, the
+    access raises dblp.retry.RetryError and the object stays unloaded, so a
+    later access tries again.
+
+    Subclasses list their lazy attributes in FIELDS: their data is a tuple of
+    the values of these fields, in that order, and each field is a LazyField of
+    the class. Objects are slotted, and their lock only exists while they are
+    loaded through an attribute: hundreds of thousands of them fit in memory.
+    """
+    __slots__ = ('data', 'lock')
+    FIELDS = ()
+    # guards the creation of the per-object locks
+    locks_lock = threading.Lock()
 
-    def __getattr__(self, key):
-        if key in self.lazy_attrs:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for index, name in enumerate(cls.FIELDS):
+            setattr(cls, name, LazyField(name, index))
+
+    def __init__(self):
+        self.data = None
+        self.lock = None
+
+    def load(self):
+        """Load the data, once even if several threads ask for it at the same time.
+        Returns:
+            The data.
+        """
+        with LazyAPIData.locks_lock:
+            if self.lock is None:
+                self.lock = threading.Lock()
+            lock = self.lock
+        with lock:
+            # another thread may have loaded the data while we waited
             if self.data is None:
                 self.load_data()
-            return self.data[key]
-        raise AttributeError(key)
+                # later accesses see the data: the lock is only needed by the threads already waiting for it
+                self.lock = None
+        return self.data
 
     def load_data(self):
         pass
@@ -38,42 +253,98 @@ class Author(LazyAPIData):
     publications - a list of lazy-loaded Publications results by this author
     homepages - a list of author homepage URLs
     homonyms - a list of author aliases
+
+    If `full` is set, the full person record (DBLP_PERSON_URL2) is fetched
+    instead of the list of keys, and the data of every publication is taken
+    from it: one request for the author and all of its publications.
     """
-    def __init__(self, urlpt):
+    __slots__ = ('urlpt', 'full', 'xml')
+    FIELDS = AUTHOR_FIELDS
+
+    def __init__(self, urlpt, full=False):
         self.urlpt = urlpt
+        self.full = full
         self.xml = None
-        super(Author, self).__init__(['name','publications','homepages',
-                                      'homonyms'])
+        super(Author, self).__init__()
 
     def load_data(self):
-        timeoutCount = 0
-        passFail = 0
-        while (passFail == 0):
-            try:
-                resp = requests.get(DBLP_PERSON_URL.format(urlpt=self.urlpt))
-                # TODO error handling
-                xml = resp.content
-                root = etree.fromstring(xml)
-                data = {
-                    'name':root.attrib['name'],
-                    'publications':[Publication(k) for k in
-                                    root.xpath('/dblpperson/dblpkey[not(@type)]/text()')],
-                    'homepages':root.xpath(
-                        '/dblpperson/dblpkey[@type="person record"]/text()'),
-                    'homonyms':root.xpath('/dblpperson/homonym/text()')
-                }
-
-                self.data = data
-
-                passFail = 1
-            # if connection times out or string is empty, try again until it works or failed 5 times
-            except:
-                if (timeoutCount < 5):
-                    passFail = 0
-                    timeoutCount = timeoutCount + 1
-                else:
-                    print("ERROR: failed to connect to DBLP 5+ times for"+str(self.urlpt)+", skipping")
-                    passFail = 1
+        self.data = probe_person(self.urlpt, self.full, 'Author.load_data')
+
+def decode_person(xml):
+    """Decode a person page (DBLP_PERSON_URL) into plain values.
+    Returns:
+        (name, publication keys, homepages, homonyms)
+    """
+    root = etree.fromstring(xml)
+    return root.attrib['name'], PERSON_KEYS_XPATH(root), PERSON_HOMEPAGES_XPATH(root), PERSON_HOMONYMS_XPATH(root)
+
+def person_data(decoded):
+    """Returns the data of an Author from its decoded person page (see decode_person)."""
+    name, keys, homepages, homonyms = decoded
+    return AuthorData(name, [Publication(k) for k in keys], homepages, homonyms)
+
+def parse_person(xml):
+    """Parse a person page (DBLP_PERSON_URL) into the data of an Author."""
+    return person_data(decode_person(xml))
+
+def decode_full_person(xml):
+    """Decode a full person record (DBLP_PERSON_URL2) into plain values.
+    The page is parsed incrementally: each record is dropped from the tree once
+    its fields are extracted, so prolific authors do not build their whole tree.
+    Returns:
+        (name, records, homepages, homonyms, skipped), records being a list of
+        (key, fields) pairs, with fields as returned by publication_fields. A
+        record that cannot be decoded (see RecordError) is left out rather than
+        failing the whole page: `skipped` lists the (key, error message) pairs
+        of these, which full_person_data reports (this may run in a worker of
+        the parse pool, whose events would not reach the hooks).
+    """
+    records = []
+    skipped = []
+    homepages = []
+    homonyms = []
+    context = etree.iterparse(BytesIO(xml), events=('end',), tag=('r', 'person', 'homonym'))
+    for _, elem in context:
+        # only the children of <dblpperson> (records have no such elements, but stay on the safe side)
+        if elem.getparent().getparent() is not None:
+            continue
+        if elem.tag == 'r':
+            for record in elem.iterchildren(tag=etree.Element):
+                try:
+                    records.append((record.attrib['key'], publication_fields(record)))
+                except RecordError as e:
+                    skipped.append((record.attrib.get('key'), str(e)))
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif elem.tag == 'person':
+            if 'key' in elem.attrib:
+                homepages.append(elem.attrib['key'])
+        else:
+            homonyms.extend(element_texts(elem))
+    return context.root.attrib['name'], records, homepages, homonyms, skipped
+
+def full_person_data(decoded, loader='full_person_data'):
+    """Returns the data of an Author from its decoded full person record (see
+    decode_full_person), with the data of its publications already loaded.
+    The records left out of the page are reported to dblp.stats (see
+    dblp.stats.skipped), as skipped by `loader`."""
+    name, records, homepages, homonyms, skipped = decoded
+    for key, error in skipped:
+        print("ERROR: " + error + ", skipping")
+        stats.skipped(stats.PERSON, loader, key, error)
+    publications = []
+    for key, fields in records:
+        publication = Publication(key)
+        if publication.data is None:
+            publication.data = build_publication_data(fields)
+        publications.append(publication)
+    return AuthorData(name, publications, homepages, homonyms)
+
+def parse_full_person(xml):
+    """Parse a full person record (DBLP_PERSON_URL2) into the data of an Author,
+    with the data of its publications already loaded."""
+    return full_person_data(decode_full_person(xml))
 
 def first_or_none(seq):
     try:
@@ -85,6 +356,66 @@ Publisher = namedtuple('Publisher', ['name', 'href'])
 Series = namedtuple('Series', ['text','href'])
 Citation = namedtuple('Citation', ['reference','label'])
 
+class PublicationRegistry(object):
+    """
+    Process-wide interning of Publication objects by DBLP key, so a paper shared
+    by several authors is fetched and parsed once. A Publication stays
+    registered as long as something (e.g. an Author) references it, so there is
+    never more than one object per key. On top of that, the max_size most
+    recently used ones are kept even when nothing else references them, with
+    their data.
+
+    Attributes:
+    max_size - number of recently used publications kept
+    hits - lookups that returned an existing Publication
+    misses - lookups that created a new Publication
+    evictions - publications no longer kept for being recently used (they stay
+    registered while they are referenced)
+    """
+    def __init__(self, max_size=200000):
+        self.max_size = max_size
+        self.entries = weakref.WeakValueDictionary()
+        self.recent = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, create):
+        """Returns the Publication registered for `key`, registering `create(key)`
+        if there is none."""
+        with self.lock:
+            publication = self.entries.get(key)
+            if publication is not None:
+                self.hits += 1
+            else:
+                publication = self.entries[key] = create(key)
+                self.misses += 1
+            self.recent[key] = publication
+            self.recent.move_to_end(key)
+            while len(self.recent) > self.max_size:
+                self.recent.popitem(last=False)
+                self.evictions += 1
+            return publication
+
+    def clear(self):
+        with self.lock:
+            self.recent.clear()
+            self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'recent': len(self.recent),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0
+        }
+
+publication_registry = PublicationRegistry()
+
 class Publication(LazyAPIData):
     """
     Represents a DBLP publication- eg, article, inproceedings, etc. All data but
@@ -111,153 +442,147 @@ class Publication(LazyAPIData):
     citations - a list of (text, label) named tuples representing cited works
     series - a (text, href) named tuple describing the containing series, if
     applicable
-    """
-    def __init__(self, key):
-        self.key = key
-        self.xml = None
-        super(Publication, self).__init__( ['type', 'sub_type', 'mdate',
-                'authors', 'editors', 'title', 'year', 'month', 'journal',
-                'volume', 'number', 'chapter', 'pages', 'ee', 'isbn', 'url',
-                'booktitle', 'crossref', 'publisher', 'school', 'citations',
-                'series'])
-
-    def load_data(self):
-        timeoutCount2 = 0
-        passFail2 = 0
-        while (passFail2 == 0):
-            try:
-                resp = requests.get(DBLP_PUBLICATION_URL.format(key=self.key))
-
-                xml = resp.content
-                self.xml = xml
-                root = etree.fromstring(xml)
-                publication = first_or_none(root.xpath('/dblp/*[1]'))
-                if publication is None:
-                    raise ValueError
-                data = {
-                    'type':publication.tag,
-                    'sub_type':publication.attrib.get('publtype', None),
-                    'mdate':publication.attrib.get('mdate', None),
-                    'authors':publication.xpath('author/text()'),
-                    'editors':publication.xpath('editor/text()'),
-                    'title':first_or_none(publication.xpath('title/text()')),
-                    'year':int(first_or_none(publication.xpath('year/text()'))),
-                    'month':first_or_none(publication.xpath('month/text()')),
-                    'journal':first_or_none(publication.xpath('journal/text()')),
-                    'volume':first_or_none(publication.xpath('volume/text()')),
-                    'number':first_or_none(publication.xpath('number/text()')),
-                    'chapter':first_or_none(publication.xpath('chapter/text()')),
-                    'pages':first_or_none(publication.xpath('pages/text()')),
-                    'ee':first_or_none(publication.xpath('ee/text()')),
-                    'isbn':first_or_none(publication.xpath('isbn/text()')),
-                    'url':first_or_none(publication.xpath('url/text()')),
-                    'booktitle':first_or_none(publication.xpath('booktitle/text()')),
-                    'crossref':first_or_none(publication.xpath('crossref/text()')),
-                    'publisher':first_or_none(publication.xpath('publisher/text()')),
-                    'school':first_or_none(publication.xpath('school/text()')),
-                    'citations':[Citation(c.text, c.attrib.get('label',None))
-                                 for c in publication.xpath('cite') if c.text != '...'],
-                    'series':first_or_none(Series(s.text, s.attrib.get('href', None))
-                                           for s in publication.xpath('series'))
-                }
-
-                self.data = data
-
-                passFail2 = 1
-            # if connection times out or string is empty, try again until it works or failed 5 times
-            except:
-                if (timeoutCount2 < 5):
-                    passFail2 = 0
-                    timeoutCount2 = timeoutCount2 + 1
-                else:
-                    print("ERROR: failed to connect to DBLP 5+ times for"+str(self.key)+", skipping")
-                    passFail2 = 1
-
-def search_pub(pub_str):
-    timeOutCount3 = 0
-    passFail3 = 0
-    while (passFail3 == 0):
-        try:
-            resp = requests.get(DBLP_PUBL_SEARCH_URL, params={'q':pub_str, 'format': 'json', 'h': 1000})
-            passFail3 = 1
-        # if connection times out, try again until it works or failed 5 times
-        except:
-            if (timeoutCount3 < 5):
-                passFail3 = 0
-                timeoutCount3 = timeoutCount3 + 1
-            else:
-                print("ERROR: failed to connect to DBLP 5+ times for"+str(pub_str)+", skipping")
-                passFail3 = 1
-
-    return resp.text
+    xml - the raw record, if it was fetched on its own while KEEP_XML was set;
+    None otherwise
 
-def search(author_str):
-    timeoutCount3 = 0
-    passFail3 = 0
-    while (passFail3 == 0):
-        try:
-            resp = requests.get(DBLP_AUTHOR_SEARCH_URL, params={'xauthor':author_str})
-            passFail3 = 1
-        # if connection times out, try again until it works or failed 5 times
-        except:
-            if (timeoutCount3 < 5):
-                passFail3 = 0
-                timeoutCount3 = timeoutCount3 + 1
-            else:
-                print("ERROR: failed to connect to DBLP 5+ times for"+str(author_str)+", skipping")
-                passFail3 = 1
+    Publications are interned by key (see PublicationRegistry): Publication(key)
+    returns the same object, and its data is loaded once, for every author.
+    """
+    # __weakref__: the registry only holds weak references to most publications
+    __slots__ = ('key', 'xml', '__weakref__')
+    FIELDS = PUBLICATION_FIELDS
 
-    #TODO: Does this need to be a nested try-catch above with the resp?
-    #TODO: error handling
-    root = etree.fromstring(resp.content)
-    arr_of_authors = []
-    for urlpt in root.xpath('/authors/author/@urlpt'):
-        timeoutCount4 = 0
-        passFail4 = 0
-        while (passFail4 == 0):
-            try:
-                resp1 = requests.get(DBLP_PERSON_URL.format(urlpt=urlpt))
-
-                xml = resp1.content
-                root1 = etree.fromstring(xml)
-                if root1.xpath('/dblpperson/homonym/text()'):
-                    for hom_urlpt in root1.xpath('/dblpperson/homonym/text()'):
-                        arr_of_authors.append(Author(hom_urlpt))
-                else:
-                    arr_of_authors.append(Author(urlpt))
-
-                passFail4 = 1
-
-            # if connection times out or string is empty, try again until it works or failed 5 times
-            except:
-                if (timeoutCount4 < 5):
-                    passFail4 = 0
-                    timeoutCount4 = timeoutCount4 + 1
-                else:
-                    print("ERROR: failed to connect to DBLP 5+ times for"+str(urlpt)+", skipping")
-                    passFail4 = 1
+    def __new__(cls, key):
+        # Publication(key) returns the instance already registered for key, if any
+        return publication_registry.get(key, cls._create)
 
-    return arr_of_authors
+    @classmethod
+    def _create(cls, key):
+        self = super(Publication, cls).__new__(cls)
+        self.key = key
+        self.xml = None
+        LazyAPIData.__init__(self)
+        return self
 
-def get_affiliation(pid, author_str):
-    timeoutCount3 = 0
-    passFail3 = 0
-    # find all alias for the author
-    while (passFail3 == 0):
-        try:
-            resp = requests.get(DBLP_AUTHOR_SEARCH_URL2, params={'q': author_str, 'format': 'json', 'h': 1000})
-            passFail3 = 1
-        # if connection times out, try again until it works or failed 5 times
-        except:
-            if (timeoutCount3 < 5):
-                passFail3 = 0
-                timeoutCount3 = timeoutCount3 + 1
-            else:
-                print("ERROR: failed to connect to DBLP 5+ times for" + str(author_str) + ", skipping")
-                passFail3 = 1
+    def __init__(self, key):
+        # initialized once, by _create, when the key is first registered
+        pass
 
+    def load_data(self):
+        def parse(resp):
+            data = build_publication_data(decode(decode_publication, resp.content))
+            if KEEP_XML:
+                self.xml = resp.content
+            return data
+        self.data = _fetch(DBLP_PUBLICATION_URL.format(key=self.key), None, parse, self.key, stats.RECORD,
+                           'Publication.load_data')
+
+def decode_publication(xml):
+    """Decode a publication record (DBLP_PUBLICATION_URL) into the fields of a
+    Publication, as returned by publication_fields (which may raise
+    RecordError)."""
+    root = etree.fromstring(xml)
+    publication = first_or_none(PUBLICATION_XPATH(root))
+    if publication is None:
+        raise ValueError
+    return publication_fields(publication)
+
+def parse_publication(xml):
+    """Parse a publication record (DBLP_PUBLICATION_URL) into the data of a
+    Publication."""
+    return build_publication_data(decode_publication(xml))
+
+def element_texts(element):
+    """Returns the text nodes directly under `element`, as xpath('text()') does."""
+    texts = [] if element.text is None else [element.text]
+    for child in element:
+        if child.tail is not None:
+            texts.append(child.tail)
+    return texts
+
+# fields of a Publication taken from the first text of a child of its record, e.g. <title>
+PUBLICATION_TEXT_FIELDS = ('title', 'year', 'month', 'journal', 'volume', 'number', 'chapter', 'pages', 'ee', 'isbn',
+                           'url', 'booktitle', 'crossref', 'publisher', 'school')
+
+class RecordError(Exception):
+    """A DBLP record lacking what a Publication needs, e.g. a year. Retrying
+    does not help: the record is the same every time."""
+    pass
+
+def publication_fields(publication):
+    """Extract the fields of a Publication from its record element (article,
+    inproceedings, ...), in a single pass over the children of the record.
+    Returns:
+        A tuple of plain values, in the order of PUBLICATION_FIELDS.
+    Raises:
+        RecordError, if the record has no year, or one that is not a number.
+    """
+    fields = dict.fromkeys(PUBLICATION_TEXT_FIELDS)
+    authors = []
+    editors = []
+    citations = []
+    series = None
+    for child in publication.iterchildren(tag=etree.Element):
+        tag = child.tag
+        if tag == 'author':
+            authors.extend(element_texts(child))
+        elif tag == 'editor':
+            editors.extend(element_texts(child))
+        elif tag == 'cite':
+            if child.text != '...':
+                citations.append(Citation(child.text, child.attrib.get('label', None)))
+        elif tag == 'series':
+            if series is None:
+                series = Series(child.text, child.attrib.get('href', None))
+        # the first text of the first element that has one, as first_or_none(xpath('title/text()')) would give
+        elif tag in fields and fields[tag] is None:
+            fields[tag] = first_or_none(element_texts(child))
+    try:
+        year = int(fields['year'])
+    except (TypeError, ValueError):
+        raise RecordError('record {} has no valid year ({!r})'.format(publication.attrib.get('key'), fields['year']))
+    return (publication.tag, publication.attrib.get('publtype', None), publication.attrib.get('mdate', None),
+            authors, editors, fields['title'], year, fields['month'], fields['journal'],
+            fields['volume'], fields['number'], fields['chapter'], fields['pages'], fields['ee'], fields['isbn'],
+            fields['url'], fields['booktitle'], fields['crossref'], fields['publisher'], fields['school'],
+            citations, series)
+
+def build_publication_data(fields):
+    """Returns the data of a Publication (a PublicationData) from its fields,
+    as returned by publication_fields, with the INTERNED_FIELDS interned."""
+    fields = list(fields)
+    for i in INTERNED_INDEXES:
+        if fields[i] is not None:
+            fields[i] = sys.intern(fields[i])
+    return PublicationData._make(fields)
+
+def publication_data(publication):
+    """Extract the data of a Publication from its record element."""
+    return build_publication_data(publication_fields(publication))
+
+def parse_author_search(xml):
+    """Returns the urlpts matched by an author search (DBLP_AUTHOR_SEARCH_URL)."""
+    root = etree.fromstring(xml)
+    return AUTHOR_SEARCH_XPATH(root)
+
+def probe_person(urlpt, full=False, loader='probe_person'):
+    """Fetch and parse the person page of `urlpt`, as Author.load_data does;
+    `loader` is reported to dblp.stats as the function that needed it.
+    Returns:
+        The data of the Author.
+    """
+    if full:
+        return _fetch(DBLP_PERSON_URL2.format(urlpt=urlpt), None,
+                      lambda resp: full_person_data(decode(decode_full_person, resp.content), loader), urlpt,
+                      stats.PERSON, loader)
+    return _fetch(DBLP_PERSON_URL.format(urlpt=urlpt), None,
+                  lambda resp: person_data(decode(decode_person, resp.content)), urlpt, stats.PERSON, loader)
+
+def parse_affiliation(doc, pid):
+    """Returns the affiliation of the author `pid` from the JSON answer of an
+    author search (DBLP_AUTHOR_SEARCH_URL2), or "" if there is none."""
     affiliation = None
-    hits = json.loads(resp.text)["result"]["hits"]
+    hits = json.loads(doc)["result"]["hits"]
     for hit in hits["hit"]:
         if "info" in hit:
             if "author" in hit["info"]:
@@ -292,52 +617,103 @@ def get_affiliation(pid, author_str):
 
     return "" if affiliation is None else affiliation
 
+def search_pub(pub_str):
+    """Returns the JSON text of the publication search for `pub_str`. Only the first
+    1000 hits are returned; use search_pub_iter to get all of them."""
+    return _fetch(DBLP_PUBL_SEARCH_URL, {'q':pub_str, 'format': 'json', 'h': 1000},
+                  lambda resp: resp.text, pub_str, stats.PUBL_SEARCH, 'search_pub')
+
+def search_pub_page(pub_str, first=0, size=1000):
+    """Fetch one page of the publication search for `pub_str`.
+    Args:
+        pub_str: the query, e.g. a venue-year such as "conf/dsn/2019".
+        first: offset of the first hit of the page.
+        size: number of hits per page (the API returns at most 1000).
+
+    Returns:
+        The `hits` object of the answer; its "@total" is the number of hits of
+        the whole search.
+
+    Raises:
+        RetryError, if DBLP cannot be reached: the page is not replaced by an
+        empty one, which would make the venue-year look complete.
+    """
+    return _fetch(DBLP_PUBL_SEARCH_URL, {'q':pub_str, 'format': 'json', 'h': size, 'f': first},
+                  lambda resp: json.loads(resp.text)["result"]["hits"], pub_str, stats.PUBL_SEARCH,
+                  'search_pub_page')
+
+def search_pub_iter(pub_str, page_size=1000, workers=4):
+    """Search publications, paging through all the hits instead of stopping at the
+    first 1000 as search_pub does. Pages after the first are fetched
+    concurrently, by `workers` threads.
+
+    Returns:
+        A generator of the `info` dict of every hit, in the order of the API.
+
+    Raises:
+        RetryError, if a page cannot be fetched (see search_pub_page).
+    """
+    hits = search_pub_page(pub_str, 0, page_size)
+    total = int(hits.get('@total', 0))
+    for hit in hits.get('hit', []):
+        yield hit['info']
+
+    if total > page_size:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = executor.map(lambda first: search_pub_page(pub_str, first, page_size),
+                                 range(page_size, total, page_size))
+            for hits in pages:
+                for hit in hits.get('hit', []):
+                    yield hit['info']
+
+def search(author_str, full=False):
+    """Search DBLP for authors named `author_str`. Every homonym is returned as
+    a separate Author; `full` is passed on to them (see Author)."""
+    urlpts = _fetch(DBLP_AUTHOR_SEARCH_URL, {'xauthor':author_str},
+                    lambda resp: parse_author_search(resp.content), author_str, stats.AUTHOR_SEARCH, 'search')
+
+    arr_of_authors = []
+    for urlpt in urlpts:
+        # the person page tells us about homonyms, and is also the data of the author itself
+        data = probe_person(urlpt, full, 'search')
+        if data.homonyms:
+            for hom_urlpt in data.homonyms:
+                arr_of_authors.append(Author(hom_urlpt, full))
+        else:
+            author = Author(urlpt, full)
+            author.data = data
+            arr_of_authors.append(author)
+
+    return arr_of_authors
+
+def get_affiliation(pid, author_str):
+    # find all alias for the author
+    return _fetch(DBLP_AUTHOR_SEARCH_URL2, {'q': author_str, 'format': 'json', 'h': 1000},
+                  lambda resp: parse_affiliation(resp.text, pid), author_str, stats.AUTHOR_SEARCH,
+                  'get_affiliation')
+
 def __get_affiliation(pid, author_str):
-    timeoutCount3 = 0
-    passFail3 = 0
-    while (passFail3 == 0):
-        try:
-            resp = requests.get(DBLP_AUTHOR_SEARCH_URL, params={'xauthor':author_str})
-            passFail3 = 1
-        # if connection times out, try again until it works or failed 5 times
-        except:
-            if (timeoutCount3 < 5):
-                passFail3 = 0
-                timeoutCount3 = timeoutCount3 + 1
-            else:
-                print("ERROR: failed to connect to DBLP 5+ times for"+str(author_str)+", skipping")
-                passFail3 = 1
+    urlpts = _fetch(DBLP_AUTHOR_SEARCH_URL, {'xauthor':author_str},
+                    lambda resp: parse_author_search(resp.content), author_str, stats.AUTHOR_SEARCH,
+                    '__get_affiliation')
 
     affiliation = None
-    root = etree.fromstring(resp.content)
-    for urlpt in root.xpath('/authors/author/@urlpt'):
-        timeoutCount4 = 0
-        passFail4 = 0
-
+    for urlpt in urlpts:
         # if we found an affiliation, break the cycle
         if affiliation is not None:
             break
 
-        while (passFail4 == 0):
-            try:
-                resp = requests.get(DBLP_PERSON_URL2.format(urlpt=urlpt))
-                if resp.status_code != 404:
-                    # print(resp.text)
-                    root2=etree.fromstring(resp.text)
-                    xx = root2.attrib['pid']
-                    if xx == pid:
-                        affiliation = first_or_none(root2.xpath('/dblpperson/person/note[@type="affiliation"]/text()'))
-
-                passFail4 = 1
-
-            # if connection times out or string is empty, try again until it works or failed 5 times
-            except:
-                if (timeoutCount4 < 5):
-                    passFail4 = 0
-                    timeoutCount4 = timeoutCount4 + 1
-                else:
-                    print("ERROR: failed to connect to DBLP 5+ times for" + str(urlpt) + ", skipping")
-                    passFail4 = 1
+        try:
+            root2 = _fetch(DBLP_PERSON_URL2.format(urlpt=urlpt), None,
+                           lambda resp: etree.fromstring(resp.content), urlpt, stats.PERSON,
+                           '__get_affiliation')
+        # not found (404), or failed to connect too many times
+        except RetryError as e:
+            print("ERROR: " + str(e) + ", skipping")
+            continue
+        xx = root2.attrib['pid']
+        if xx == pid:
+            affiliation = first_or_none(root2.xpath('/dblpperson/person/note[@type="affiliation"]/text()'))
 
     return "" if affiliation is None else affiliation
     #
@@ -0,0 +1,252 @@
+"""
+Asyncio versions of the dblp module's calls, for drivers that keep hundreds of
+DBLP lookups in flight from a single thread. Requires aiohttp.
+
+Example:
+
+    async with dblp.aio.AsyncClient(concurrency=200, rate=10) as client:
+        authors = await dblp.aio.search(client, 'michael ley')
+        await dblp.aio.load_author(client, authors[0])
+        await dblp.aio.load_publications(client, authors[0].publications)
+"""
+import time
+import asyncio
+import dblp
+from dblp import stats
+from dblp.cache import CachedResponse
+from dblp.client import TIMEOUT, TokenBucket
+from dblp.retry import PARSE_ERRORS, ParseError, RetryPolicy, check_status
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncClient(object):
+    """
+    Asyncio counterpart of dblp.client.Client: one aiohttp session, at most
+    `concurrency` requests in flight, and the same optional rate limiter and
+    response cache. Calls are retried with the same policy as the blocking
+    ones (see dblp.retry).
+
+    Attributes:
+    semaphore - bounds the number of requests in flight
+    limiter - a dblp.client.TokenBucket, or None for no rate limit
+    cache - a dblp.cache.ResponseCache, or None; it is used from threads (see
+    cache_call), never from the event loop itself
+    timeout - seconds to wait for DBLP, as with dblp.client.Client: a
+    (connect, read) pair, a single number for both, or None to wait forever
+    retry - a dblp.retry.RetryPolicy; its circuit breaker pauses every
+    coroutine using this client
+    loading - dict URL -> asyncio.Task of the author or publication loads in
+    flight, which later loads of the same URL wait for (see once)
+    """
+    def __init__(self, concurrency=100, rate=None, burst=1, cache=None, timeout=TIMEOUT, retry=None):
+        if aiohttp is None:
+            raise ImportError('dblp.aio requires aiohttp (pip install aiohttp)')
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.cache = cache
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.loading = {}
+        self.session = None
+
+    async def once(self, url, load):
+        """Returns `await load()`, unless a load of `url` is already in flight:
+        then its result (or error) is returned, so e.g. coroutines loading the
+        same interned Publication fetch it once. Cancelling a caller does not
+        cancel the load the others wait for.
+        """
+        task = self.loading.get(url)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self.loading[url] = task
+            task.add_done_callback(lambda _: self.loading.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def cache_call(self, method, *args):
+        """Call `method` of the cache (e.g. 'get') with `args` in a thread of
+        the event loop's default executor: the cache blocks on its disk I/O and
+        its lock, which would stall every coroutine of the loop.
+        Returns:
+            What the method returns, or None if there is no cache.
+        """
+        if self.cache is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, getattr(self.cache, method), *args)
+
+    async def get(self, url, params=None):
+        resp = await self.cache_call('get', url, params)
+        if resp is not None:
+            return resp
+        return await self.download(url, params)
+
+    async def download(self, url, params=None):
+        """Get `url` from DBLP, without looking in the cache (but keeping the answer in it)."""
+        if self.session is None:
+            connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read))
+        async with self.semaphore:
+            if self.limiter is not None:
+                wait = self.limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            async with self.session.get(url, params=params) as r:
+                # throttled or failed: raised here, while the Retry-After header is at hand
+                check_status(r.status, r.headers, url)
+                resp = CachedResponse(str(r.url), r.status, await r.read())
+        # only keep complete answers, so a throttled or empty reply is retried next run
+        if self.cache is not None and resp.status_code == 200 and resp.content:
+            await self.cache_call('set', url, params, resp)
+        return resp
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+async def _fetch(client, url, params, parse, what, endpoint, loader):
+    """Fetch `url` and parse the answer, with the client's retry policy (see
+    dblp.retry.RetryPolicy.call_async); waits do not block the event loop. The call
+    is reported to the hooks of dblp.stats, as an `endpoint` call made by
+    `loader`.
+    Returns:
+        The value returned by `parse(resp)`, awaited if `parse` is a coroutine function.
+    Raises:
+        RetryError, if every attempt failed or DBLP answered e.g. 404. Other
+        errors (see dblp.retry.RetryPolicy.retryable) are raised at once.
+    """
+    timing = {'attempts': 0, 'cached': False, 'bytes': 0, 'fetch': 0.0, 'parse': 0.0}
+
+    async def attempt():
+        timing['attempts'] += 1
+        start = time.monotonic()
+        try:
+            resp = await client.cache_call('get', url, params)
+            timing['cached'] = resp is not None
+            if resp is None:
+                resp = await client.download(url, params)
+        finally:
+            parsing = time.monotonic()
+            timing['fetch'] += parsing - start
+        try:
+            result = parse(resp)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except PARSE_ERRORS as e:
+            # never parse that answer again; a cached one fails the same way every time, a fresh one is retried
+            await client.cache_call('delete', url, params)
+            if timing['cached']:
+                raise
+            raise ParseError(what, e)
+        finally:
+            timing['parse'] += time.monotonic() - parsing
+        timing['bytes'] = len(resp.content)
+        return result
+
+    start = time.monotonic()
+    error = None
+    try:
+        return await client.retry.call_async(attempt, what)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        # whatever was not spent fetching or parsing was spent backing off (or waiting for the circuit breaker)
+        retry = max(time.monotonic() - start - timing['fetch'] - timing['parse'], 0.0)
+        stats.emit(stats.Event(endpoint, loader, what, timing['attempts'], timing['cached'],
+                               timing['bytes'] if error is None else 0, timing['fetch'], timing['parse'], retry,
+                               error))
+
+
+async def decode(fn, content):
+    """Returns fn(content), computed in the parse pool of the dblp module if
+    there is one (see dblp.set_parse_pool), without blocking the event loop."""
+    pool = dblp.get_parse_pool()
+    if pool is None:
+        return fn(content)
+    return await asyncio.wrap_future(pool.submit(dblp.pooled_decode, fn, content))
+
+
+async def search_pub(client, pub_str):
+    return await _fetch(client, dblp.DBLP_PUBL_SEARCH_URL,
+                        {'q': pub_str, 'format': 'json', 'h': 1000},
+                        lambda resp: resp.text, pub_str, stats.PUBL_SEARCH, 'aio.search_pub')
+
+
+async def search(client, author_str, full=False):
+    urlpts = await _fetch(client, dblp.DBLP_AUTHOR_SEARCH_URL, {'xauthor': author_str},
+                          lambda resp: dblp.parse_author_search(resp.content), author_str,
+                          stats.AUTHOR_SEARCH, 'aio.search')
+
+    async def probe(urlpt):
+        # the person page tells us about homonyms, and is also the data of the author itself
+        author = await load_author(client, dblp.Author(urlpt, full))
+        if author.homonyms:
+            return [dblp.Author(h, full) for h in author.homonyms]
+        return [author]
+
+    # probes run concurrently, but the result keeps the order of the search hits
+    arr_of_authors = []
+    for authors in await asyncio.gather(*[probe(urlpt) for urlpt in urlpts]):
+        arr_of_authors.extend(authors)
+    return arr_of_authors
+
+
+async def get_affiliation(client, pid, author_str):
+    return await _fetch(client, dblp.DBLP_AUTHOR_SEARCH_URL2,
+                        {'q': author_str, 'format': 'json', 'h': 1000},
+                        lambda resp: dblp.parse_affiliation(resp.text, pid), author_str,
+                        stats.AUTHOR_SEARCH, 'aio.get_affiliation')
+
+
+async def load_author(client, author):
+    """Load the data of a dblp.Author, so attribute accesses do not block."""
+    if author.data is None:
+        if author.full:
+            url = dblp.DBLP_PERSON_URL2.format(urlpt=author.urlpt)
+
+            async def parse(resp):
+                return dblp.full_person_data(await decode(dblp.decode_full_person, resp.content), 'aio.load_author')
+        else:
+            url = dblp.DBLP_PERSON_URL.format(urlpt=author.urlpt)
+
+            async def parse(resp):
+                return dblp.person_data(await decode(dblp.decode_person, resp.content))
+        author.data = await client.once(url, lambda: _fetch(client, url, None, parse, author.urlpt, stats.PERSON,
+                                                            'aio.load_author'))
+    return author
+
+
+async def load_publication(client, publication):
+    """Load the data of a dblp.Publication, so attribute accesses do not block."""
+    if publication.data is None:
+        async def parse(resp):
+            data = dblp.build_publication_data(await decode(dblp.decode_publication, resp.content))
+            if dblp.KEEP_XML:
+                publication.xml = resp.content
+            return data
+        url = dblp.DBLP_PUBLICATION_URL.format(key=publication.key)
+        publication.data = await client.once(url, lambda: _fetch(client, url, None, parse, publication.key,
+                                                                 stats.RECORD, 'aio.load_publication'))
+    return publication
+
+
+async def load_publications(client, publications):
+    """Load a list of dblp.Publication concurrently.
+    Returns:
+        The list of publications, in the same order.
+    """
+    return await asyncio.gather(*[load_publication(client, p) for p in publications])
@@ -0,0 +1,263 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import namedtuple
+
+# seconds: the last use of an entry is only written again when it is older than this, so a run reading the same
+# entries over and over does not write (and commit) on every hit; the eviction order is as coarse
+ACCESS_RESOLUTION = 3600
+# a cache over max_bytes drops entries until it is under this fraction of it, so that it does not evict again (and,
+# for a DirectoryCache, list every entry again) at the next store
+EVICTION_TARGET = 0.9
+
+
+class CachedResponse(namedtuple('CachedResponse', ['url', 'status_code', 'content'])):
+    """
+    A response replayed from a ResponseCache. Exposes the subset of the
+    requests.Response interface used by the dblp module.
+    """
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+
+def cache_key(url, params=None):
+    """Build the cache key for a request: the URL plus its params, in a stable order.
+    Args:
+        url: URL of the request.
+        params: dict of query parameters, or None.
+
+    Returns:
+        A hex digest identifying the request.
+    """
+    parts = [url]
+    for name, value in sorted((params or {}).items()):
+        parts.append('{}={}'.format(name, value))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class ResponseCache(object):
+    """
+    Base class for persistent DBLP response caches. Subclasses implement
+    _load, _store, _delete and _evict, and keep `total` up to date in _store
+    and _delete; this class takes care of TTLs and counters.
+
+    Attributes:
+    ttl - seconds an entry stays fresh, or None to keep entries forever
+    max_bytes - upper bound on the stored payload size, or None for no bound
+    total - bytes of payload stored, counted once when the cache is opened
+    hits - number of lookups answered from the cache
+    misses - number of lookups that had to go to the network
+    evictions - number of entries dropped, either expired or to stay under
+    max_bytes
+    """
+    def __init__(self, ttl=None, max_bytes=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None):
+        key = cache_key(url, params)
+        with self.lock:
+            entry = self._load(key)
+            if entry is not None:
+                stored, response = entry
+                if self.ttl is None or time.time() - stored <= self.ttl:
+                    self.hits += 1
+                    return response
+                self._delete(key)
+                self.evictions += 1
+            self.misses += 1
+        return None
+
+    def set(self, url, params, response):
+        key = cache_key(url, params)
+        with self.lock:
+            self._store(key, CachedResponse(url, response.status_code, response.content))
+            if self.max_bytes is not None and self.total > self.max_bytes:
+                self.evictions += self._evict(int(self.max_bytes * EVICTION_TARGET))
+
+    def delete(self, url, params=None):
+        """Drop the entry of a request, if any, e.g. an answer that could not be parsed."""
+        key = cache_key(url, params)
+        with self.lock:
+            self._delete(key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0
+        }
+
+    def _load(self, key):
+        """Returns a (stored_timestamp, CachedResponse) tuple, or None."""
+        raise NotImplementedError
+
+    def _store(self, key, response):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _evict(self, max_bytes):
+        """Drops least recently used entries until the cache fits in max_bytes.
+        Returns the number of entries dropped."""
+        raise NotImplementedError
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Response cache backed by a single SQLite file. The time an entry was last
+    used, for the eviction order, is kept to within ACCESS_RESOLUTION seconds.
+    """
+    def __init__(self, path, ttl=None, max_bytes=None):
+        super(SQLiteCache, self).__init__(ttl, max_bytes)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # the content last: reading the other columns of a row does not go through the pages of its content
+        self.conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                          'key TEXT PRIMARY KEY, url TEXT, status INTEGER, size INTEGER, stored REAL, accessed REAL, '
+                          'content BLOB)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+        self.conn.commit()
+        self.total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _load(self, key):
+        row = self.conn.execute('SELECT url, status, content, stored, accessed FROM responses WHERE key = ?',
+                                (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[4] > ACCESS_RESOLUTION:
+            self.conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+        return row[3], CachedResponse(row[0], row[1], bytes(row[2]))
+
+    def _size(self, key):
+        row = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def _store(self, key, response):
+        now = time.time()
+        replaced = self._size(key)
+        self.conn.execute('INSERT OR REPLACE INTO responses (key, url, status, size, stored, accessed, content) '
+                          'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                          (key, response.url, response.status_code, len(response.content), now, now,
+                           sqlite3.Binary(response.content)))
+        self.conn.commit()
+        self.total += len(response.content) - replaced
+
+    def _delete(self, key):
+        size = self._size(key)
+        self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+        self.conn.commit()
+        self.total -= size
+
+    def _evict(self, max_bytes):
+        dropped = 0
+        for key, size in self.conn.execute('SELECT key, size FROM responses ORDER BY accessed').fetchall():
+            if self.total <= max_bytes:
+                break
+            self.conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.total -= size
+            dropped += 1
+        self.conn.commit()
+        return dropped
+
+    def close(self):
+        self.conn.close()
+
+
+class DirectoryCache(ResponseCache):
+    """
+    Content-addressed response cache: one file per response, stored under
+    path/<first two hex digits of the key>/<key>. The file's mtime is the
+    time the entry was stored and its atime the time it was last used (to
+    within ACCESS_RESOLUTION seconds).
+    """
+    def __init__(self, path, ttl=None, max_bytes=None):
+        super(DirectoryCache, self).__init__(ttl, max_bytes)
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self.total = sum(size for _, size, _ in self._entries())
+
+    def _filename(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def _load(self, key):
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                status = int(f.readline())
+                url = f.readline().decode('utf-8').rstrip('\n')
+                content = f.read()
+            st = os.stat(filename)
+            stored = st.st_mtime
+            now = time.time()
+            if now - st.st_atime > ACCESS_RESOLUTION:
+                os.utime(filename, (now, stored))
+        except (IOError, OSError, ValueError):
+            return None
+        return stored, CachedResponse(url, status, content)
+
+    def _store(self, key, response):
+        filename = self._filename(key)
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        replaced = self._file_size(filename)
+        # write to a temporary name first so a crash never leaves a truncated entry
+        with open(filename + '.tmp', 'wb') as f:
+            f.write('{}\n{}\n'.format(response.status_code, response.url).encode('utf-8'))
+            f.write(response.content)
+        os.replace(filename + '.tmp', filename)
+        now = time.time()
+        os.utime(filename, (now, now))
+        self.total += self._file_size(filename) - replaced
+
+    def _delete(self, key):
+        filename = self._filename(key)
+        size = self._file_size(filename)
+        try:
+            os.remove(filename)
+        except OSError:
+            return
+        self.total -= size
+
+    @staticmethod
+    def _file_size(filename):
+        try:
+            return os.path.getsize(filename)
+        except OSError:
+            return 0
+
+    def _entries(self):
+        """Returns the (atime, size, key) of every entry."""
+        entries = []
+        for subdir in os.listdir(self.path):
+            for name in os.listdir(os.path.join(self.path, subdir)):
+                if name.endswith('.tmp'):
+                    continue
+                st = os.stat(os.path.join(self.path, subdir, name))
+                entries.append((st.st_atime, st.st_size, name))
+        return entries
+
+    def _evict(self, max_bytes):
+        dropped = 0
+        for _, size, name in sorted(self._entries()):
+            if self.total <= max_bytes:
+                break
+            self._delete(name)
+            dropped += 1
+        return dropped
@@ -0,0 +1,94 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from .retry import RetryPolicy
+
+# default timeouts, in seconds: to connect to DBLP, and then between two reads of its answer (DBLP takes a few seconds
+# to start sending the record of a prolific author, but a stalled connection must not hang a worker forever)
+TIMEOUT = (10, 60)
+
+
+class TokenBucket(object):
+    """
+    Token-bucket rate limiter shared by every thread issuing DBLP requests.
+
+    Attributes:
+    rate - tokens (requests) added per second
+    capacity - largest burst allowed after an idle period
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token without sleeping.
+        Returns:
+            The number of seconds the caller must wait before using it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # reserve the token even if it is not there yet, so waiters queue up
+            # behind each other instead of all waking up at the same time
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            self.tokens -= 1
+        return wait
+
+    def acquire(self):
+        """Take one token, sleeping until it is available.
+        Returns:
+            The number of seconds spent waiting.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Client(object):
+    """
+    Issues the HTTP requests of the dblp module: a pooled, keep-alive
+    requests.Session, an optional rate limiter and an optional response cache
+    (see dblp.cache). The dblp module retries its calls with the client's
+    retry policy (see dblp.retry).
+
+    Attributes:
+    session - the underlying requests.Session
+    limiter - a TokenBucket, or None for no rate limit
+    cache - a dblp.cache.ResponseCache, or None
+    timeout - seconds to wait for DBLP: a (connect, read) pair, a single
+    number for both, or None to wait forever
+    retry - the dblp.retry.RetryPolicy of the calls through this client; its
+    circuit breaker is shared by all of them
+    """
+    def __init__(self, pool_size=10, rate=None, burst=1, cache=None, timeout=TIMEOUT, retry=None):
+        self.session = requests.Session()
+        # one pooled connection per worker, so threads never queue for a socket
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.cache = cache
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+
+    def get(self, url, params=None):
+        if self.cache is not None:
+            resp = self.cache.get(url, params)
+            if resp is not None:
+                return resp
+        if self.limiter is not None:
+            self.limiter.acquire()
+        resp = self.session.get(url, params=params, timeout=self.timeout)
+        # only keep complete answers, so a throttled or empty reply is retried next run
+        if self.cache is not None and resp.status_code == 200 and resp.content:
+            self.cache.set(url, params, resp)
+        return resp
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,129 @@
+import gzip
+from lxml import etree
+
+# record elements that are direct children of <dblp> in the dump
+RECORD_TAGS = ('article', 'inproceedings', 'proceedings', 'book', 'incollection',
+               'phdthesis', 'mastersthesis', 'www', 'data')
+
+DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/')
+
+
+def open_dump(path):
+    """Open the DBLP dump, transparently decompressing `dblp.xml.gz`.
+    The DTD (`dblp.dtd`) must sit next to the dump, since the dump uses its
+    character entities.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def iter_records(path):
+    """Stream the records of the DBLP dump, one element at a time.
+    Every element is cleared once the caller is done with it, and dropped from
+    its parent, so memory stays constant regardless of the dump size.
+    Args:
+        path: path of `dblp.xml` or `dblp.xml.gz`.
+
+    Returns:
+        A generator of record elements (article, inproceedings, www, ...).
+    """
+    with open_dump(path) as f:
+        for _, elem in etree.iterparse(f, events=('end',), tag=RECORD_TAGS, load_dtd=True,
+                                       resolve_entities=True, huge_tree=True):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def venue_of(record):
+    """Returns the venue-year (e.g. conf/dsn/2019) a record belongs to, in the
+    format used by `dblp.search_pub` queries, or None."""
+    crossref = record.findtext('crossref')
+    if crossref is not None:
+        return crossref
+    # a few old records have no crossref -- rebuild it from the key and the year
+    key = record.get('key', '')
+    year = record.findtext('year')
+    if key.startswith('conf/') and year is not None:
+        return '/'.join(key.split('/')[:2] + [year])
+    return None
+
+
+def record_to_info(record):
+    """Convert a dump record into the `info` dict returned for a hit by the
+    DBLP publication search API (`dblp.search_pub`). Author pids are only set
+    when the dump provides them; see `collect_hits`.
+    """
+    info = {
+        'authors': {'author': [{'@pid': a.get('pid'), 'text': a.text}
+                               for a in record.findall('author')]},
+        'title': ''.join(record.find('title').itertext()) if record.find('title') is not None else None,
+        'venue': record.findtext('booktitle') or record.findtext('journal'),
+        'year': record.findtext('year'),
+        'type': record.tag,
+        'key': record.get('key'),
+        'url': record.findtext('url'),
+    }
+    pages = record.findtext('pages')
+    if pages is not None:
+        info['pages'] = pages
+    for ee in record.findall('ee'):
+        for prefix in DOI_PREFIXES:
+            if ee.text and ee.text.startswith(prefix):
+                info['doi'] = ee.text[len(prefix):]
+                info['ee'] = ee.text
+                break
+        if 'doi' in info:
+            break
+    else:
+        if record.findtext('ee') is not None:
+            info['ee'] = record.findtext('ee')
+    if not info['authors']['author']:
+        del info['authors']
+    return info
+
+
+def collect_hits(path, venues, affiliations=None):
+    """Collect, in a single pass over the dump, the hits the publication search
+    API returns for each of `venues`.
+    The dump does not carry author pids on publication records, so they are
+    resolved at the end of the pass from the person records
+    (`<www key="homepages/PID">`), which list every name of the person. This
+    name -> pid map is the only part of the pass that grows with the dump.
+    Args:
+        path: path of `dblp.xml` or `dblp.xml.gz`.
+        venues: iterable of venue-years, e.g. ["conf/dsn/2019", "conf/ftcs/1999"].
+        affiliations: optional dict, filled with pid -> affiliation (the first
+        affiliation note of the person record, as in `dblp.get_affiliation`).
+
+    Returns:
+        A dict mapping each venue to its list of `info` dicts, in dump order.
+    """
+    hits = dict((venue, []) for venue in venues)
+    pids = {}
+    for record in iter_records(path):
+        key = record.get('key', '')
+        if record.tag == 'www':
+            if key.startswith('homepages/'):
+                pid = key[len('homepages/'):]
+                for name in record.findall('author'):
+                    pids.setdefault(name.text, pid)
+                if affiliations is not None:
+                    affiliation = record.find('note[@type="affiliation"]')
+                    if affiliation is not None:
+                        affiliations[pid] = affiliation.text
+            continue
+        venue = venue_of(record)
+        if venue in hits:
+            hits[venue].append(record_to_info(record))
+
+    for venue_hits in hits.values():
+        for info in venue_hits:
+            for author in info.get('authors', {}).get('author', []):
+                # names without a person record are kept apart under their own name
+                if author['@pid'] is None:
+                    author['@pid'] = pids.get(author['text'], author['text'])
+    return hits
+
@@ -0,0 +1,100 @@
+import re
+
+# reason codes returned by VenueFilter.check
+ACCEPTED = 'accepted'
+ACCEPTED_NO_DOI = 'accepted-no-doi'     # the venue matches, but DBLP has no DOI to tell workshops apart
+REJECTED_PAGES = 'rejected-pages'       # keynote, abstract, poster, ... (fewer than min_pages pages)
+REJECTED_VENUE = 'rejected-venue'
+REJECTED_TITLE = 'rejected-title'       # e.g. the chairs' welcome message
+REJECTED_DOI = 'rejected-doi'           # workshop, industry track, supplemental volume, ...
+
+# length assumed when the page range cannot be parsed: for some papers, pages does not include the finish page
+UNKNOWN_PAGES = 99
+
+
+class VenueRules(object):
+    """
+    Declarative description of the papers of a conference that count, for
+    hits returned by the DBLP publication search API.
+
+    Attributes:
+    venues - accepted values of the hit's "venue" field, e.g. ['DSN', 'FTCS']
+    doi_patterns - regexes one of which the DOI must match, with {} standing
+    for the year, e.g. r'10\\.1109/DSN\\.{}\\.([0-9]+)'. Empty to accept any DOI
+    min_pages - papers shorter than this are rejected; a paper without a page
+    range has 1 page, and one without pages has 0
+    title_exclusions - regexes; papers whose title matches one are rejected
+    """
+    def __init__(self, venues, doi_patterns=(), min_pages=0, title_exclusions=()):
+        self.venues = frozenset(venues)
+        self.doi_patterns = tuple(doi_patterns)
+        self.min_pages = min_pages
+        self.title_exclusions = tuple(title_exclusions)
+        self.compiled = {}
+
+    def compile(self, year):
+        """Returns the VenueFilter of `year`, compiling it on first use."""
+        venue_filter = self.compiled.get(year)
+        if venue_filter is None:
+            venue_filter = self.compiled[year] = VenueFilter(self, year)
+        return venue_filter
+
+
+class VenueFilter(object):
+    """
+    The rules of a conference compiled for one year: all DOI patterns are
+    combined in a single regex, and so are the title exclusions.
+    """
+    def __init__(self, rules, year):
+        self.rules = rules
+        self.year = year
+        self.doi = None
+        if rules.doi_patterns:
+            self.doi = re.compile('|'.join('(?:%s)' % p.format(year) for p in rules.doi_patterns))
+        self.title = None
+        if rules.title_exclusions:
+            self.title = re.compile('|'.join('(?:%s)' % t for t in rules.title_exclusions))
+
+    def pages(self, info):
+        """Number of pages of a hit (see VenueRules.min_pages): from the first
+        two numbers around a dash, e.g. 13 for "12-24" or "12-24-30", or
+        UNKNOWN_PAGES if they are not numbers (e.g. "1:1-1:12", "12-")."""
+        if 'pages' not in info:
+            return 0
+        if '-' not in info['pages']:
+            return 1
+        first, last = info['pages'].split('-')[:2]
+        try:
+            return int(last) - int(first) + 1
+        except ValueError:
+            return UNKNOWN_PAGES
+
+    def check(self, info):
+        """Check a hit against the rules.
+        Returns:
+            An (accepted, reason) tuple, reason being one of the codes of this module.
+        """
+        # a hit of several venues has a list of them, none of which is checked
+        if not isinstance(info.get('venue'), str) or info['venue'] not in self.rules.venues:
+            return False, REJECTED_VENUE
+        # before the pages: front matter such as the chairs' welcome often has a single page
+        if self.title is not None and self.title.search(info.get('title') or ''):
+            return False, REJECTED_TITLE
+        if self.pages(info) < self.rules.min_pages:
+            return False, REJECTED_PAGES
+        if self.doi is not None:
+            # for some papers the doi is not available (e.g., https://dblp.uni-trier.de/rec/xml/conf/ftcs/HuangK93.xml)
+            if info.get('doi') is None:
+                return True, ACCEPTED_NO_DOI
+            if self.doi.search(info['doi']) is None:
+                return False, REJECTED_DOI
+        return True, ACCEPTED
+
+    def apply(self, hits):
+        """Check a batch of hits.
+        Returns:
+            A generator of (info, accepted, reason) tuples, in the order of `hits`.
+        """
+        for info in hits:
+            accepted, reason = self.check(info)
+            yield info, accepted, reason
@@ -0,0 +1,181 @@
+import re
+import dblp
+import dblp.dump
+import dblp.filters
+import dblp.matrix
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Conference(object):
+    """
+    Definition of a conference hall of fame.
+
+    Attributes:
+    name - short name, e.g. "DSN"
+    venues - list of (venue prefix, first year, last year) tuples, e.g.
+    [("conf/ftcs", 1988, 1999), ("conf/dsn", 2000, None)]; a last year of None
+    means "up to now"
+    rules - a dblp.filters.VenueRules deciding which papers count
+    chair_titles - regexes matching the titles of the chairs' welcome; their
+    authors are listed as chairs of that year instead of counting a paper
+    threshold - number of papers needed to be in the hall of fame, or None if
+    the conference only publishes a ranking
+    close - number of papers from which an author is "close to joining"
+    (threshold - 2 by default)
+    recent_years - number of years counted as recent
+    """
+    def __init__(self, name, venues, rules, chair_titles=(), threshold=None, close=None,
+                 recent_years=5):
+        self.name = name
+        self.venues = venues
+        self.rules = rules
+        self.chair_titles = re.compile('|'.join('(?:%s)' % t for t in chair_titles)) if chair_titles else None
+        self.threshold = threshold
+        self.close = close if close is not None or threshold is None else threshold - 2
+        self.recent_years = recent_years
+
+    def venue_years(self, last_year):
+        """Returns the (venue, year) tuples of the conference up to `last_year`, oldest first."""
+        venue_years = []
+        for prefix, first, last in self.venues:
+            for year in range(first, min(last or last_year, last_year) + 1):
+                venue_years.append(('{}/{}'.format(prefix, year), year))
+        return venue_years
+
+
+def hit_authors(info):
+    """Returns the (pid, name) tuples of the authors of a publication search hit."""
+    if 'authors' not in info:
+        return []
+    authors = info['authors']['author']
+    if not isinstance(authors, list):
+        authors = [authors]
+    return [(author['@pid'], author['text']) for author in authors]
+
+
+def fetch_venues(venues, dump=None, affiliations=None, workers=4):
+    """Fetch the hits of a list of venue-years, each one once even if several
+    conferences share it: in a single pass over the DBLP dump, or from the DBLP
+    API with `workers` venue-years at a time (through the shared client and
+    its cache).
+    Args:
+        venues: list of venue-years, e.g. ["conf/dsn/2019", "conf/isca/2019"].
+        dump: path of the DBLP XML dump, or None to use the DBLP API.
+        affiliations: optional dict, filled with pid -> affiliation when
+        reading the dump (see dblp.dump.collect_hits).
+
+    Returns:
+        A dict mapping each venue-year to its list of `info` dicts.
+
+    Raises:
+        dblp.retry.RetryError, if a page of a venue-year cannot be fetched:
+        no conference is ranked from partial hits.
+    """
+    venues = list(OrderedDict.fromkeys(venues))
+    if dump is not None:
+        return dblp.dump.collect_hits(dump, venues, affiliations)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(venues, executor.map(lambda venue: list(dblp.search_pub_iter(venue)), venues)))
+
+
+class Ranking(object):
+    """
+    Papers and chairs of the authors of a conference.
+
+    Attributes:
+    conference - the Conference
+    authors - dict pid -> {'name', 'pubs': {key: year}}, in order of first paper
+    papers - dict key -> `info` dict of every paper counted
+    chairs - list of (pid, name, year) tuples
+    rejected - dict reason code (see dblp.filters) -> number of hits
+    """
+    def __init__(self, conference):
+        self.conference = conference
+        self.authors = OrderedDict()
+        self.papers = {}
+        self.chairs = []
+        self.rejected = {}
+
+    def add_venue(self, year, hits):
+        """Count the papers of one venue-year."""
+        venue_filter = self.conference.rules.compile(year)
+        chair_titles = self.conference.chair_titles
+        for info, accepted, reason in venue_filter.apply(hits):
+            if accepted:
+                self.papers[info['key']] = info
+                for pid, name in hit_authors(info):
+                    author = self.authors.setdefault(pid, {'name': name, 'pubs': {}})
+                    author['pubs'][info['key']] = year
+            elif (reason == dblp.filters.REJECTED_TITLE and chair_titles is not None and
+                  chair_titles.search(info.get('title') or '')):
+                for pid, name in hit_authors(info):
+                    self.chairs.append((pid, name, year))
+            else:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def rows(self, last_year, limit=None):
+        """Rank the authors by number of papers; ties share a rank.
+        Args:
+            last_year: the last year of the conference, used for the recent papers.
+            limit: keep only the first `limit` rows (and the authors tied with the last one).
+
+        Returns:
+            A list of dicts in the format of ranking.json, with the pid of each author.
+        """
+        matrix = dblp.matrix.PublicationMatrix.from_authors(self.authors)
+        totals = matrix.totals()
+        recent = matrix.recent(last_year, self.conference.recent_years)
+        rows = []
+        for i, rank, row in matrix.rank(totals, limit):
+            pid = matrix.pids[row]
+            rows.append({
+                "anchor": "ranking",
+                "num": i,
+                "rank": rank,
+                "pid": pid,
+                "author": self.authors[pid]['name'],
+                "total": int(totals[row]),
+                "recent": int(recent[row]),
+            })
+        return rows
+
+
+def rank_conferences(conferences, last_year, dump=None, affiliations=None, workers=4):
+    """Compute the ranking of several conferences from one shared fetch (or dump pass).
+    Returns:
+        A dict mapping each conference name to its Ranking.
+    """
+    venue_years = [venue_year for conference in conferences for venue_year in conference.venue_years(last_year)]
+    hits = fetch_venues([venue for venue, year in venue_years], dump, affiliations, workers)
+
+    rankings = OrderedDict()
+    for conference in conferences:
+        ranking = rankings[conference.name] = Ranking(conference)
+        for venue, year in conference.venue_years(last_year):
+            ranking.add_venue(year, hits[venue])
+    return rankings
+
+
+## Conference definitions
+
+# DSN (2000-now) and its predecessor FTCS (1988-1999): main conference papers, told apart from workshop, industry track,
+# etc. papers by their DOI, of 4 pages or more
+DSN = Conference(
+    'DSN', [('conf/ftcs', 1988, 1999), ('conf/dsn', 2000, None)],
+    dblp.filters.VenueRules(['DSN', 'FTCS'], [
+        r'10\.1109/DSN([0-9]+)\.{}\.([0-9]+)',
+        r'10\.1109/ICDSN\.{}\.([0-9]+)',
+        r'10\.1109/DSN\.{}\.([0-9]+)',
+        r'10\.1109\/FTCS\.{}\.([0-9]+)'], min_pages=4))
+
+# The Chair's Welcome is flagged as an ISCA publication, and the title is always "Proceedings of the ..."
+# or "International Symposium on Computer Architecture ..."
+ISCA_CHAIR_TITLES = [re.escape("Proceedings of the"), re.escape("International Symposium on Computer Architecture")]
+
+# ISCA: some prior versions of ISCA have single page 'abstracts' or keynote talks that DBLP shows as papers, and the
+# Chair's Welcome counts as chairing that year instead of as a paper
+ISCA = Conference(
+    'ISCA', [('conf/isca', 1973, None)],
+    dblp.filters.VenueRules(['ISCA'], min_pages=2, title_exclusions=ISCA_CHAIR_TITLES),
+    chair_titles=ISCA_CHAIR_TITLES, threshold=8)
@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+
+
+class Journal(object):
+    """
+    Append-only progress journal of a long crawl: one JSON line per unit of
+    work completed (an author, a venue-year, ...) with its results, so that
+    a crashed run can be resumed without doing that work again.
+
+    Example:
+
+        journal = Journal('crawl-journal.jsonl', resume=True)
+        for person in people:
+            if person in journal:
+                results = journal[person]
+            else:
+                results = crawl(person)
+                journal.record(person, results)
+
+    Attributes:
+    path - file of the journal
+    entries - dict key -> results of the units of work completed
+    """
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = self.replay(path) if resume else {}
+        self.lock = threading.Lock()
+        # a new run starts a new journal; a resumed one keeps appending to the old one
+        self.file = open(path, mode='a' if resume else 'w', encoding='utf-8')
+        if resume and self.file.tell() > 0:
+            with open(path, mode='rb') as journalFile:
+                journalFile.seek(-1, os.SEEK_END)
+                if journalFile.read(1) != b'\n':
+                    # end the line cut short, so the next entry starts on a line of its own
+                    self.file.write('\n')
+
+    @staticmethod
+    def replay(path):
+        """Read the journal of a previous run.
+        Returns:
+            A dict key -> results, empty if there is no journal.
+        """
+        entries = {}
+        if not os.path.isfile(path):
+            return entries
+        with open(path, mode='r', encoding='utf-8') as journalFile:
+            for line in journalFile:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the last line is cut short if the run died while writing it: that work is done again
+                    continue
+                entries[entry['key']] = entry['results']
+        return entries
+
+    def record(self, key, results):
+        """Append a completed unit of work; `results` must be JSON serializable.
+        The line is on disk when this returns, so it survives a crash right after.
+        """
+        line = json.dumps({'key': key, 'results': results}) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.entries[key] = results
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class PublicationMatrix(object):
+    """
+    Number of papers of each author in each year, as an author x year NumPy
+    array: totals, recent papers, sliding windows and rankings as of a past
+    year are all column sums, without going through the papers again.
+
+    Attributes:
+    pids - author pids, one per row
+    first_year - year of column 0
+    counts - array of shape (len(pids), number of years)
+    """
+    def __init__(self, pids, first_year, counts):
+        self.pids = pids
+        self.first_year = first_year
+        self.counts = counts
+
+    @classmethod
+    def from_authors(cls, authors):
+        """Build the matrix of an author list.
+        Args:
+            authors: dict pid -> {'pubs': {key: year}, ...}; the rows keep its order.
+        """
+        pids = list(authors)
+        years = [year for author in authors.values() for year in author['pubs'].values()]
+        first_year = min(years) if years else 0
+        last_year = max(years) if years else -1
+        counts = np.zeros((len(pids), last_year - first_year + 1), dtype=np.int32)
+        for row, pid in enumerate(pids):
+            for year in authors[pid]['pubs'].values():
+                counts[row, year - first_year] += 1
+        return cls(pids, first_year, counts)
+
+    @property
+    def last_year(self):
+        return self.first_year + self.counts.shape[1] - 1
+
+    def window(self, first, last):
+        """Returns the number of papers of each author from year `first` to year `last`, both included."""
+        start = max(first - self.first_year, 0)
+        stop = max(last - self.first_year + 1, 0)
+        return self.counts[:, start:stop].sum(axis=1)
+
+    def totals(self):
+        return self.counts.sum(axis=1)
+
+    def recent(self, last_year, years):
+        """Returns the number of papers of each author in the `years` years up to `last_year`."""
+        return self.window(last_year + 1 - years, last_year)
+
+    def as_of(self, year):
+        """Returns the number of papers of each author up to `year`, i.e. the totals as they were that year."""
+        return self.window(self.first_year, year)
+
+    def rank(self, scores, limit=None):
+        """Rank the authors by decreasing score; ties share a rank and keep the order of the rows.
+        Args:
+            scores: one value per author, e.g. `totals()` or `as_of(2010)`.
+            limit: keep only the first `limit` authors (and the ones tied with the last one).
+
+        Returns:
+            A list of (num, rank, row) tuples, `row` being the author's index in `pids`.
+        """
+        order = np.argsort(-np.asarray(scores), kind='stable')
+        ranked = []
+        rank = 1
+        last_score = None
+        for i, row in enumerate(order.tolist(), 1):
+            score = scores[row]
+            if limit is not None and i > limit and last_score != score:
+                break
+            if last_score != score:
+                rank = i
+            ranked.append((i, rank, row))
+            last_score = score
+        return ranked
@@ -0,0 +1,245 @@
+"""
+The retry policy of every DBLP call: exponential backoff with jitter, the
+delay asked for by DBLP when it throttles us (Retry-After of a 429 or 503),
+and a circuit breaker shared by all the workers of a client, so that they all
+pause during an outage instead of each hammering DBLP on its own.
+"""
+import sys
+import time
+import random
+import asyncio
+import threading
+import email.utils
+import concurrent.futures
+
+# answers worth trying again: throttling and server-side failures
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# failures to talk to DBLP, worth trying again: connection errors and timeouts (the errors of requests are IOErrors)
+TRANSPORT_ERRORS = (IOError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+# errors of the parsers on an answer that is not what DBLP sends, e.g. cut short: worth trying again only if it came
+# from the network, since a cached answer would be parsed the same way
+PARSE_ERRORS = (ValueError, SyntaxError)
+
+
+class RetryError(Exception):
+    """A DBLP call that failed for good: every attempt failed, or DBLP
+    answered with an error that retrying cannot fix (e.g. 404)."""
+    pass
+
+
+class TransientError(Exception):
+    """A DBLP answer worth retrying (see RETRY_STATUSES), with the delay DBLP
+    asked for in seconds (Retry-After), if any."""
+    def __init__(self, status_code, retry_after=None):
+        super(TransientError, self).__init__('HTTP {}'.format(status_code))
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ParseError(Exception):
+    """An answer fresh from DBLP that could not be parsed (see PARSE_ERRORS):
+    retried, since the next answer may be whole."""
+    def __init__(self, what, error):
+        super(ParseError, self).__init__('cannot parse {}: {!r}'.format(what, error))
+        self.error = error
+
+
+def is_transport_error(error):
+    """Is `error` a failure to get an answer from DBLP: throttling, a server
+    error, a connection error or a timeout (of requests or aiohttp)?"""
+    if isinstance(error, (TransientError,) + TRANSPORT_ERRORS):
+        return True
+    # only dblp.aio imports aiohttp: if it is not loaded, `error` cannot be one of its errors
+    aiohttp = sys.modules.get('aiohttp')
+    return aiohttp is not None and isinstance(error, aiohttp.ClientError)
+
+
+def parse_retry_after(value):
+    """Returns the seconds to wait given by a Retry-After header (a number of
+    seconds or an HTTP date), or None if there is none."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def check_status(status_code, headers=None, what=None):
+    """Raise TransientError for an answer worth retrying, and RetryError for
+    any other HTTP error.
+    Args:
+        status_code: the HTTP status of the answer.
+        headers: its headers, for Retry-After; cached answers have none (they are always 200).
+        what: what was asked, for the error message.
+    """
+    if status_code in RETRY_STATUSES:
+        raise TransientError(status_code, parse_retry_after((headers or {}).get('Retry-After')))
+    if status_code >= 400:
+        raise RetryError('HTTP {} for {}'.format(status_code, what))
+
+
+class CircuitBreaker(object):
+    """
+    Pauses every worker of a client while DBLP is down or throttling: after
+    `threshold` consecutive failed requests (connection errors, timeouts, 429
+    and 5xx answers, of any worker) the circuit opens for
+    `cooldown` seconds, and a Retry-After opens it for as long as DBLP asked.
+    Calls wait for the circuit to close; the first success resets the count.
+
+    Attributes:
+    threshold - consecutive failures that open the circuit
+    cooldown - seconds the circuit stays open
+    failures - current number of consecutive failures
+    open_until - time.monotonic() at which the circuit closes again
+    """
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def wait_time(self):
+        """Returns the seconds left before the circuit closes, 0 if it is closed."""
+        with self.lock:
+            return max(self.open_until - time.monotonic(), 0.0)
+
+    def wait(self):
+        wait = self.wait_time()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.wait_time()
+
+    async def wait_async(self):
+        """Asyncio counterpart of wait: only the calling coroutine waits."""
+        wait = self.wait_time()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.wait_time()
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+
+    def failure(self, pause=None):
+        """Count a failure; `pause` is the delay DBLP asked for, if any."""
+        with self.lock:
+            self.failures += 1
+            if pause is None and self.failures >= self.threshold:
+                pause = self.cooldown
+            if pause is not None:
+                self.open_until = max(self.open_until, time.monotonic() + pause)
+
+
+class RetryPolicy(object):
+    """
+    How DBLP calls are retried: up to `attempts` attempts, waiting a random
+    time up to base * 2 ** attempt seconds (capped at `cap`) between them, or
+    at least what DBLP asked for in a Retry-After.
+
+    Attributes:
+    attempts - total number of attempts of a call
+    base - seconds of the first backoff
+    cap - longest backoff, in seconds
+    breaker - the CircuitBreaker shared by the calls using this policy
+    """
+    def __init__(self, attempts=6, base=0.5, cap=30.0, breaker=None):
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+
+    def delay(self, attempt, error):
+        """Returns the seconds to wait after failed attempt number `attempt` (0 for the first one)."""
+        # "full jitter": workers that failed together do not retry together
+        backoff = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        retry_after = getattr(error, 'retry_after', None)
+        return backoff if retry_after is None else max(backoff, retry_after)
+
+    def retryable(self, error):
+        """Is failed attempt `error` worth another try: a transport error (see
+        is_transport_error) or an answer fresh from DBLP that could not be
+        parsed (ParseError)? Anything else, e.g. a missing field or a broken
+        parse pool, fails the same way every time."""
+        return isinstance(error, ParseError) or is_transport_error(error)
+
+    def failed(self, attempt, error):
+        """Record failed attempt number `attempt` of a call.
+        Returns:
+            The seconds to wait before the next attempt.
+        """
+        # DBLP down or throttling us (rather than a record that cannot be parsed): every worker backs off
+        if is_transport_error(error):
+            self.breaker.failure(getattr(error, 'retry_after', None))
+        return self.delay(attempt, error)
+
+    def retry_delay(self, attempt, error):
+        """Record failed attempt number `attempt` of a call, which raised
+        `error`, worth another try (see retryable).
+        Returns:
+            The seconds to wait before the next attempt, or None if that was
+            the last one.
+        """
+        delay = self.failed(attempt, error)
+        return delay if attempt + 1 < self.attempts else None
+
+    def exhausted(self, what, error):
+        """Returns the RetryError of a call whose every attempt failed, the last one with `error`."""
+        return RetryError('failed to get {} from DBLP {} times: {!r}'.format(what, self.attempts, error))
+
+    def call(self, fn, what=None):
+        """Call `fn()` until it returns, at most `attempts` times. Only the
+        errors worth another try (see retryable) are retried: a RetryError, or
+        any other error, raised by `fn` is raised at once.
+        Returns:
+            What `fn()` returns.
+        Raises:
+            RetryError, if every attempt failed.
+        """
+        error = None
+        for attempt in range(self.attempts):
+            self.breaker.wait()
+            try:
+                result = fn()
+            # connection errors, timeouts, throttling, empty or cut answers: try again
+            except Exception as e:
+                if not self.retryable(e):
+                    raise
+                error = e
+                delay = self.retry_delay(attempt, e)
+                if delay is not None:
+                    time.sleep(delay)
+                continue
+            self.breaker.success()
+            return result
+        raise self.exhausted(what, error)
+
+    async def call_async(self, fn, what=None):
+        """Asyncio counterpart of call: awaits `fn()` until it returns, and
+        waits (backoff, circuit breaker) without blocking the event loop.
+        Returns:
+            What `await fn()` returns.
+        Raises:
+            RetryError, if every attempt failed.
+        """
+        error = None
+        for attempt in range(self.attempts):
+            await self.breaker.wait_async()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self.retryable(e):
+                    raise
+                error = e
+                delay = self.retry_delay(attempt, e)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                continue
+            self.breaker.success()
+            return result
+        raise self.exhausted(what, error)
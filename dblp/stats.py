@@ -0,0 +1,216 @@
+"""
+Instrumentation of the DBLP calls. Every call of the dblp module (and of
+dblp.aio) emits an Event once it is done; hooks receive them as they happen.
+The built-in `stats` hook keeps counters and time histograms per endpoint, and
+`trace(path)` writes every event to a JSON-lines file.
+
+Example:
+
+    dblp.stats.trace('dblp-trace.jsonl')
+    ...
+    print(dblp.stats.stats.format())
+    dblp.stats.stats.dump('dblp-stats.json')
+"""
+import json
+import threading
+from collections import namedtuple, OrderedDict
+
+# endpoint types
+PERSON = 'person'                # person pages (pers/xk, pers/xx)
+RECORD = 'record'                # publication records (rec/...)
+AUTHOR_SEARCH = 'author-search'  # author searches (search/author, search/author/api)
+PUBL_SEARCH = 'publ-search'      # publication searches (search/publ/api)
+ENDPOINTS = (PERSON, RECORD, AUTHOR_SEARCH, PUBL_SEARCH)
+
+# One DBLP call, with all its attempts:
+# endpoint - one of ENDPOINTS
+# loader - the dblp function or method that made the call, e.g. "search"
+# what - what was asked (urlpt, key, query)
+# attempts - number of attempts (requests to DBLP, or to the response cache); 0 for a record left out of an answer
+# (see skipped)
+# cached - True if the answer came from the response cache instead of DBLP
+# bytes - size of the answer parsed, 0 if the call failed
+# fetch, parse, retry - seconds spent waiting for DBLP (including the rate limiter), parsing its answers, and backing
+# off between attempts
+# error - why the call failed, or None
+Event = namedtuple('Event', ['endpoint', 'loader', 'what', 'attempts', 'cached', 'bytes',
+                             'fetch', 'parse', 'retry', 'error'])
+
+# upper bounds (in seconds) of the buckets of the time histograms; the last bucket has no bound
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30, 60)
+
+hooks = []
+hooks_lock = threading.Lock()
+# hook -> number of events it failed on (see emit)
+hook_errors = {}
+
+
+def add_hook(hook):
+    """Call `hook(event)` for every DBLP call, from the thread that made it."""
+    with hooks_lock:
+        hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    with hooks_lock:
+        hooks.remove(hook)
+
+
+def emit(event):
+    """Call every hook with `event`. A hook that raises (e.g. a Trace on a full
+    disk) neither stops the other hooks nor fails the DBLP call that emitted
+    the event: its first error is printed, and its failures are counted in
+    hook_errors."""
+    for hook in list(hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            with hooks_lock:
+                failures = hook_errors.get(hook, 0)
+                hook_errors[hook] = failures + 1
+            if failures == 0:
+                print('ERROR: dblp.stats hook {!r} failed: {!r} (further errors of this hook are not printed)'.format(
+                    hook, e))
+
+
+def skipped(endpoint, loader, what, error):
+    """Report a record left out of an answer that was fetched and parsed, e.g.
+    a publication of a person page without a year: an event without attempts,
+    `what` being the record and `error` why it was left out."""
+    emit(Event(endpoint, loader, what, 0, False, 0, 0.0, 0.0, 0.0, error))
+
+
+class Histogram(object):
+    """Counts of durations per bucket (see BUCKETS), with their total and maximum."""
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Returns the upper bound of the bucket holding the `p` percentile (None for the last bucket)."""
+        n = sum(self.counts)
+        if n == 0:
+            return 0.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= n * p / 100.0:
+                return BUCKETS[i] if i < len(BUCKETS) else None
+        return None
+
+    def to_dict(self):
+        return {'total': self.total, 'max': self.max, 'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p99': self.percentile(99), 'buckets': list(BUCKETS), 'counts': self.counts}
+
+
+class Stats(object):
+    """
+    Counters and histograms of the DBLP calls, per endpoint type; a hook.
+
+    Attributes:
+    endpoints - dict endpoint -> {'calls', 'requests', 'retries', 'failures',
+    'skipped', 'cached', 'bytes', 'fetch', 'parse', 'retry' (Histograms)}
+    loaders - dict loader -> number of calls
+    errors - dict error message -> number of failed calls and skipped records
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = OrderedDict((endpoint, self.new_counters()) for endpoint in ENDPOINTS)
+            self.loaders = {}
+            self.errors = {}
+
+    @staticmethod
+    def new_counters():
+        return {'calls': 0, 'requests': 0, 'retries': 0, 'failures': 0, 'skipped': 0, 'cached': 0, 'bytes': 0,
+                'fetch': Histogram(), 'parse': Histogram(), 'retry': Histogram()}
+
+    def __call__(self, event):
+        with self.lock:
+            counters = self.endpoints.get(event.endpoint)
+            if counters is None:
+                counters = self.endpoints[event.endpoint] = self.new_counters()
+            if event.attempts == 0:
+                # a record left out of an answer (see skipped): the call that fetched it is counted on its own
+                counters['skipped'] += 1
+                self.errors[event.error] = self.errors.get(event.error, 0) + 1
+                return
+            counters['calls'] += 1
+            counters['requests'] += event.attempts - (1 if event.cached else 0)
+            counters['retries'] += max(event.attempts - 1, 0)
+            counters['cached'] += 1 if event.cached else 0
+            counters['bytes'] += event.bytes
+            counters['fetch'].add(event.fetch)
+            counters['parse'].add(event.parse)
+            counters['retry'].add(event.retry)
+            self.loaders[event.loader] = self.loaders.get(event.loader, 0) + 1
+            if event.error is not None:
+                counters['failures'] += 1
+                self.errors[event.error] = self.errors.get(event.error, 0) + 1
+
+    def summary(self):
+        """Returns the counters as a JSON-serializable dict."""
+        with self.lock:
+            endpoints = OrderedDict()
+            for endpoint, counters in self.endpoints.items():
+                endpoints[endpoint] = dict((name, value.to_dict() if isinstance(value, Histogram) else value)
+                                           for name, value in counters.items())
+            return {'endpoints': endpoints, 'loaders': dict(self.loaders), 'errors': dict(self.errors)}
+
+    def dump(self, path):
+        with open(path, mode='w', encoding='utf-8') as statsFile:
+            json.dump(self.summary(), statsFile, indent=4)
+
+    def format(self):
+        """Returns the end-of-run summary, one line per endpoint type."""
+        lines = ['{:<14}{:>8}{:>9}{:>8}{:>6}{:>6}{:>8}{:>11}{:>10}{:>10}{:>10}{:>9}'.format(
+            'endpoint', 'calls', 'requests', 'retries', 'fail', 'skip', 'cached', 'MB', 'fetch s', 'parse s',
+            'retry s', 'p90 ms')]
+        summary = self.summary()
+        for endpoint, counters in summary['endpoints'].items():
+            p90 = counters['fetch']['p90']
+            lines.append('{:<14}{:>8}{:>9}{:>8}{:>6}{:>6}{:>8}{:>11.2f}{:>10.1f}{:>10.1f}{:>10.1f}{:>9}'.format(
+                endpoint, counters['calls'], counters['requests'], counters['retries'], counters['failures'],
+                counters['skipped'], counters['cached'], counters['bytes'] / 1024.0 ** 2, counters['fetch']['total'],
+                counters['parse']['total'], counters['retry']['total'], '>60000' if p90 is None else int(p90 * 1000)))
+        for error, count in sorted(summary['errors'].items(), key=lambda x: x[1], reverse=True):
+            lines.append('{} x {}'.format(count, error))
+        return '\n'.join(lines)
+
+
+class Trace(object):
+    """A hook writing every event as a JSON line to `path`."""
+    def __init__(self, path):
+        self.file = open(path, mode='w', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event._asdict()) + '\n'
+        with self.lock:
+            self.file.write(line)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def trace(path):
+    """Write every DBLP call to the JSON-lines file `path`, until remove_hook() is called with the returned Trace."""
+    return add_hook(Trace(path))
+
+
+# built-in counters of the whole run
+stats = add_hook(Stats())
@@ -1,34 +1,138 @@
 import dblp
 import jellyfish
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-inFile = open('dump-sorted-uniq.txt', mode = 'r')
-lines = inFile.read()
-print(lines)
-inFile.close()
-myAuthors = []
-count = 0
-
-# split on non-espcaped '
-currLineCommaSep = lines.split(", ")
-print("Quote separated: "+str(currLineCommaSep))
-# parse input -- everything between non-escaped quotes is a new author to add to list
-for newAuthor in currLineCommaSep:
-    if (newAuthor is not "" and newAuthor is not "\n" and not("," in newAuthor)):
-        print("Found author #"+str(count)+" : "+str(newAuthor))
-        # add each author to list
-        myAuthors.append(newAuthor.strip())
-        count = count + 1
-
-numAuthors = len(myAuthors)
-# now that we have all authors, run deduplication -- print out likely matches
-for currAuthor in range(numAuthors):
-    restOfAuthors = currAuthor + 1
-    # compare author with all subsequent authors, searching for close matches
-    while (restOfAuthors < numAuthors):
-        #print("Comparing "+str(currAuthor)+" to "+str(restOfAuthors))
-        similarity = jellyfish.jaro_winkler_similarity(myAuthors[currAuthor], myAuthors[restOfAuthors])
-        # arbitrary threshold at the moment -- anectdotally, anything less than this leads to a large number of false positives
-        if (similarity > 0.94):
-            print("Similarity ("+str(similarity)+"): "+myAuthors[currAuthor]+", "+myAuthors[restOfAuthors])
-        restOfAuthors += 1
+# arbitrary threshold at the moment -- anectdotally, anything less than this leads to a large number of false positives
+THRESHOLD = 0.94
+# number of neighbours each name is compared with after sorting (see candidate_pairs)
+WINDOW = 20
+# length of the q-grams the names are blocked on, and number of edits (insertions, deletions, substitutions) between
+# two names below which they always share a block (see qgram_blocks)
+QGRAM = 3
+MAX_EDITS = 2
+# q-gram blocks larger than this are not compared pair by pair: their q-gram is common (e.g. "son", "ang") even among
+# the rarest ones of their names, which are then left to the sorted neighbourhood
+MAX_BLOCK = 200
+# pairs scored per task sent to the process pool
+CHUNK_SIZE = 20000
+OUTPUT_FILE = 'dedup-candidates.txt'
+
+def read_authors(filename):
+    inFile = open(filename, mode = 'r')
+    lines = inFile.read()
+    print(lines)
+    inFile.close()
+    myAuthors = []
+    count = 0
+
+    # split on non-espcaped '
+    currLineCommaSep = lines.split(", ")
+    print("Quote separated: "+str(currLineCommaSep))
+    # parse input -- everything between non-escaped quotes is a new author to add to list
+    for newAuthor in currLineCommaSep:
+        if (newAuthor != "" and newAuthor != "\n" and not("," in newAuthor)):
+            print("Found author #"+str(count)+" : "+str(newAuthor))
+            # add each author to list
+            myAuthors.append(newAuthor.strip())
+            count = count + 1
+    return myAuthors
+
+def normalize(name):
+    return ''.join(c for c in name.lower() if c.isalnum() or c == ' ')
+
+def qgrams(name):
+    """Returns the set of q-grams (QGRAM characters) of a name, padded so that its first and last characters are in
+    as many q-grams as the others."""
+    padded = '#' * (QGRAM - 1) + name + '#' * (QGRAM - 1)
+    return set(padded[i:i+QGRAM] for i in range(len(padded) - QGRAM + 1))
+
+def qgram_blocks(normalized):
+    """Prefix filtering on q-grams: one edit changes at most QGRAM of the q-grams of a name, so two names within
+    MAX_EDITS edits share all but QGRAM * MAX_EDITS of their q-grams (or of the q-grams of the shorter one).  Each
+    name is then indexed by its QGRAM * MAX_EDITS + 1 rarest q-grams only: two names that close always share one of
+    them, and rare q-grams make small blocks, where common ones would make quadratic ones.
+    Returns:
+        The blocks: lists of indexes of `normalized` sharing an indexed q-gram, of at most MAX_BLOCK names.
+    """
+    grams = [qgrams(name) for name in normalized]
+    frequency = {}
+    for nameGrams in grams:
+        for gram in nameGrams:
+            frequency[gram] = frequency.get(gram, 0) + 1
+
+    blocks = {}
+    for i in range(len(normalized)):
+        # rarest first; ties are broken by the q-gram itself, so every name uses the same global order
+        prefix = sorted(grams[i], key=lambda gram: (frequency[gram], gram))[:QGRAM * MAX_EDITS + 1]
+        for gram in prefix:
+            blocks.setdefault(gram, []).append(i)
+    return [block for block in blocks.values() if len(block) <= MAX_BLOCK]
+
+def candidate_pairs(myAuthors):
+    """Blocking: instead of comparing every author with every other one, only compare authors that are likely to be
+    similar.  Names that are this similar (Jaro-Winkler > THRESHOLD) share most of their characters, in nearly the
+    same order: they end up close to each other either when sorting the names, or when sorting them reversed (for
+    names that differ in their first characters, e.g., a missing first name initial), and names a few edits apart
+    share one of their rare q-grams (see qgram_blocks).  The recall of these blocks, measured against comparing every
+    pair, is checked by tests/test_dedup.py.
+    Returns:
+        A set of (i, j) index pairs, i < j.
+    """
+    pairs = set()
+    normalized = [normalize(name) for name in myAuthors]
+
+    # sorted neighbourhood, on the names and on the reversed names
+    for sortKey in (lambda i: normalized[i], lambda i: normalized[i][::-1]):
+        order = sorted(range(len(myAuthors)), key=sortKey)
+        for pos in range(len(order)):
+            for other in order[pos+1:pos+1+WINDOW]:
+                pairs.add((min(order[pos], other), max(order[pos], other)))
+
+    for block in qgram_blocks(normalized):
+        for x in range(len(block)):
+            for y in range(x+1, len(block)):
+                pairs.add((block[x], block[y]))
+
+    return pairs
+
+def score_pairs(namePairs):
+    """Score a chunk of (name, name) pairs (runs in a worker process).
+    Returns:
+        The (similarity, name, name) tuples above THRESHOLD.
+    """
+    matches = []
+    for name1, name2 in namePairs:
+        similarity = jellyfish.jaro_winkler_similarity(name1, name2)
+        if (similarity > THRESHOLD):
+            matches.append((similarity, name1, name2))
+    return matches
+
+def main():
+    myAuthors = read_authors('dump-sorted-uniq.txt')
+    numAuthors = len(myAuthors)
+
+    start = time.time()
+    pairs = sorted(candidate_pairs(myAuthors))
+    print("Comparing "+str(len(pairs))+" candidate pairs instead of "+str(numAuthors*(numAuthors-1)//2))
+
+    # now that we have all candidate pairs, run deduplication in parallel -- collect likely matches
+    namePairs = [(myAuthors[i], myAuthors[j]) for i, j in pairs]
+    chunks = [namePairs[i:i+CHUNK_SIZE] for i in range(0, len(namePairs), CHUNK_SIZE)]
+    matches = []
+    with ProcessPoolExecutor(max_workers=multiprocessing.cpu_count()) as executor:
+        for chunkMatches in executor.map(score_pairs, chunks):
+            matches.extend(chunkMatches)
+
+    # most similar first
+    matches.sort(key=lambda match: match[0], reverse=True)
+    outFile = open(OUTPUT_FILE, mode = 'w')
+    for similarity, name1, name2 in matches:
+        print("Similarity ("+str(similarity)+"): "+name1+", "+name2)
+        outFile.write(str(similarity)+'\t'+name1+'\t'+name2+'\n')
+    outFile.close()
+    print("Found "+str(len(matches))+" likely duplicates in "+str(time.time()-start)+" seconds, written to "+OUTPUT_FILE)
+
+if __name__ == '__main__':
+    main()
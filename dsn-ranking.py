@@ -1,143 +1,284 @@
-import re
 import os
 import dblp
+import gzip
 import json
 import time
+import argparse
 import datetime
+import dblp.cache
+import dblp.dump
+import dblp.hof
+import dblp.journal
+import dblp.stats
+import dblp.matrix
+import dblp.retry
+from concurrent.futures import ThreadPoolExecutor
 
 ## Constants
 OUTPUT_DIR = './output-new'           # Output directory
-MIN_PAGES = 4                         # Min pages for a paper
-MATCH = ['DSN', 'FTCS']               # Venues considered
-# DOI considered (to filter out workshops)
-MATCH_DOI = [
-    '10\.1109/DSN([0-9]+)\.{}\.([0-9]+)',
-    '10\.1109/ICDSN\.{}\.([0-9]+)',
-    '10\.1109/DSN\.{}\.([0-9]+)',
-    '10\.1109\/FTCS\.{}\.([0-9]+)']
+# Venues (FTCS, then DSN) and papers considered: see dblp.hof.DSN
+CONFERENCE = dblp.hof.DSN
 # RECENT = 2014                        # Year for recent papers --- change: no hard coding required, figured out from DBLP
 RECENT_YEARS = 5                       # Number years span used to consider a publication as 'recent'
+CACHE_PATH = './dblp-cache.sqlite'     # Persistent cache of DBLP responses (None to disable)
+CACHE_TTL = 24 * 3600                  # Seconds a cached DBLP response is considered fresh
+CACHE_MAX_BYTES = 2 * 1024 ** 3        # Size bound of the response cache
+DBLP_RATE = 10                         # Max DBLP requests per second (DBLP answers 429 above its limit)
+AFFILIATION_WORKERS = 8                # Concurrent affiliation lookups
+AFFILIATION_MEMO = OUTPUT_DIR + '/affiliations.json'  # Affiliations found in previous runs, by pid
+AFFILIATION_TTL = 30 * 24 * 3600       # Seconds before a memoized affiliation is looked up again
+SNAPSHOT_DIR = OUTPUT_DIR + '/snapshots'  # Papers and authors of each venue-year, saved by previous runs
+SNAPSHOT_TTL = 30 * 24 * 3600          # Seconds before a venue-year snapshot is fetched again
+REFRESH_YEARS = 2                      # The last REFRESH_YEARS years are always fetched again (DBLP may be updating)
+VENUE_WORKERS = 4                      # Venue-years fetched at the same time
+JOURNAL_PATH = OUTPUT_DIR + '/journal.jsonl'  # Progress of the current run (venue-years, affiliations), for --resume
+STATS_PATH = OUTPUT_DIR + '/dblp-stats.json'  # Profile of the DBLP calls of the run (see dblp.stats)
+RANKING_DIR = './ranking'              # Ranking for the web page, split in files loaded on demand (see load.js)
+RANKING_TOP = 100                      # Rows shown on first load of the web page
+RANKING_PAGE_SIZE = 1000               # Rows per page file
 
 ## Global Variables
 authorList = {}
 
 
-def get_recent_pubs(pubs):
-    """Get the number of recent publications (using the `RECENT` constant as reference.
-    Args:
-        pubs: List of publications for the author.
-
-    Returns:
-        The number of publications that qualify as recent.
-    """
-    cc = 0
-    for key in pubs:
-        # in case the year has a suffix (e.g., LeeL17a)
-        try:
-            yyy = int(key[len(key) - 2:])
-        except:
-            yyy = int(key[len(key) - 3:len(key) - 1])
-        yyy = yyy + 1900 if yyy > 50 else yyy + 2000
-        if yyy >= RECENT:
-            cc += 1
-    return cc
-
-def update_authors(pid, name, key):
+def update_authors(pid, name, key, year):
     """Update the author list (`authorList`)
     Args:
         pid: Identifier of the author.
         name: Name of the author
         key: Key of the publication
+        year: Year of the publication
 
     Returns:
         None
     """
     if pid in authorList:
         author = authorList[pid]
-        author["pubs"].add(key)
+        author["pubs"][key] = year
         authorList[pid] = author
     else:
         author = {
             'name': name,
-            'pubs': {key}
+            'pubs': {key: year}
         }
         authorList[pid] = author
 
 
-def filter_papers(pub, venue):
-    """Filter out papers from the count (e.g., Industrial Track, Workshop papers, etc)
+def collect_venue(venue, hits=None):
+    """Collect the accepted papers of a venue and their authors.
+    Args:
+        venue: venue to search. The venue follows this format /conf/XXX/YYYY, where XXX is the abbrev of the conf and
+        YYYY correspond to the year of the conf.
+        hits: `info` dicts of the venue already at hand (e.g. read from the DBLP dump). If None, they are streamed
+        from the DBLP API, page by page.
+
     Returns:
-        True if the paper should be considered. False otherwise.
+        A snapshot of the venue: a dict with the hits accepted by `CONFERENCE.rules` ('papers'), the [pid, name, key] triples of
+        their authors ('authors'), the number of hits rejected for each reason ('rejected') and the time it was
+        collected ('time').
     """
-    year = int(venue[len(venue)-4:])
-    pags = 0
-
-    # Check number of pages. Discard keynotes or abstract
-    if 'pages' in pub:
-        if '-' not in pub['pages']:
-            pags = 1
+    papers = []
+    authors = []
+    rejected = {}
+    # No hits for the `conf/dsn/{}".format(year)` means either the venue prefix is wrong or there are no papers
+    # selected for the current year yet; the snapshot is then empty
+    if hits is None:
+        hits = dblp.search_pub_iter(venue)
+
+    # Filter out papers from the count (e.g., Industrial Track, Workshop papers, keynotes, etc)
+    for info, accepted, reason in CONFERENCE.rules.compile(int(venue[len(venue)-4:])).apply(hits):
+        if not accepted:
+            rejected[reason] = rejected.get(reason, 0) + 1
         else:
-            try:
-                pages = pub['pages'].split('-')
-                pags = int(pages[1]) - int(pages[0]) + 1
-            except:
-                # For some papers, pages does not include the finish page of the publication.
-                pags = 99
-    if pags < MIN_PAGES:
-        return False
-
-    # Filter out workshops, industry track, supplemental volume, etc
-    if pub["venue"] in MATCH:
-        # Papers from main conference can be distinguished by the doi. For example, a paper from a workshop has a doi
-        # with DSN-W.YYYY, while the papers from the main conference has a doi with DSN.YYYY.
-        # For some papers the doi is not available (e.g., https://dblp.uni-trier.de/rec/xml/conf/ftcs/HuangK93.xml)
-        for doi in MATCH_DOI:
-            try:
-                regex = r"%s" % doi.format(year)
-                match = re.search(regex, pub["doi"])
-                # print ("%s %s" % (regex, pub["doi"]))
-                if match != None:
-                # if doi.format(year) in pub["doi"]:
-                    return True
-            except:
-                # if the paper does not have a doi
-                return True
-
-    return False
-
-def get_authors(venue):
-    """Save the author list (in `authorList`) who had accepted papers in the conference.
+            papers.append(info)
+            # print(info)
+            if 'authors' in info:
+                if isinstance(info["authors"]["author"], list):
+                    for author in info["authors"]["author"]:
+                        authors.append([author["@pid"], author["text"], info["key"]])
+                else:
+                    author = info["authors"]["author"]
+                    authors.append([author["@pid"], author["text"], info["key"]])
+
+    return {'venue': venue, 'papers': papers, 'authors': authors, 'rejected': rejected, 'time': time.time()}
+
+def snapshot_path(venue):
+    return os.path.join(SNAPSHOT_DIR, venue.replace('/', '_') + '.json')
+
+def load_snapshot(venue):
+    """Load the snapshot of a venue saved by a previous run.
+    Returns:
+        The snapshot (see `collect_venue`), or None if there is none.
+    """
+    if not os.path.isfile(snapshot_path(venue)):
+        return None
+    with open(snapshot_path(venue), mode='r', encoding='utf-8') as snapshotFile:
+        return json.load(snapshotFile)
+
+def save_snapshot(snapshot):
+    path = snapshot_path(snapshot['venue'])
+    with open(path + '.tmp', mode='w', encoding='utf-8') as snapshotFile:
+        json.dump(snapshot, snapshotFile)
+    os.replace(path + '.tmp', path)
+
+def get_venue(venue, hits=None, refresh=True):
+    """Get the snapshot of a venue, from a previous run or from DBLP. Does not touch `authorList`, so several venues
+    can be fetched at the same time.
     Args:
         venue: venue to search. The venue follows this format /conf/XXX/YYYY, where XXX is the abbrev of the conf and
         YYYY correspond to the year of the conf.
+        hits: `info` dicts of the venue already at hand (e.g. read from the DBLP dump). If None, they are streamed
+        from the DBLP API, page by page.
+        refresh: if False, the snapshot saved by a previous run is reused, unless it is older than `SNAPSHOT_TTL`.
 
+    Returns:
+        The snapshot of the venue (see `collect_venue`)
+    """
+    snapshot = None if refresh else load_snapshot(venue)
+    if snapshot is None or time.time() - snapshot['time'] > SNAPSHOT_TTL:
+        snapshot = collect_venue(venue, hits)
+        # an empty answer is most likely a DBLP failure (or a conference not in DBLP yet): don't freeze it. Neither
+        # are hits of the dump saved: their authors may be keyed by name rather than pid (see dblp.dump.collect_hits),
+        # which a later run from the API would mix with its own
+        if snapshot['papers'] and hits is None:
+            save_snapshot(snapshot)
+    return snapshot
+
+def merge_venue(snapshot):
+    """Save the authors of a venue snapshot in the author list (`authorList`).
     Returns:
         The number of publications (main conference) for the venue
     """
-    papers=0
-    results = dblp.search_pub(venue)
+    # the year of the venue, rather than the one at the end of the key (e.g., LeeL17a, or a paper of the previous year)
+    year = int(snapshot['venue'][len(snapshot['venue'])-4:])
+    for pid, name, key in snapshot['authors']:
+        update_authors(pid, name, key, year)
 
-    hits = json.loads(results)["result"]["hits"]
+    return len(snapshot['papers'])
 
-    # No hits for the `conf/dsn/{}".format(year)`
-    # Most probably either the venue prefix is wrong or there are not paper selected year for the current year
-    if "hit" not in hits:
-        return 0
+def journaled_venue(journal, venue, hits=None, refresh=True):
+    """Get the snapshot of a venue (see `get_venue`) from the journal of the run being resumed, or get it and record
+    it in the journal.
+    Returns:
+        The snapshot of the venue (see `collect_venue`)
+    """
+    if venue in journal:
+        return journal[venue]
+    snapshot = get_venue(venue, hits, refresh)
+    # like snapshots, an empty answer is not recorded: it is fetched again when resuming
+    if snapshot['papers']:
+        journal.record(venue, snapshot)
+    return snapshot
+
+def get_authors(venue, hits=None, refresh=True):
+    """Save the author list (in `authorList`) who had accepted papers in the conference.
+    Args:
+        venue: venue to search (see `get_venue`).
+        hits: `info` dicts of the venue already at hand, or None.
+        refresh: if False, the snapshot saved by a previous run may be reused.
 
-    for i in hits["hit"]:
-        info = i["info"]
-        if  filter_papers(info, venue):
-            papers+=1
-            # print(info)
-            if 'authors' in info:
-                if isinstance(info["authors"]["author"], list):
-                    for author in info["authors"]["author"]:
-                        update_authors(author["@pid"], author["text"], info["key"])
-                else:
-                    author = info["authors"]["author"]
-                    update_authors(author["@pid"], author["text"], info["key"])
+    Returns:
+        The number of publications (main conference) for the venue
+    """
+    return merge_venue(get_venue(venue, hits, refresh))
 
-    return papers
+def lookup_affiliation(pid, name, memo, journal=None):
+    """Get the affiliation of an author, from the memo of previous runs if it is recent enough.
+    Args:
+        pid: Identifier of the author.
+        name: Name of the author
+        memo: dict pid -> {'name', 'affiliation', 'time'}, updated with the affiliations looked up in DBLP.
+        journal: a dblp.journal.Journal the affiliations looked up are recorded in, or None.
+
+    Returns:
+        The affiliation, "" if DBLP does not know it, or "Unknown" if the lookup failed.
+    """
+    entry = memo.get(pid)
+    if entry is not None and entry['name'] == name and time.time() - entry['time'] <= AFFILIATION_TTL:
+        return entry['affiliation']
+    try:
+        affiliation = dblp.get_affiliation(pid, name)
+    except Exception as e:
+        print ('{} {}: affiliation not found. Error {}'.format(pid, name, e))
+        return "Unknown"
+    memo[pid] = {'name': name, 'affiliation': affiliation, 'time': time.time()}
+    if journal is not None:
+        journal.record('affiliation/' + pid, memo[pid])
+    return affiliation
+
+def get_affiliations(authors, journal=None):
+    """Get the affiliations of a list of authors, looking them up concurrently (`AFFILIATION_WORKERS`) and
+    remembering them across runs (`AFFILIATION_MEMO`).
+    Args:
+        authors: List of (pid, name) tuples.
+        journal: a dblp.journal.Journal; the affiliations it holds (from the run being resumed) are not looked up
+        again, and the ones looked up are recorded in it. None for no journal.
+
+    Returns:
+        The list of affiliations, in the order of `authors`.
+    """
+    memo = {}
+    if os.path.isfile(AFFILIATION_MEMO):
+        with open(AFFILIATION_MEMO, mode='r', encoding='utf-8') as memoFile:
+            memo = json.load(memoFile)
+    if journal is not None:
+        for key, entry in journal.entries.items():
+            if key.startswith('affiliation/'):
+                memo[key[len('affiliation/'):]] = entry
+
+    # map() returns the results in the order of the input, whatever order the lookups complete in
+    with ThreadPoolExecutor(max_workers=AFFILIATION_WORKERS) as executor:
+        affiliations = list(executor.map(lambda author: lookup_affiliation(author[0], author[1], memo, journal),
+                                       authors))
+
+    with open(AFFILIATION_MEMO + '.tmp', mode='w', encoding='utf-8') as memoFile:
+        json.dump(memo, memoFile)
+    os.replace(AFFILIATION_MEMO + '.tmp', AFFILIATION_MEMO)
+
+    return affiliations
+
+def write_file(path, content):
+    """Write `content` (str) to `path` atomically, together with a precompressed `path`.gz.
+    """
+    data = content.encode('utf-8')
+    for filePath, fileData in ((path, data), (path + '.gz', gzip.compress(data, 9, mtime=0))):
+        with open(filePath + '.tmp', mode='wb') as outFile:
+            outFile.write(fileData)
+        os.replace(filePath + '.tmp', filePath)
+
+def write_shards(data):
+    """Write the ranking for the web page in `RANKING_DIR`: the first `RANKING_TOP` rows (top.json), the whole ranking
+    split in pages of `RANKING_PAGE_SIZE` rows (page-N.json), and a manifest listing them (manifest.json). Each file
+    is compact JSON, with a gzipped copy next to it.
+    Args:
+        data: the ranking, in the format of ranking.json.
+
+    Returns:
+        None
+    """
+    if not os.path.isdir(RANKING_DIR):
+        os.makedirs(RANKING_DIR)
+    compact = lambda value: json.dumps(value, separators=(',', ':'))
+
+    pages = []
+    for start in range(0, len(data), RANKING_PAGE_SIZE):
+        pages.append('page-{}.json'.format(len(pages)))
+        write_file(os.path.join(RANKING_DIR, pages[-1]), compact(data[start:start + RANKING_PAGE_SIZE]))
+    write_file(os.path.join(RANKING_DIR, 'top.json'), compact(data[:RANKING_TOP]))
+    # the manifest is written last: the page never sees a manifest listing pages that are not there yet
+    write_file(os.path.join(RANKING_DIR, 'manifest.json'), compact({
+        'total': len(data),
+        'top': 'top.json',
+        'topSize': min(RANKING_TOP, len(data)),
+        'pageSize': RANKING_PAGE_SIZE,
+        'pages': pages,
+        'updated': time.strftime("%Y-%m-%d"),
+    }))
+
+    # pages left over from a previous, longer ranking
+    for name in os.listdir(RANKING_DIR):
+        if name.startswith('page-') and name.split('.')[0] + '.json' not in pages:
+            os.remove(os.path.join(RANKING_DIR, name))
 
 def usage():
     """Print out script usage.
@@ -148,13 +289,23 @@ def usage():
         else:
             dir = OUTPUT_DIR
         os.makedirs(dir)
+    if not os.path.isdir(SNAPSHOT_DIR):
+        os.makedirs(SNAPSHOT_DIR)
 
     return True
 
 
 
-def main():
+def main(dump=None, refresh=False, resume=False, trace=None):
     """Main Function
+    Args:
+        dump: path of the DBLP XML dump (dblp.xml.gz). If given, the venues and affiliations are read from the dump
+        in a single local pass instead of being queried through the DBLP API.
+        refresh: fetch every venue-year again, instead of reusing the snapshots of years that cannot have changed.
+        resume: continue an interrupted run: the venue-years and affiliations recorded in its journal (`JOURNAL_PATH`)
+        are not fetched again.
+        trace: path of a JSON-lines file every DBLP call is written to (see dblp.stats.trace), or None.
+
     Returns:
         None
 
@@ -163,55 +314,88 @@ def main():
     if not usage():
         exit(1)
 
+    dblp.configure(pool_size=max(AFFILIATION_WORKERS, VENUE_WORKERS), rate=DBLP_RATE)
+    if CACHE_PATH is not None:
+        dblp.set_cache(dblp.cache.SQLiteCache(CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES))
+
     # Getting the year used to determine 'recent' publications
     cyear = datetime.datetime.now().year
     cyear = int(cyear) + 1
-    global RECENT
     RECENT = cyear - RECENT_YEARS
 
 
     print ('Last: {} | Recent papers since: {}'.format(cyear-1, RECENT))
 
-    outFile = open(OUTPUT_DIR + '/dsnHOF-' + time.strftime("%Y%m%d-%H%M%S"), mode='a', encoding='utf-8')
+    if trace is not None:
+        trace = dblp.stats.trace(trace)
+    journal = dblp.journal.Journal(JOURNAL_PATH, resume)
+    if resume:
+        print ('Resuming: {} venue-years and affiliations already done'.format(len(journal)))
 
-    # FTCS (1988-1999)
-    print ('Processing FTCS (1988, 1999)')
-    for year in range(1988,2000):
-        print(" * Processing year {}: {}".format(year, get_authors("conf/ftcs/{}".format(year))))
+    outFile = open(OUTPUT_DIR + '/dsnHOF-' + time.strftime("%Y%m%d-%H%M%S"), mode='a', encoding='utf-8')
 
-    # DSN (2000-now)
-    print ('Processing DSN (2000, %d)' % (cyear-1))
-    for year in range(2000,cyear):
-        print(" * Processing year {}: {}".format(year, get_authors("conf/dsn/{}".format(year))))
+    venueHits = {}
+    affiliations = None
+    if dump is not None:
+        print ('Reading DBLP dump {}'.format(dump))
+        affiliations = {}
+        venues = [venue for venue, year in CONFERENCE.venue_years(cyear - 1)]
+        venueHits = dblp.dump.collect_hits(dump, venues, affiliations)
+
+    # FTCS (1988-1999), then DSN (2000-now), announced by the first year of each
+    headings = dict(('{}/{}'.format(prefix, first), 'Processing {} ({}, {})'.format(
+        prefix.split('/')[-1].upper(), first, last or cyear - 1)) for prefix, first, last in CONFERENCE.venues)
+    # proceedings of past years are frozen: only recent years (or missing/stale snapshots) are fetched again
+    venueYears = [(venue, year, refresh or dump is not None or year >= cyear - REFRESH_YEARS)
+                  for venue, year in CONFERENCE.venue_years(cyear - 1)]
+
+    # Venue-years are fetched concurrently, but map() returns the snapshots in the order above, and they are merged in
+    # that order: `authorList` ends up exactly as with a sequential run
+    # a venue-year DBLP could not answer in full is neither saved nor ranked: the run stops, and the venue-years
+    # recorded in the journal meanwhile are not fetched again with --resume
+    try:
+        with ThreadPoolExecutor(max_workers=VENUE_WORKERS) as executor:
+            snapshots = executor.map(lambda v: journaled_venue(journal, v[0], venueHits.get(v[0]), v[2]), venueYears)
+
+            for (venue, year, yearRefresh), snapshot in zip(venueYears, snapshots):
+                if venue in headings:
+                    print (headings[venue])
+                print(" * Processing year {}: {}".format(year, merge_venue(snapshot)))
+    except dblp.retry.RetryError as e:
+        print("ERROR: " + str(e) + ", the ranking is not written; run again with --resume to continue")
+        journal.close()
+        if trace is not None:
+            dblp.stats.remove_hook(trace)
+            trace.close()
+        exit(1)
 
-    for pid in authorList:
+    # author x year paper counts: totals and recent papers are column sums
+    matrix = dblp.matrix.PublicationMatrix.from_authors(authorList)
+    totals = matrix.totals()
+    recent = matrix.recent(cyear - 1, RECENT_YEARS)
+    for row, pid in enumerate(matrix.pids):
         author = authorList[pid]
-        author['total'] = len (author["pubs"])
-        author['recent'] = get_recent_pubs(author["pubs"])
+        author['total'] = int(totals[row])
+        author['recent'] = int(recent[row])
         authorList[pid] = author
 
-        outFile.write("{}\t{}\t{}\t{}\n".format(author["name"], author["total"], author["recent"], author["pubs"]))
+        outFile.write("{}\t{}\t{}\t{}\n".format(author["name"], author["total"], author["recent"], set(author["pubs"])))
 
     outFile.flush()
 
     # Sort by total publications
-    rank=1
-    last_total=0
-    i=1
-    data = []
-    for key, value in sorted(authorList.items(), key=lambda x : x[1]['total'], reverse=True):
+    ranked = []
+    for i, rank, row in matrix.rank(totals, limit=90000):
+        key = matrix.pids[row]
+        ranked.append((i, rank, key, authorList[key]))
 
-        if i > 90000 and last_total != value['total']:
-            break
-
-        if last_total != value['total']: rank = i
-        try:
-            affiliation = dblp.get_affiliation(key, value['name'])
-        except Exception as e:
-            affiliation = "Unknown"
-            print ('{} {}: affiliation not found. Error {}' % 
-                key, value['name'], e)
+    if affiliations is not None:
+        rankedAffiliations = [affiliations.get(key, "") for i, rank, key, value in ranked]
+    else:
+        rankedAffiliations = get_affiliations([(key, value['name']) for i, rank, key, value in ranked], journal)
 
+    data = []
+    for (i, rank, key, value), affiliation in zip(ranked, rankedAffiliations):
         print(f"""{rank}\t{key}\t{value['name']}\t{value['total']}\t{value['recent']}\t{affiliation}""")
         # print ('{}\t{}\t{}\t{}\t{}\t{}\t{}'.format(i, rank, key, value['name'], value['total'], value['recent'], affiliation))
         data.append({
@@ -224,11 +408,21 @@ def main():
             'affiliation': affiliation
         })
 
-        i+=1
-        last_total = value['total']
-
     with open('./ranking.json', mode='w', encoding='utf-8') as jsonFile:
         json.dump(data, jsonFile, indent=4)
+    write_shards(data)
+
+    journal.close()
+    if trace is not None:
+        dblp.stats.remove_hook(trace)
+        trace.close()
+
+    # where the time went: calls, retries, bytes and time per DBLP endpoint
+    print(dblp.stats.stats.format())
+    dblp.stats.stats.dump(STATS_PATH)
+
+    if dblp.get_cache() is not None:
+        print('DBLP cache: {}'.format(dblp.get_cache().stats()))
 
 
 def test():
@@ -249,5 +443,18 @@ def test():
 
 
 if __name__ == '__main__':
-    # main()
-    test()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Compute the DSN Hall of Fame ranking from DBLP.')
+    parser.add_argument('--dump', help='build the ranking from a local DBLP XML dump (dblp.xml.gz) '
+                                       'instead of the DBLP API')
+    parser.add_argument('--refresh', action='store_true', help='fetch every venue-year again, ignoring the '
+                                                                  'snapshots of previous runs')
+    parser.add_argument('--resume', action='store_true', help='continue an interrupted run, without fetching again '
+                                                                 'what its journal records as done')
+    parser.add_argument('--trace', help='write every DBLP call (endpoint, time, retries, ...) to this JSON-lines file')
+    parser.add_argument('--test', action='store_true', help='only run the affiliation lookup test')
+    args = parser.parse_args()
+
+    if args.test:
+        test()
+    else:
+        main(args.dump, args.refresh, args.resume, args.trace)
\ No newline at end of file
@@ -0,0 +1,145 @@
+import os
+import dblp
+import json
+import time
+import argparse
+import datetime
+import dblp.hof
+import dblp.cache
+import dblp.retry
+import dblp.stats
+from concurrent.futures import ThreadPoolExecutor
+
+## Constants
+OUTPUT_DIR = './output-hof'            # Output directory
+CACHE_PATH = './dblp-cache.sqlite'     # Persistent cache of DBLP responses, shared by all conferences (None to disable)
+CACHE_TTL = 24 * 3600                  # Seconds a cached DBLP response is considered fresh
+DBLP_RATE = 10                         # Max DBLP requests per second (DBLP answers 429 above its limit)
+VENUE_WORKERS = 4                      # Venue-years fetched at the same time
+AFFILIATION_WORKERS = 8                # Concurrent affiliation lookups
+RANKING_LIMIT = 90000                  # Rows kept in each ranking (authors tied with the last one are kept too)
+STATS_PATH = OUTPUT_DIR + '/dblp-stats.json'  # Profile of the DBLP calls of the run (see dblp.stats)
+
+## Conference definitions (see dblp.hof.Conference)
+CONFERENCES = [dblp.hof.DSN, dblp.hof.ISCA]
+
+
+def get_affiliations(rows, affiliations):
+    """Set the 'affiliation' of every ranking row: from `affiliations` (read from the DBLP dump) if given, otherwise
+    looked up in DBLP, as dsn-ranking.py does.
+    Returns:
+        None
+    """
+    if affiliations is not None:
+        for row in rows:
+            row['affiliation'] = affiliations.get(row['pid'], "")
+        return
+
+    def lookup(row):
+        try:
+            return dblp.get_affiliation(row['pid'], row['author'])
+        except Exception as e:
+            print ('{} {}: affiliation not found. Error {}'.format(row['pid'], row['author'], e))
+            return "Unknown"
+
+    with ThreadPoolExecutor(max_workers=AFFILIATION_WORKERS) as executor:
+        for row, affiliation in zip(rows, executor.map(lookup, rows)):
+            row['affiliation'] = affiliation
+
+
+def write_ranking(ranking, last_year, affiliations):
+    """Write the outputs of one conference: its ranking (in the format of ranking.json) and, if it has a hall of fame,
+    the members, the chairs and the authors close to joining.
+    """
+    conference = ranking.conference
+    rows = ranking.rows(last_year, RANKING_LIMIT)
+    for row in rows:
+        row['hof'] = conference.threshold is not None and row['total'] >= conference.threshold
+    get_affiliations(rows, affiliations)
+
+    print ('{}: {} authors, rejected hits {}'.format(conference.name, len(rows), ranking.rejected))
+    with open(os.path.join(OUTPUT_DIR, conference.name.lower() + '-ranking.json'), mode='w',
+              encoding='utf-8') as jsonFile:
+        json.dump([dict((k, v) for k, v in row.items() if k not in ('pid', 'hof')) for row in rows], jsonFile,
+                  indent=4)
+
+    if conference.threshold is None:
+        return
+
+    outFile = open(os.path.join(OUTPUT_DIR, conference.name.lower() + 'HOF-' + time.strftime("%Y%m%d-%H%M%S")),
+                   mode='a', encoding='utf-8')
+    outFile.write('{} HOF members:\n'.format(conference.name))
+    for row in rows:
+        if row['hof']:
+            outFile.write('{}: {}\n'.format(row['author'], row['total']))
+
+    outFile.write('\n{} Chairs:\n'.format(conference.name))
+    for pid, name, year in sorted(ranking.chairs, key=lambda chair: chair[2], reverse=True):
+        outFile.write('{}: {}\n'.format(name, year))
+
+    outFile.write('\nClose to joining HOF:\n')
+    for row in rows:
+        if conference.close <= row['total'] < conference.threshold:
+            outFile.write('{}: {}\n'.format(row['author'], row['total']))
+    outFile.close()
+
+
+def main(names=None, dump=None, trace=None):
+    """Main Function
+    Args:
+        names: names of the conferences to rank, or None for all of `CONFERENCES`.
+        dump: path of the DBLP XML dump (dblp.xml.gz). If given, every conference is read from the dump in a single
+        local pass instead of being queried through the DBLP API.
+        trace: path of a JSON-lines file every DBLP call is written to (see dblp.stats.trace), or None.
+
+    Returns:
+        None
+    """
+    if not os.path.isdir(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+    dblp.configure(pool_size=max(AFFILIATION_WORKERS, VENUE_WORKERS), rate=DBLP_RATE)
+    if CACHE_PATH is not None:
+        dblp.set_cache(dblp.cache.SQLiteCache(CACHE_PATH, ttl=CACHE_TTL))
+
+    conferences = [c for c in CONFERENCES if names is None or c.name in names]
+    last_year = datetime.datetime.now().year
+    affiliations = {} if dump is not None else None
+
+    if trace is not None:
+        trace = dblp.stats.trace(trace)
+
+    print ('Ranking {} up to {}'.format(', '.join(c.name for c in conferences), last_year))
+    try:
+        rankings = dblp.hof.rank_conferences(conferences, last_year, dump, affiliations, VENUE_WORKERS)
+    except dblp.retry.RetryError as e:
+        print("ERROR: " + str(e) + ", no ranking is written")
+        if trace is not None:
+            dblp.stats.remove_hook(trace)
+            trace.close()
+        exit(1)
+    for ranking in rankings.values():
+        write_ranking(ranking, last_year, affiliations)
+
+    if trace is not None:
+        dblp.stats.remove_hook(trace)
+        trace.close()
+
+    # where the time went: calls, retries, bytes and time per DBLP endpoint
+    print(dblp.stats.stats.format())
+    dblp.stats.stats.dump(STATS_PATH)
+
+    if dblp.get_cache() is not None:
+        print('DBLP cache: {}'.format(dblp.get_cache().stats()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute the hall of fame of several conferences from one DBLP pass.')
+    parser.add_argument('conferences', nargs='*', help='conferences to rank (default: all of {})'.format(
+        ', '.join(c.name for c in CONFERENCES)))
+    parser.add_argument('--dump', help='read the conferences from a local DBLP XML dump (dblp.xml.gz) '
+                                       'instead of the DBLP API')
+    parser.add_argument('--trace', help='write every DBLP call (endpoint, time, retries, ...) to this JSON-lines file')
+    args = parser.parse_args()
+
+    main(args.conferences or None, args.dump, args.trace)
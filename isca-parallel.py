@@ -1,5 +1,10 @@
 import dblp
+import dblp.cache
+import dblp.stats
 import time
+import argparse
+import dblp.journal
+import dblp.retry
 import threading
 import multiprocessing
 
@@ -12,10 +17,44 @@ def sortFunc(authorEntries):
 def sortChairsFunc(chairEntries):
     return chairEntries[1]
 
+# add an author with their number of ISCA publications
+def addAuthor(person, count):
+    authorTuple = (person, count)
+    # insert people likely to not be in HOF at the end, to reduce number of swaps a little
+    if (count >= 1 and count < 8):
+        #with lockInsert:
+        iscaEntries.append(authorTuple)
+    # just insert at beginning of list if in HOF -- likely to be towards beginning
+    elif (count >= 8):
+        #with lockInsert:
+        iscaEntries.insert(0, authorTuple)
+    # if no ISCA publications, don't insert them
+
+# add the results of a person recorded in the journal: the count of each author with that name, and the chairs
+def addJournalEntry(person, results):
+    for year in results['chairs']:
+        chairList.insert(0, (person, year))
+    for count in results['counts']:
+        addAuthor(person, count)
+
+# record each author as it is done, so an interrupted run can be resumed with --resume
+parser = argparse.ArgumentParser(description='Compute the ISCA Hall of Fame from DBLP.')
+parser.add_argument('--resume', action='store_true', help='continue an interrupted run, without searching DBLP again '
+                                                         'for the authors its journal records as done')
+parser.add_argument('--trace', help='write every DBLP call (endpoint, time, retries, ...) to this JSON-lines file')
+parser.add_argument('--parse-workers', type=int, default=0, help='decode the DBLP pages in this many processes, while '
+                                                               'the threads keep fetching (default: in the threads)')
+args = parser.parse_args()
+trace = dblp.stats.trace(args.trace) if args.trace else None
+
 # write all info to a file -- append for now, in case file already exists
 filename_pt2 = time.strftime("%Y%m%d-%H%M%S")
 outFile = open('/nobackup/iscaHOF/iscaHOF-'+filename_pt2, 'a')
 
+# keep DBLP responses on disk, so a re-run only fetches person/publication pages older than a day
+dblp.set_cache(dblp.cache.SQLiteCache('/nobackup/iscaHOF/dblp-cache.sqlite', ttl=24*3600))
+journal = dblp.journal.Journal('/nobackup/iscaHOF/iscaHOF-parallel-journal.jsonl', args.resume)
+
 # Can't search DBLP by conference, except for Chair's Welcome, so need to search by name
 # small, easier to test
 iscaAuthors1 = ['Joshua San Miguel', 'Matthew D. Sinclair']
@@ -32,7 +71,10 @@ chairList = []
 chairWelcome1 = "Proceedings of the"
 chairWelcome2 = "International Symposium on Computer Architecture"
 numThreads = multiprocessing.cpu_count()
-lock = threading.Lock() # for searching DBLP
+# one pooled DBLP connection per thread, and a request rate DBLP tolerates without answering 429
+dblp.configure(pool_size=numThreads, rate=10, burst=numThreads)
+# with many threads, parsing (which holds the GIL) is the bottleneck: decode in other processes, started before the threads
+parsePool = dblp.start_parse_pool(args.parse_workers) if args.parse_workers > 0 else None
 # currently don't use this lock, because the insertions don't need to have a strict order
 lockInsert = threading.Lock() # for inserting into shared arrays
 
@@ -48,13 +90,25 @@ def parallel_search(threadNum):
         # start with my thread number, increment by numThreads -- static indices per thread
         for personNum in range(threadNum, len(iscaAuthors), numThreads):
             person = iscaAuthors[personNum]
+            if (person in journal):
+                addJournalEntry(person, journal[person])
+                continue
             print("Thread "+threadNumStr+": Searching DBLP for "+str(person))
             outFile_thr.write('Searching DBLP for '+str(person)+'\n')
 
-            # the DBLP search calls and the surrounding class seem to require being called with
-            # a lock, or else the calls fight each other for populating the fields
-            with lock:
-                currAuthors = dblp.search(person)
+            # DBLP objects load their fields thread-safely, so threads search and load in parallel
+            # full=True loads every publication of an author from its person record, in one request
+            try:
+                currAuthors = dblp.search(person, full=True)
+                # homonyms are loaded lazily: load them here too, so a failure skips the whole person
+                for currAuthor in currAuthors:
+                    currAuthor.publications
+            # DBLP could not be reached, even after backing off: not journaled, so --resume searches them again
+            except dblp.retry.RetryError as e:
+                print("    ERROR: Thread "+threadNumStr+": "+str(e)+", skipping "+person)
+                outFile_thr.write('    ERROR: '+str(e)+', skipping '+person+'\n')
+                continue
+            results = {'counts': [], 'chairs': []}
 
             numWithName = len(currAuthors)
             if (numWithName > 1):
@@ -72,12 +126,10 @@ def parallel_search(threadNum):
                 outFile_thr.write('    '+str(numPubs)+' DBLP entries.  ISCA publications, if any:\n') # DEBUG PRINT
 
                 for i in range(numPubs):
-                    # since the currAuthor fields are loaded lazily, need to access fields with a lock
-                    with lock:
-                        conf = currAuthor.publications[i].booktitle
-                        title = currAuthor.publications[i].title
-                        year = currAuthor.publications[i].year
-                        pages = currAuthor.publications[i].pages
+                    conf = currAuthor.publications[i].booktitle
+                    title = currAuthor.publications[i].title
+                    year = currAuthor.publications[i].year
+                    pages = currAuthor.publications[i].pages
 
                     if (conf == "ISCA"):
                         # The Chair's Welcome is flagged as an ISCA publication, and the title is always "Proceedings of the ..."
@@ -100,24 +152,18 @@ def parallel_search(threadNum):
                             chairTuple = (person, year)
                             #with lockInsert:
                             chairList.insert(0, chairTuple)
+                            results['chairs'].append(year)
 
                 ##print("    Thread "+threadNumStr+": Total ISCA publications: "+str(count)) # DEBUG PRINT
                 outFile_thr.write('    Total ISCA publications: '+str(count)+'\n') # DEBUG PRINT
 
                 # just create a separate script to print out all entries for each person (or grab from debug prints above), instead of complicating data structures here
-                authorTuple = (person, count)
-                # insert people likely to not be in HOF at the end, to reduce number of swaps a little
-                if (count >= 1 and count < 8):
-                    #with lockInsert:
-                    iscaEntries.append(authorTuple)
-                # just insert at beginning of list if in HOF -- likely to be towards beginning
-                elif (count >= 8):
-                    #with lockInsert:
-                    iscaEntries.insert(0, authorTuple)
-                # if no ISCA publications, don't insert them
+                addAuthor(person, count)
+                results['counts'].append(count)
 
                 count = 0 # reset count for each person
                 outFile_thr.flush()
+            journal.record(person, results)
         outFile_thr.close()
 
 ##print("Main    : before creating thread, numThreads: "+str(numThreads))
@@ -133,6 +179,9 @@ for i, thread in enumerate(threads):
     ##print("Main    : before joining thread "+str(i))
     thread.join()
     ##print("Main    : thread "+str(i)+" done")
+if parsePool is not None:
+    dblp.set_parse_pool(None)
+    parsePool.shutdown()
 
 # Sort all authors with ISCA publications by count (once done going through all authors)
 iscaEntriesSorted = sorted(iscaEntries, reverse=True, key=sortFunc)
@@ -174,3 +223,12 @@ for hofAuthor in iscaEntriesSorted:
         outFile.write(hofAuthor[0]+': '+str(hofAuthor[1])+'\n')
         outFile.flush()
 outFile.close()
+
+print("DBLP cache: "+str(dblp.get_cache().stats()))
+print("Shared publications: "+str(dblp.publication_registry.stats()))
+# where the time went: calls, retries, bytes and time per DBLP endpoint
+print(dblp.stats.stats.format())
+if trace is not None:
+    dblp.stats.remove_hook(trace)
+    trace.close()
+dblp.stats.stats.dump('/nobackup/iscaHOF/iscaHOF-stats-'+filename_pt2+'.json')
@@ -0,0 +1,93 @@
+import dblp
+import time
+import argparse
+import datetime
+import dblp.hof
+import dblp.cache
+import dblp.stats
+
+# Instead of searching DBLP for every name of a list of authors and loading all of their publications, this version
+# enumerates the ISCA proceedings year by year (like dsn-ranking.py does for DSN): the number of requests grows with
+# the number of ISCA papers, not with the total output of their authors. Authors are keyed by their DBLP pid, so two
+# people with the same name are counted separately, and authors missing from a name list are not forgotten.
+
+# sorting function
+# sorts based on count (second field)
+def sortFunc(authorEntries):
+    return authorEntries[1]
+
+# sorts based on year for chairs (second field)
+def sortChairsFunc(chairEntries):
+    return chairEntries[1]
+
+parser = argparse.ArgumentParser(description='Compute the ISCA Hall of Fame from the ISCA proceedings in DBLP.')
+parser.add_argument('--dump', help='read the proceedings from a local DBLP XML dump (dblp.xml.gz) instead of the '
+                                   'DBLP API')
+args = parser.parse_args()
+
+# write all info to a file -- append for now, in case file already exists
+filename_pt2 = time.strftime("%Y%m%d-%H%M%S")
+outFile = open('/nobackup/iscaHOF/iscaHOF-venue-'+filename_pt2, 'a')
+
+# keep DBLP responses on disk, so a re-run only fetches the proceedings older than a day
+dblp.set_cache(dblp.cache.SQLiteCache('/nobackup/iscaHOF/dblp-cache.sqlite', ttl=24*3600))
+# keep-alive connections to DBLP, at a request rate it tolerates without answering 429
+dblp.configure(pool_size=4, rate=10)
+
+lastYear = datetime.datetime.now().year
+rankings = dblp.hof.rank_conferences([dblp.hof.ISCA], lastYear, dump=args.dump)
+ranking = rankings['ISCA']
+
+iscaEntries = []
+for pid, author in ranking.authors.items():
+    person = author['name']
+    outFile.write('ISCA publications of '+person+' ('+pid+'):\n')
+    count = 0
+    for key, year in sorted(author['pubs'].items(), key=lambda pub: pub[1]):
+        count = count + 1
+        # some DBLP hits have no title
+        outFile.write('        '+str(count)+'. ISCA '+str(year)+': '+str(ranking.papers[key].get('title'))+'\n')
+    outFile.write('    Total ISCA publications: '+str(count)+'\n')
+    iscaEntries.append((person, count))
+outFile.write('\nIgnored ISCA entries (keynotes, abstracts, ...): '+str(ranking.rejected)+'\n')
+outFile.flush()
+
+chairList = [(name, year) for pid, name, year in ranking.chairs]
+
+# Sort all authors with ISCA publications by count
+iscaEntriesSorted = sorted(iscaEntries, reverse=True, key=sortFunc)
+outFile.write(str(iscaEntriesSorted))
+
+# Sort chairs too, by year
+chairListSorted = sorted(chairList, reverse=True, key=sortChairsFunc)
+outFile.write('\n')
+outFile.write(str(chairListSorted))
+outFile.flush()
+
+# print out all authors with >= 8 ISCA publications
+outFile.write('\nISCA HOF members:\n')
+for hofAuthor in iscaEntriesSorted:
+    if (hofAuthor[1] >= dblp.hof.ISCA.threshold):
+        print(hofAuthor[0]+": "+str(hofAuthor[1]))
+        outFile.write(hofAuthor[0]+': '+str(hofAuthor[1])+'\n')
+outFile.flush()
+
+outFile.write('\nISCA Chairs:\n')
+for chair in chairListSorted:
+    print(chair[0]+": "+str(chair[1]))
+    outFile.write(chair[0]+': '+str(chair[1])+'\n')
+outFile.flush()
+
+# print out all authors near joining (6 or 7 publications):
+print("") # line of space
+print("Close to joining HOF:")
+outFile.write('\nClose to joining HOF:\n')
+for hofAuthor in iscaEntriesSorted:
+    if (hofAuthor[1] < dblp.hof.ISCA.threshold and hofAuthor[1] >= dblp.hof.ISCA.close):
+        print(hofAuthor[0]+": "+str(hofAuthor[1]))
+        outFile.write(hofAuthor[0]+': '+str(hofAuthor[1])+'\n')
+outFile.flush()
+outFile.close()
+
+print("DBLP cache: "+str(dblp.get_cache().stats()))
+print(dblp.stats.stats.format())
@@ -1,5 +1,10 @@
 import dblp
+import dblp.cache
+import dblp.stats
 import time
+import argparse
+import dblp.journal
+import dblp.retry
 
 # sorting function
 # sorts based on count (second field)
@@ -10,10 +15,42 @@ def sortFunc(authorEntries):
 def sortChairsFunc(chairEntries):
     return chairEntries[1]
 
+# add an author with their number of ISCA publications
+def addAuthor(person, count):
+    authorTuple = (person, count)
+    # insert people likely to not be in HOF at the end, to reduce number of swaps a little
+    if (count >= 1 and count < 8):
+        iscaEntries.append(authorTuple)
+    # just insert at beginning of list if in HOF -- likely to be towards beginning
+    elif (count >= 8):
+        iscaEntries.insert(0, authorTuple)
+    # if no ISCA publications, don't insert them
+
+# add the results of a person recorded in the journal: the count of each author with that name, and the chairs
+def addJournalEntry(person, results):
+    for year in results['chairs']:
+        chairList.insert(0, (person, year))
+    for count in results['counts']:
+        addAuthor(person, count)
+
+# record each author as it is done, so an interrupted run can be resumed with --resume
+parser = argparse.ArgumentParser(description='Compute the ISCA Hall of Fame from DBLP.')
+parser.add_argument('--resume', action='store_true', help='continue an interrupted run, without searching DBLP again '
+                                                         'for the authors its journal records as done')
+parser.add_argument('--trace', help='write every DBLP call (endpoint, time, retries, ...) to this JSON-lines file')
+args = parser.parse_args()
+trace = dblp.stats.trace(args.trace) if args.trace else None
+
 # write all info to a file -- append for now, in case file already exists
 filename_pt2 = time.strftime("%Y%m%d-%H%M%S")
 outFile = open('/nobackup/iscaHOF/iscaHOF-'+filename_pt2, 'a')
 
+# keep DBLP responses on disk, so a re-run only fetches person/publication pages older than a day
+dblp.set_cache(dblp.cache.SQLiteCache('/nobackup/iscaHOF/dblp-cache.sqlite', ttl=24*3600))
+journal = dblp.journal.Journal('/nobackup/iscaHOF/iscaHOF-journal.jsonl', args.resume)
+# keep-alive connection to DBLP, at a request rate it tolerates without answering 429
+dblp.configure(pool_size=1, rate=10)
+
 # small, easier to test
 iscaAuthors1 = ['Joshua San Miguel', 'Matthew D. Sinclair']
 iscaAuthors2 = ['Matthew D. Sinclair', 'Mikko Lipasti', 'Karu Sankaralingam', 'Nam Sung Kim']
@@ -30,10 +67,24 @@ chairWelcome1 = "Proceedings of the"
 chairWelcome2 = "International Symposium on Computer Architecture"
 for personNum in range(len(iscaAuthors)):
     person = iscaAuthors[personNum]
+    if (person in journal):
+        addJournalEntry(person, journal[person])
+        continue
     print("Searching DBLP for "+str(person))
     outFile.write('Searching DBLP for '+str(person)+'\n')
 
-    currAuthors = dblp.search(person)
+    # full=True loads every publication of an author from its person record, in one request
+    try:
+        currAuthors = dblp.search(person, full=True)
+        # homonyms are loaded lazily: load them here too, so a failure skips the whole person
+        for currAuthor in currAuthors:
+            currAuthor.publications
+    # DBLP could not be reached, even after backing off: not journaled, so --resume searches them again
+    except dblp.retry.RetryError as e:
+        print("    ERROR: "+str(e)+", skipping "+person)
+        outFile.write('    ERROR: '+str(e)+', skipping '+person+'\n')
+        continue
+    results = {'counts': [], 'chairs': []}
 
     if (len(currAuthors) > 1):
         print("    WARNING: "+person+" has multiple matches ("+str(len(currAuthors))+") in DBLP")
@@ -73,33 +124,29 @@ for personNum in range(len(iscaAuthors)):
                 elif ((chairWelcome1 in title) or (chairWelcome2 in title)):
                     chairTuple = (person, year)
                     chairList.insert(0, chairTuple)
+                    results['chairs'].append(year)
 
         ##print("    Total ISCA publications: "+str(count)) # DEBUG PRINT
         outFile.write('    Total ISCA publications: '+str(count)+'\n') # DEBUG PRINT
 
         # just create a separate script to print out all entries for each person (or grab from debug prints above), instead of complicating data structures here
-        authorTuple = (person, count)
-        # insert people likely to not be in HOF at the end, to reduce number of swaps a little
-        if (count >= 1 and count < 8):
-            iscaEntries.append(authorTuple)
-        # just insert at beginning of list if in HOF -- likely to be towards beginning
-        elif (count >= 8):
-            iscaEntries.insert(0, authorTuple)
-        # if no ISCA publications, don't insert them
+        addAuthor(person, count)
+        results['counts'].append(count)
 
         count = 0 # reset count for each person
         outFile.flush()
+    journal.record(person, results)
 
 # Sort all authors with ISCA publications by count (once done going through all authors)
 iscaEntriesSorted = sorted(iscaEntries, reverse=True, key=sortFunc)
 ##print(iscaEntriesSorted)
-outFile.write(iscaEntriesSorted)
+outFile.write(str(iscaEntriesSorted))
 
 # Sort chairs too, by year
 chairListSorted = sorted(chairList, reverse=True, key=sortChairsFunc)
 ##print(chairListSorted)
 outFile.write('\n')
-outFile.write(chairListSorted)
+outFile.write(str(chairListSorted))
 outFile.flush()
 
 # print out all authors with >= 8 ISCA publications
@@ -130,3 +177,12 @@ for hofAuthor in iscaEntriesSorted:
         outFile.write(hofAuthor[0]+': '+str(hofAuthor[1])+'\n')
 outFile.flush()
 outFile.close()
+
+print("DBLP cache: "+str(dblp.get_cache().stats()))
+print("Shared publications: "+str(dblp.publication_registry.stats()))
+# where the time went: calls, retries, bytes and time per DBLP endpoint
+print(dblp.stats.stats.format())
+if trace is not None:
+    dblp.stats.remove_hook(trace)
+    trace.close()
+dblp.stats.stats.dump('/nobackup/iscaHOF/iscaHOF-stats-'+filename_pt2+'.json')
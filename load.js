@@ -1,22 +1,30 @@
-function loadJSON(callback) {
+// The ranking is split in files by dsn-ranking.py: the first rows (top.json), pages of the whole ranking
+// (page-N.json) and a manifest listing them (manifest.json)
+var RANKING_DIR = './ranking/';
+var manifest = null;
+var shown = 0;
+// a page is being fetched by loadMore
+var loading = false;
+
+function loadJSON(path, callback, failure) {
         var xobj = new XMLHttpRequest();
         xobj.overrideMimeType("application/json");
-        xobj.open('GET', './ranking.json', true);
+        xobj.open('GET', RANKING_DIR + path, true);
         xobj.onreadystatechange = function () {
           if (xobj.readyState == 4 && xobj.status == "200") {
              callback(xobj.responseText);
+          } else if (xobj.readyState == 4 && failure) {
+             failure();
           }
         };
         xobj.send(null);
 }
 
-loadJSON(function(response) {
-    var data = JSON.parse(response);
+function addRows(data) {
     var table = document.getElementById('rank');
-    var limit = (data.length > 100) ? 100 : data.length;
-    for(var i=0; i<limit; i++) {
+    for(var i=0; i<data.length; i++) {
 
-        var row = table.insertRow(i+1)
+        var row = table.insertRow(shown+1)
         var c0 = row.insertCell(0);
         var c1 = row.insertCell(1);
         var c2 = row.insertCell(2);
@@ -36,5 +44,44 @@ loadJSON(function(response) {
         c1.setAttribute("class", "numer1");
         c3.setAttribute("class", "numer2");
         c4.setAttribute("class", "numer2");
+
+        shown++;
+    }
+    updateMore();
+}
+
+// The "more" button is shown once the manifest says there are rows left
+function updateMore() {
+    var more = document.getElementById('more');
+    more.style.display = (manifest != null && shown > 0 && shown < manifest.total) ? '' : 'none';
+}
+
+// Rows after the ones shown come from the page that holds the next row. The button is disabled until the page has
+// arrived: clicks meanwhile would add the same rows again
+function loadMore() {
+    if (loading) {
+        return;
     }
+    var more = document.getElementById('more');
+    var page = Math.floor(shown / manifest.pageSize);
+    loading = true;
+    more.disabled = true;
+    var done = function() {
+        loading = false;
+        more.disabled = false;
+    };
+    loadJSON(manifest.pages[page], function(response) {
+        var data = JSON.parse(response);
+        done();
+        addRows(data.slice(shown - page * manifest.pageSize));
+    }, done);
+}
+
+loadJSON('top.json', function(response) {
+    addRows(JSON.parse(response));
+});
+
+loadJSON('manifest.json', function(response) {
+    manifest = JSON.parse(response);
+    updateMore();
 });
\ No newline at end of file
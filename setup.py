@@ -17,7 +17,12 @@ setup(name='dblp-python',
       author_email='mhluongo@gmail.com',
       license='MIT',
       packages=['dblp'],
+      python_requires='>=3.9',
       install_requires=[
                       'requests>=1.0.4',
-                  ]
+                      'numpy',
+                  ],
+      extras_require={
+                      'async': ['aiohttp>=3.0'],
+                  }
      )
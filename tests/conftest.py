@@ -0,0 +1,42 @@
+import os
+import sys
+import importlib.util
+
+import pytest
+
+# the scripts and the dblp package live at the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def load_script(filename, name):
+    """Import a script of the repository whose file name is not a module name (e.g. dsn-ranking.py), without running
+    its main()."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeResponse(object):
+    """The part of a requests.Response the dblp module uses."""
+    def __init__(self, content, status_code=200, headers=None):
+        self.url = 'http://dblp.test/'
+        self.content = content.encode('utf-8') if isinstance(content, str) else content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+
+@pytest.fixture
+def response():
+    """Builds fake answers of DBLP: response(content, status_code=200, headers=None), content being bytes or str."""
+    return FakeResponse
+
+
+@pytest.fixture(scope='session')
+def dsn_ranking():
+    return load_script('dsn-ranking.py', 'dsn_ranking')
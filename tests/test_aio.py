@@ -0,0 +1,78 @@
+import os
+import sys
+import asyncio
+
+import pytest
+
+import dblp
+import dblp.aio
+
+pytest.importorskip('aiohttp')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import standin
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """The benchmarks' DBLP stand-in, served locally, with the dblp module pointed at it."""
+    world = standin.World()
+    answers = standin.StandIn(world)
+    httpd = standin.serve(answers)
+    base = 'http://127.0.0.1:{}/'.format(httpd.server_address[1])
+    monkeypatch.setattr(dblp, 'DBLP_PERSON_URL', base + 'pers/xk/{urlpt}')
+    monkeypatch.setattr(dblp, 'DBLP_PERSON_URL2', base + 'pers/xx/{urlpt}')
+    monkeypatch.setattr(dblp, 'DBLP_PUBLICATION_URL', base + 'rec/{key}.xml')
+    dblp.publication_registry.clear()
+    yield world, answers
+    httpd.shutdown()
+    httpd.server_close()
+    dblp.publication_registry.clear()
+
+
+def run(coroutine_fn):
+    async def main():
+        async with dblp.aio.AsyncClient() as client:
+            result = await coroutine_fn(client)
+            assert client.loading == {}
+            return result
+    return asyncio.run(main())
+
+
+def test_concurrent_loads_fetch_once(server):
+    world, answers = server
+    urlpt = world.urlpt(world.name(0))
+    key = 'conf/isca/P000-2010'
+
+    async def load(client):
+        # the same interned publication, and the same author, loaded by several coroutines at once
+        publications = [dblp.Publication(key) for _ in range(5)]
+        assert all(p is publications[0] for p in publications)
+        authors = [dblp.Author(urlpt, full=True) for _ in range(3)]
+        await asyncio.gather(dblp.aio.load_publications(client, publications),
+                             *[dblp.aio.load_author(client, a) for a in authors])
+        return publications[0], authors
+
+    publication, authors = run(load)
+    assert answers.counts == {'rec': 1, 'pers': 1}
+    assert publication.year == 2010
+    assert all(a.data is authors[0].data for a in authors)
+    assert authors[0].name == world.person(urlpt)[0]
+
+    # loaded: later calls do not fetch at all
+    run(lambda client: dblp.aio.load_publication(client, publication))
+    assert answers.counts == {'rec': 1, 'pers': 1}
+
+
+def test_concurrent_loads_share_the_error(server, monkeypatch):
+    world, answers = server
+    monkeypatch.setattr(dblp, 'DBLP_PUBLICATION_URL', dblp.DBLP_PUBLICATION_URL.replace('/rec/', '/missing/'))
+
+    async def load(client):
+        publication = dblp.Publication('conf/isca/P000-2010')
+        return await asyncio.gather(*[dblp.aio.load_publication(client, publication) for _ in range(3)],
+                                    return_exceptions=True)
+
+    errors = run(load)
+    assert all(isinstance(e, dblp.retry.RetryError) for e in errors)
+    assert answers.counts == {'missing': 1}
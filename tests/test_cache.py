@@ -0,0 +1,100 @@
+import pytest
+
+import dblp.cache
+from dblp.cache import ACCESS_RESOLUTION, DirectoryCache, SQLiteCache
+
+
+class Clock(object):
+    """Stands in for the time module in dblp.cache."""
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1.5e9)
+    monkeypatch.setattr(dblp.cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['sqlite', 'directory'])
+def open_cache(request, tmp_path):
+    def open_cache(ttl=None, max_bytes=None):
+        if request.param == 'sqlite':
+            return SQLiteCache(str(tmp_path / 'cache.sqlite'), ttl=ttl, max_bytes=max_bytes)
+        return DirectoryCache(str(tmp_path / 'cache'), ttl=ttl, max_bytes=max_bytes)
+    return open_cache
+
+
+def test_hit_and_miss_counters(clock, open_cache, response):
+    cache = open_cache()
+    assert cache.get('http://dblp.test/a') is None
+    cache.set('http://dblp.test/a', None, response(b'first'))
+    cache.set('http://dblp.test/a', {'q': 'x'}, response(b'second', 404))
+    hit = cache.get('http://dblp.test/a')
+    assert (hit.url, hit.status_code, hit.content) == ('http://dblp.test/a', 200, b'first')
+    assert cache.get('http://dblp.test/a', {'q': 'x'}).status_code == 404
+    assert cache.get('http://dblp.test/a', {'q': 'y'}) is None
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'evictions': 0, 'hit_rate': 0.5}
+
+
+def test_ttl_expiry(clock, open_cache, response):
+    cache = open_cache(ttl=60)
+    cache.set('http://dblp.test/a', None, response(b'a'))
+    clock.advance(60)
+    assert cache.get('http://dblp.test/a').content == b'a'
+    clock.advance(1)
+    assert cache.get('http://dblp.test/a') is None
+    assert cache.stats()['evictions'] == 1
+    # the expired entry is gone, not only skipped
+    assert cache.total == 0
+    assert cache.get('http://dblp.test/a') is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_total_is_kept_and_counted_at_open(clock, open_cache, response):
+    cache = open_cache()
+    cache.set('http://dblp.test/a', None, response(b'x' * 100))
+    cache.set('http://dblp.test/b', None, response(b'x' * 100))
+    first = cache.total
+    cache.set('http://dblp.test/a', None, response(b'x' * 300))
+    assert cache.total == first + 200
+    cache.delete('http://dblp.test/b')
+    cache.delete('http://dblp.test/missing')
+    total = cache.total
+    assert total >= 300
+    assert open_cache().total == total
+
+
+def test_eviction_order(clock, open_cache, response):
+    cache = open_cache()
+    for name in 'abcd':
+        cache.set('http://dblp.test/' + name, None, response(b'x' * 1000))
+        clock.advance(1)
+    entry = cache.total // 4
+    cache.max_bytes = 4 * entry + entry // 4
+
+    # using an entry moves it to the end of the order, but a hit within ACCESS_RESOLUTION of the last use does not
+    clock.advance(ACCESS_RESOLUTION + 1)
+    cache.get('http://dblp.test/b')
+    clock.advance(1)
+    cache.get('http://dblp.test/a')
+    clock.advance(1)
+    cache.get('http://dblp.test/b')
+
+    # under the bound, nothing is evicted
+    assert cache.stats()['evictions'] == 0
+
+    # over it: the least recently used entries go until the cache is under EVICTION_TARGET of the bound
+    clock.advance(1)
+    cache.set('http://dblp.test/e', None, response(b'x' * 1000))
+    assert cache.stats()['evictions'] == 2
+    assert cache.total <= cache.max_bytes * dblp.cache.EVICTION_TARGET
+    present = [name for name in 'abcde' if cache.get('http://dblp.test/' + name) is not None]
+    assert present == ['a', 'b', 'e']
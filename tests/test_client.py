@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+import dblp.cache
+import dblp.client
+from dblp.client import Client, TokenBucket
+
+
+class Clock(object):
+    """Stands in for the time module in dblp.client: time only moves when the test advances it, and sleeping only
+    records, per thread, how long the thread would have slept."""
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = {}
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            name = threading.current_thread().name
+            self.slept[name] = self.slept.get(name, 0.0) + seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(dblp.client, 'time', clock)
+    return clock
+
+
+def in_threads(fn, count):
+    """Call fn() from `count` threads started together; returns their results."""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def work(i):
+        barrier.wait()
+        results[i] = fn()
+    threads = [threading.Thread(target=work, args=(i,), name='worker-{}'.format(i)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_reservations_queue_up(clock):
+    # 20 threads at once against 4 requests per second: each one gets a slot of its own, a quarter of a second apart
+    bucket = TokenBucket(4, burst=1)
+    waits = in_threads(bucket.reserve, 20)
+    assert sorted(waits) == pytest.approx([i * 0.25 for i in range(20)])
+
+
+def test_burst_then_rate(clock):
+    bucket = TokenBucket(2, burst=3)
+    waits = in_threads(bucket.reserve, 6)
+    assert sorted(waits) == pytest.approx([0, 0, 0, 0.5, 1.0, 1.5])
+
+    # the queue drains as time passes, and an idle bucket never holds more than the burst
+    clock.advance(1.5)
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.advance(60)
+    assert sorted(in_threads(bucket.reserve, 4)) == pytest.approx([0, 0, 0, 0.5])
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_acquire_sleeps(clock):
+    bucket = TokenBucket(10)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert clock.slept == {threading.current_thread().name: pytest.approx(0.1)}
+
+
+def test_client_rate_limit(clock, tmp_path, response):
+    client = Client(rate=5, burst=1, cache=dblp.cache.SQLiteCache(str(tmp_path / 'cache.sqlite')))
+    sent = []
+
+    def get(url, params=None, timeout=None):
+        # when the request leaves: the frozen clock, plus the time its thread slept in the limiter
+        with clock.lock:
+            sent.append(clock.now + clock.slept.get(threading.current_thread().name, 0.0))
+        return response(url.encode('utf-8'))
+    client.session.get = get
+
+    urls = ['http://dblp.test/{}'.format(i) for i in range(8)]
+    fetched = in_threads(lambda: client.get(urls.pop()).content.decode('utf-8'), 8)
+    # 8 threads at once, 5 requests per second: the requests leave one after the other, a fifth of a second apart
+    sent.sort()
+    assert sent == pytest.approx([clock.now + i * 0.2 for i in range(8)])
+
+    # cached answers never take a token
+    tokens = client.limiter.tokens
+    assert in_threads(lambda: client.get(fetched.pop()).content, 8)
+    assert len(sent) == 8
+    assert client.limiter.tokens == tokens
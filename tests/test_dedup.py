@@ -0,0 +1,62 @@
+import random
+import itertools
+
+import pytest
+
+# dedup.py is the only script that needs it
+jellyfish = pytest.importorskip('jellyfish')
+import dedup
+
+FIRST_NAMES = ['John', 'James', 'Maria', 'Wei', 'Li', 'Jose', 'Anna', 'Michael', 'David', 'Sarah', 'Mohammed', 'Yuki',
+               'Hiroshi', 'Olga', 'Pierre', 'Giovanni', 'Ahmed', 'Chen', 'Xin', 'Rajesh', 'Priya', 'Kevin', 'Laura',
+               'Thomas', 'Andrea', 'Stefan', 'Ivan', 'Elena', 'Carlos', 'Lucia', 'Min', 'Jun', 'Hao', 'Yan', 'Fatima',
+               'Omar', 'Peter', 'Paul', 'Mark', 'Luca']
+SURNAMES = ['Smith', 'Wang', 'Zhang', 'Garcia', 'Mueller', 'Rossi', 'Kumar', 'Nguyen', 'Kim', 'Tanaka', 'Ivanov',
+            'Silva', 'Johnson', 'Lee', 'Chen', 'Liu', 'Yang', 'Huang', 'Brown', 'Martin', 'Dubois', 'Schmidt',
+            'Fischer', 'Weber', 'Moreno', 'Lopez', 'Sato', 'Suzuki', 'Patel', 'Singh', 'Ali', 'Hassan', 'Novak',
+            'Kowalski', 'Jensen', 'Hansen', 'Larsen', 'Olsen', 'Berg', 'Torres']
+
+
+def sample_names(count, seed):
+    """DBLP-like author names (middle initials, homonym numbers), a fifth of them with a typo: a dense sample, with
+    many near-duplicates, sharing few first names and surnames."""
+    rnd = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        middle = rnd.choice(['', '', '', rnd.choice('ABCDEFGHJKLMNPRSTW') + '. '])
+        name = rnd.choice(FIRST_NAMES) + ' ' + middle + rnd.choice(SURNAMES) + rnd.choice(['', '', '', ' 0001', ' 0002'])
+        typo = rnd.random()
+        i = rnd.randrange(len(name) - 1)
+        if typo < 0.1:
+            name = name[:i] + name[i+1:]
+        elif typo < 0.2:
+            name = name[:i] + name[i+1] + name[i] + name[i+2:]
+        names.add(name.strip())
+    return sorted(names)
+
+
+def test_candidate_pairs_recall():
+    # the O(n^2) scan, on a sample small enough for it
+    names = sample_names(1500, seed=1)
+    matches = set((i, j) for i, j in itertools.combinations(range(len(names)), 2)
+                  if jellyfish.jaro_winkler_similarity(names[i], names[j]) > dedup.THRESHOLD)
+    pairs = dedup.candidate_pairs(names)
+
+    assert len(matches) > 100
+    assert len(matches & pairs) >= 0.98 * len(matches)
+    assert len(pairs) < 0.1 * len(names) * (len(names) - 1) / 2
+
+
+def test_qgram_blocks_close_names():
+    names = ['jonathan smithers', 'jonathan smithres', 'jonathn smithers', 'jnathan smithrs', 'maria garcia lopez']
+    pairs = set()
+    for block in dedup.qgram_blocks(names):
+        pairs.update(itertools.combinations(sorted(block), 2))
+    # within MAX_EDITS edits of each other
+    assert {(0, 1), (0, 2), (0, 3)} <= pairs
+    assert not any(4 in pair for pair in pairs)
+
+
+def test_qgram_blocks_bounded():
+    names = [dedup.normalize(name) for name in sample_names(3000, seed=2)]
+    assert max(len(block) for block in dedup.qgram_blocks(names)) <= dedup.MAX_BLOCK
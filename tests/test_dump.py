@@ -0,0 +1,83 @@
+import gzip
+
+import pytest
+from lxml import etree
+
+import dblp.dump
+
+DTD = '''<!ENTITY uuml "&#252;">
+<!ENTITY eacute "&#233;">
+<!ENTITY auml "&#228;">
+<!ELEMENT dblp ANY>
+'''
+
+DUMP = '''<?xml version="1.0" encoding="ISO-8859-1"?>
+<!DOCTYPE dblp SYSTEM "dblp.dtd">
+<dblp>
+<inproceedings key="conf/dsn/MuellerB19" mdate="2019-06-01"><author>J&uuml;rgen M&uuml;ller</author><author>Ren&eacute; Blanc</author><author>Nobody Else</author><title>Fault <i>Tolerance</i> for All.</title><pages>1-12</pages><year>2019</year><booktitle>DSN</booktitle><ee>http://ieeexplore.ieee.org/document/1/</ee><ee>https://doi.org/10.1109/DSN.2019.00012</ee><crossref>conf/dsn/2019</crossref><url>db/conf/dsn/dsn2019.html#MuellerB19</url></inproceedings>
+<inproceedings key="conf/dsn/Blanc19" mdate="2019-06-01"><author pid="77/1">Ren&eacute; Blanc</author><title>Keynote.</title><year>2019</year><booktitle>DSN</booktitle><crossref>conf/dsn/2019</crossref></inproceedings>
+<inproceedings key="conf/ftcs/Old88" mdate="2008-01-01"><author>Ren&eacute; Blanc</author><title>An Old Paper.</title><pages>10-17</pages><year>1988</year><booktitle>FTCS</booktitle></inproceedings>
+<inproceedings key="conf/isca/Other19" mdate="2019-06-01"><author>J&uuml;rgen M&uuml;ller</author><title>Not Asked For.</title><year>2019</year><booktitle>ISCA</booktitle><crossref>conf/isca/2019</crossref></inproceedings>
+<proceedings key="conf/dsn/2019" mdate="2019-06-01"><editor>Someone</editor><title>DSN 2019</title><year>2019</year></proceedings>
+<www key="homepages/12/345" mdate="2020-01-01"><author>J&uuml;rgen M&uuml;ller</author><author>J. M&uuml;ller</author><title>Home Page</title><note type="affiliation">Universit&auml;t A</note></www>
+<www key="homepages/66/1" mdate="2020-01-01"><author>Ren&eacute; Blanc</author><title>Home Page</title><note>not an affiliation</note></www>
+<www key="homepages/99/9" mdate="2020-01-01"><author>J&uuml;rgen M&uuml;ller</author><title>Home Page</title><note type="affiliation">Later Duplicate</note></www>
+</dblp>
+'''
+
+
+@pytest.fixture
+def dump(tmp_path):
+    """A tiny dblp.xml.gz, with its DTD next to it."""
+    (tmp_path / 'dblp.dtd').write_text(DTD)
+    path = tmp_path / 'dblp.xml.gz'
+    with gzip.open(str(path), 'wb') as f:
+        f.write(DUMP.encode('iso-8859-1'))
+    return str(path)
+
+
+def test_collect_hits(dump):
+    affiliations = {}
+    hits = dblp.dump.collect_hits(dump, ['conf/dsn/2019', 'conf/ftcs/1988', 'conf/dsn/2020'], affiliations)
+    assert sorted(hits) == ['conf/dsn/2019', 'conf/dsn/2020', 'conf/ftcs/1988']
+    assert hits['conf/dsn/2020'] == []
+
+    # the proceedings volume is a hit of its venue-year too, as in the API
+    paper, keynote, proceedings = hits['conf/dsn/2019']
+    assert proceedings['type'] == 'proceedings' and 'authors' not in proceedings
+    assert paper == {
+        # entities decoded; pids from the person records, or the name of authors without one
+        'authors': {'author': [{'@pid': '12/345', 'text': 'Jürgen Müller'},
+                               {'@pid': '66/1', 'text': 'René Blanc'},
+                               {'@pid': 'Nobody Else', 'text': 'Nobody Else'}]},
+        'title': 'Fault Tolerance for All.',
+        'venue': 'DSN',
+        'year': '2019',
+        'type': 'inproceedings',
+        'key': 'conf/dsn/MuellerB19',
+        'url': 'db/conf/dsn/dsn2019.html#MuellerB19',
+        'pages': '1-12',
+        # the first ee that is a DOI
+        'doi': '10.1109/DSN.2019.00012',
+        'ee': 'https://doi.org/10.1109/DSN.2019.00012',
+    }
+    # a pid given by the record itself is kept
+    assert keynote['authors']['author'] == [{'@pid': '77/1', 'text': 'René Blanc'}]
+    assert 'pages' not in keynote and 'doi' not in keynote
+
+    # an old record without crossref: the venue-year is rebuilt from its key and year
+    old, = hits['conf/ftcs/1988']
+    assert old['key'] == 'conf/ftcs/Old88'
+    assert old['authors']['author'] == [{'@pid': '66/1', 'text': 'René Blanc'}]
+
+    # the first affiliation note of each person record, entities decoded
+    assert affiliations == {'12/345': 'Universität A', '99/9': 'Later Duplicate'}
+
+
+def test_venue_of():
+    assert dblp.dump.venue_of(etree.fromstring(
+        '<inproceedings key="conf/dsn/A19"><year>2019</year><crossref>conf/dsn/2019w</crossref></inproceedings>')) \
+        == 'conf/dsn/2019w'
+    assert dblp.dump.venue_of(etree.fromstring('<inproceedings key="conf/dsn/A19"><year>2019</year></inproceedings>')) \
+        == 'conf/dsn/2019'
+    assert dblp.dump.venue_of(etree.fromstring('<article key="journals/tdsc/A19"><year>2019</year></article>')) is None
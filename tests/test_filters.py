@@ -0,0 +1,96 @@
+import re
+import itertools
+
+import pytest
+
+import dblp.filters
+import dblp.hof
+
+
+def filter_papers(pub, venue, MIN_PAGES, MATCH, MATCH_DOI):
+    """filter_papers of dsn-ranking.py before dblp.filters, with its constants as arguments."""
+    year = int(venue[len(venue)-4:])
+    pags = 0
+
+    # Check number of pages. Discard keynotes or abstract
+    if 'pages' in pub:
+        if '-' not in pub['pages']:
+            pags = 1
+        else:
+            try:
+                pages = pub['pages'].split('-')
+                pags = int(pages[1]) - int(pages[0]) + 1
+            except:
+                # For some papers, pages does not include the finish page of the publication.
+                pags = 99
+    if pags < MIN_PAGES:
+        return False
+
+    # Filter out workshops, industry track, supplemental volume, etc
+    if pub["venue"] in MATCH:
+        for doi in MATCH_DOI:
+            try:
+                regex = r"%s" % doi.format(year)
+                match = re.search(regex, pub["doi"])
+                if match != None:
+                    return True
+            except:
+                # if the paper does not have a doi
+                return True
+
+    return False
+
+
+# the constants of dsn-ranking.py before dblp.hof.DSN
+MIN_PAGES = 4
+MATCH = ['DSN', 'FTCS']
+MATCH_DOI = [
+    r'10\.1109/DSN([0-9]+)\.{}\.([0-9]+)',
+    r'10\.1109/ICDSN\.{}\.([0-9]+)',
+    r'10\.1109/DSN\.{}\.([0-9]+)',
+    r'10\.1109\/FTCS\.{}\.([0-9]+)']
+
+PAGES = [None, '1', '7', '12-13', '12-15', '12-24', ' 12 - 24 ', '12-24-30', '30-24-12', '24-12', '1:1-1:12', '12-',
+         '-12', '-', 'xii-12', 'i-iv', '12--24', '0012-0024', '+1-+9', '1_0-2_0']
+VENUES = ['DSN', 'FTCS', 'DSN Workshops', ['DSN', 'DSN Workshops']]
+DOIS = [None, '', '10.1109/DSN.{}.00012', '10.1109/DSN-W.{}.00012', '10.1109/DSN48063.{}.00012',
+        '10.1109/ICDSN.{}.1234', '10.1109/FTCS.{}.689468', '10.1109/DSN.2000.00012', '10.1145/3123456']
+
+
+def hits(year):
+    for pages, venue, doi in itertools.product(PAGES, VENUES, DOIS):
+        info = {'venue': venue, 'title': 'A Paper.'}
+        if pages is not None:
+            info['pages'] = pages
+        if doi is not None:
+            info['doi'] = doi.format(year)
+        yield info
+
+
+@pytest.mark.parametrize('venue', ['conf/ftcs/1995', 'conf/dsn/2000', 'conf/dsn/2019'])
+def test_dsn_rules_match_filter_papers(venue):
+    year = int(venue[-4:])
+    venue_filter = dblp.hof.DSN.rules.compile(year)
+    for info in hits(year):
+        expected = filter_papers(info, venue, MIN_PAGES, MATCH, MATCH_DOI)
+        assert venue_filter.check(info)[0] == expected, info
+
+
+@pytest.mark.parametrize('pages, count', [
+    (None, 0), ('7', 1), ('12-24', 13), (' 12 - 24 ', 13), ('12-24-30', 13), ('1:1-1:12', dblp.filters.UNKNOWN_PAGES),
+    ('12-', dblp.filters.UNKNOWN_PAGES), ('24-12', -11)])
+def test_pages(pages, count):
+    info = {} if pages is None else {'pages': pages}
+    assert dblp.filters.VenueRules(['DSN']).compile(2019).pages(info) == count
+
+
+def test_reasons():
+    venue_filter = dblp.filters.VenueRules(['DSN'], [r'10\.1109/DSN\.{}\.'], 4, [r'^Message from']).compile(2019)
+    paper = {'venue': 'DSN', 'title': 'A Paper.', 'pages': '1-12', 'doi': '10.1109/DSN.2019.00012'}
+    assert venue_filter.check(paper) == (True, dblp.filters.ACCEPTED)
+    assert venue_filter.check(dict(paper, venue='DSN Workshops')) == (False, dblp.filters.REJECTED_VENUE)
+    assert venue_filter.check(dict(paper, title='Message from the General Chairs.')) == \
+        (False, dblp.filters.REJECTED_TITLE)
+    assert venue_filter.check(dict(paper, pages='1-2')) == (False, dblp.filters.REJECTED_PAGES)
+    assert venue_filter.check(dict(paper, doi='10.1109/DSN-W.2019.00012')) == (False, dblp.filters.REJECTED_DOI)
+    assert venue_filter.check({k: v for k, v in paper.items() if k != 'doi'}) == (True, dblp.filters.ACCEPTED_NO_DOI)
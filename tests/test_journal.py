@@ -0,0 +1,95 @@
+import json
+import threading
+
+import dblp.journal
+
+
+def test_resume(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = dblp.journal.Journal(path)
+    journal.record('conf/dsn/2019', {'papers': [1, 2]})
+    journal.record('pid/1', 'Some University')
+    journal.close()
+
+    journal = dblp.journal.Journal(path, resume=True)
+    assert len(journal) == 2
+    assert 'conf/dsn/2019' in journal and 'conf/dsn/2020' not in journal
+    assert journal['conf/dsn/2019'] == {'papers': [1, 2]}
+    journal.record('conf/dsn/2020', {'papers': []})
+    journal.close()
+    assert len(dblp.journal.Journal.replay(path)) == 3
+
+
+def test_new_run_starts_over(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = dblp.journal.Journal(path)
+    journal.record('conf/dsn/2019', 1)
+    journal.close()
+
+    journal = dblp.journal.Journal(path)
+    assert len(journal) == 0
+    journal.close()
+    assert dblp.journal.Journal.replay(path) == {}
+
+
+def test_line_cut_short(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    # the run died while writing its third line
+    path.write_text(json.dumps({'key': 'a', 'results': 1}) + '\n' + json.dumps({'key': 'b', 'results': 2}) + '\n' +
+                    '{"key": "c", "res', encoding='utf-8')
+
+    journal = dblp.journal.Journal(str(path), resume=True)
+    assert sorted(journal.entries) == ['a', 'b']
+    journal.record('c', 3)
+    journal.close()
+    assert dblp.journal.Journal.replay(str(path)) == {'a': 1, 'b': 2, 'c': 3}
+
+
+def test_missing_journal(tmp_path):
+    journal = dblp.journal.Journal(str(tmp_path / 'journal.jsonl'), resume=True)
+    assert len(journal) == 0
+    journal.close()
+
+
+def test_concurrent_records(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = dblp.journal.Journal(path)
+
+    def work(worker):
+        for i in range(50):
+            journal.record('{}/{}'.format(worker, i), {'worker': worker, 'i': i})
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.close()
+
+    entries = dblp.journal.Journal.replay(path)
+    assert len(entries) == 400
+    assert entries['7/49'] == {'worker': 7, 'i': 49}
+
+
+def test_journaled_venue(tmp_path, monkeypatch, dsn_ranking):
+    fetched = []
+
+    def get_venue(venue, hits=None, refresh=True):
+        fetched.append(venue)
+        papers = [] if venue.endswith('2021') else [{'key': venue + '/A'}]
+        return {'venue': venue, 'papers': papers, 'authors': [], 'rejected': {}, 'time': 0}
+    monkeypatch.setattr(dsn_ranking, 'get_venue', get_venue)
+
+    path = str(tmp_path / 'journal.jsonl')
+    journal = dblp.journal.Journal(path)
+    for venue in ('conf/dsn/2019', 'conf/dsn/2020', 'conf/dsn/2021'):
+        dsn_ranking.journaled_venue(journal, venue)
+    journal.close()
+
+    # resuming: what the journal records is not fetched again, but an empty answer (maybe a DBLP failure) is
+    journal = dblp.journal.Journal(path, resume=True)
+    snapshots = [dsn_ranking.journaled_venue(journal, venue)
+                 for venue in ('conf/dsn/2019', 'conf/dsn/2020', 'conf/dsn/2021')]
+    journal.close()
+    assert fetched == ['conf/dsn/2019', 'conf/dsn/2020', 'conf/dsn/2021', 'conf/dsn/2021']
+    assert [snapshot['papers'] for snapshot in snapshots] == [[{'key': 'conf/dsn/2019/A'}],
+                                                               [{'key': 'conf/dsn/2020/A'}], []]
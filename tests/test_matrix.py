@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+
+import dblp.matrix
+
+
+def get_recent_pubs(pubs, RECENT):
+    """get_recent_pubs of dsn-ranking.py before dblp.matrix, with RECENT as an argument."""
+    cc = 0
+    for key in pubs:
+        # in case the year has a suffix (e.g., LeeL17a)
+        try:
+            yyy = int(key[len(key) - 2:])
+        except:
+            yyy = int(key[len(key) - 3:len(key) - 1])
+        yyy = yyy + 1900 if yyy > 50 else yyy + 2000
+        if yyy >= RECENT:
+            cc += 1
+    return cc
+
+
+def old_ranking(authorList, limit):
+    """The ranking loop of dsn-ranking.py before dblp.matrix, as (i, rank, pid) tuples."""
+    rank=1
+    last_total=0
+    i=1
+    ranked = []
+    for key, value in sorted(authorList.items(), key=lambda x : x[1]['total'], reverse=True):
+
+        if i > limit and last_total != value['total']:
+            break
+
+        if last_total != value['total']: rank = i
+        ranked.append((i, rank, key))
+
+        i+=1
+        last_total = value['total']
+    return ranked
+
+
+def sample_authors(count, seed):
+    """An author list as built by dsn-ranking.py (pid -> {'name', 'pubs': {key: year}}), with DBLP-like keys that end
+    with the year of the paper, sometimes followed by a letter (e.g. LeeL17a)."""
+    rnd = random.Random(seed)
+    authors = {}
+    for n in range(count):
+        pubs = {}
+        for _ in range(min(int(rnd.paretovariate(1.2)), 40)):
+            year = rnd.randint(1988, 2023)
+            key = 'conf/dsn/A{}{:02d}{}'.format(rnd.randrange(10 ** 6), year % 100, rnd.choice(['', '', 'a', 'b']))
+            pubs[key] = year
+        authors['{}/{}'.format(n % 100, n)] = {'name': 'Author {}'.format(n), 'pubs': pubs}
+    return authors
+
+
+def test_totals_and_recent_match_dsn_ranking():
+    authors = sample_authors(2000, seed=1)
+    matrix = dblp.matrix.PublicationMatrix.from_authors(authors)
+    assert matrix.pids == list(authors)
+
+    totals = matrix.totals()
+    recent = matrix.recent(2023, 5)
+    for row, pid in enumerate(matrix.pids):
+        assert totals[row] == len(authors[pid]['pubs'])
+        assert recent[row] == get_recent_pubs(authors[pid]['pubs'], 2024 - 5)
+
+
+def test_rank_matches_dsn_ranking():
+    authors = sample_authors(2000, seed=2)
+    matrix = dblp.matrix.PublicationMatrix.from_authors(authors)
+    totals = matrix.totals()
+    for pid, author in authors.items():
+        author['total'] = len(author['pubs'])
+
+    for limit in (1, 10, 25, 90000):
+        ranked = [(i, rank, matrix.pids[row]) for i, rank, row in matrix.rank(totals, limit)]
+        assert ranked == old_ranking(authors, limit)
+
+
+def test_rank_ties():
+    ranked = dblp.matrix.PublicationMatrix(['a', 'b', 'c', 'd', 'e'], 2000, None).rank([3, 5, 3, 5, 1], limit=3)
+    # the authors tied with the last one kept are kept too
+    assert ranked == [(1, 1, 1), (2, 1, 3), (3, 3, 0), (4, 3, 2)]
+
+
+def test_windows():
+    authors = sample_authors(300, seed=3)
+    matrix = dblp.matrix.PublicationMatrix.from_authors(authors)
+    assert (matrix.first_year, matrix.last_year) == (1988, 2023)
+    for first, last in ((1980, 1990), (2000, 2009), (2015, 2030), (2030, 2040), (1970, 1980)):
+        expected = [sum(first <= year <= last for year in authors[pid]['pubs'].values()) for pid in matrix.pids]
+        assert matrix.window(first, last).tolist() == expected
+    assert matrix.as_of(2005).tolist() == matrix.window(1900, 2005).tolist()
+    assert np.array_equal(matrix.as_of(matrix.last_year), matrix.totals())
+
+
+def test_empty():
+    matrix = dblp.matrix.PublicationMatrix.from_authors({})
+    assert matrix.totals().tolist() == []
+    assert matrix.rank(matrix.totals()) == []
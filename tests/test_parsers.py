@@ -0,0 +1,193 @@
+import os
+import sys
+
+import pytest
+from lxml import etree
+
+import dblp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import standin
+
+
+# the parsers of the dblp module before they were rewritten in a single pass, as reference; they return the data as
+# dicts, with the keys of the publications instead of Publication objects
+
+def first_or_none(seq):
+    try:
+        return next(iter(seq))
+    except StopIteration:
+        pass
+
+def old_publication_data(publication):
+    return {
+        'type':publication.tag,
+        'sub_type':publication.attrib.get('publtype', None),
+        'mdate':publication.attrib.get('mdate', None),
+        'authors':publication.xpath('author/text()'),
+        'editors':publication.xpath('editor/text()'),
+        'title':first_or_none(publication.xpath('title/text()')),
+        'year':int(first_or_none(publication.xpath('year/text()'))),
+        'month':first_or_none(publication.xpath('month/text()')),
+        'journal':first_or_none(publication.xpath('journal/text()')),
+        'volume':first_or_none(publication.xpath('volume/text()')),
+        'number':first_or_none(publication.xpath('number/text()')),
+        'chapter':first_or_none(publication.xpath('chapter/text()')),
+        'pages':first_or_none(publication.xpath('pages/text()')),
+        'ee':first_or_none(publication.xpath('ee/text()')),
+        'isbn':first_or_none(publication.xpath('isbn/text()')),
+        'url':first_or_none(publication.xpath('url/text()')),
+        'booktitle':first_or_none(publication.xpath('booktitle/text()')),
+        'crossref':first_or_none(publication.xpath('crossref/text()')),
+        'publisher':first_or_none(publication.xpath('publisher/text()')),
+        'school':first_or_none(publication.xpath('school/text()')),
+        'citations':[dblp.Citation(c.text, c.attrib.get('label',None))
+                     for c in publication.xpath('cite') if c.text != '...'],
+        'series':first_or_none(dblp.Series(s.text, s.attrib.get('href', None))
+                               for s in publication.xpath('series'))
+    }
+
+def old_parse_publication(xml):
+    root = etree.fromstring(xml)
+    publication = first_or_none(root.xpath('/dblp/*[1]'))
+    if publication is None:
+        raise ValueError
+    return old_publication_data(publication)
+
+def old_parse_person(xml):
+    root = etree.fromstring(xml)
+    return {
+        'name':root.attrib['name'],
+        'publications':root.xpath('/dblpperson/dblpkey[not(@type)]/text()'),
+        'homepages':root.xpath('/dblpperson/dblpkey[@type="person record"]/text()'),
+        'homonyms':root.xpath('/dblpperson/homonym/text()')
+    }
+
+def old_parse_full_person(xml):
+    root = etree.fromstring(xml)
+    return {
+        'name':root.attrib['name'],
+        'publications':[(record.attrib['key'], old_publication_data(record))
+                        for record in root.xpath('/dblpperson/r/*')],
+        'homepages':root.xpath('/dblpperson/person/@key'),
+        'homonyms':root.xpath('/dblpperson/homonym/text()')
+    }
+
+
+# mixed content, empty elements, repeated fields, and the other quirks of DBLP records
+EDGE_RECORD = b'''<dblp><article key="journals/x/A1" mdate="2019-01-01" publtype="informal publication">
+<author>A. One</author><author/><author><i>x</i>tail</author><editor>E. D.</editor>
+<title><i>Italic</i> start and <sub>2</sub> more</title><year>2001</year><month>May</month>
+<journal>J</journal><volume>3</volume><number>4</number><chapter>2</chapter><pages></pages>
+<ee>http://a</ee><ee>http://b</ee><isbn>123</isbn><url>db/x</url><publisher href="h">Pub</publisher>
+<school>S</school><cite label="L1">conf/a/b</cite><cite>...</cite><cite/><series href="s">Ser</series><series>S2</series>
+</article></dblp>'''
+
+
+@pytest.fixture(scope='module')
+def pages():
+    """Person pages (both kinds) and publication records of the benchmarks' DBLP stand-in."""
+    world = standin.World()
+    server = standin.StandIn(world)
+    urlpts = [world.urlpt(world.name(i)) for i in range(40)]
+    persons = []
+    keys = []
+    for urlpt in urlpts:
+        short = server.answer('/pers/xk/' + urlpt, '')[3].encode('utf-8')
+        full = server.answer('/pers/xx/' + urlpt, '')[3]
+        # the real pages also list the coauthors, which no parser reads
+        full = full.replace('</dblpperson>', '<coauthors n="1"><co><na>Z</na></co></coauthors></dblpperson>')
+        persons.append((short, full.encode('utf-8')))
+        keys.extend(world.person(urlpt)[1][:3])
+    records = [server.answer('/rec/' + key + '.xml', '')[3].encode('utf-8') for key in keys]
+    return persons, records
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    # every test builds its own Publications
+    dblp.publication_registry.clear()
+    yield
+    dblp.publication_registry.clear()
+
+
+def test_publication(pages):
+    persons, records = pages
+    for xml in records + [EDGE_RECORD]:
+        assert dblp.parse_publication(xml)._asdict() == old_parse_publication(xml)
+
+
+def test_person(pages):
+    persons, records = pages
+    for short, full in persons:
+        author = dblp.parse_person(short)._asdict()
+        author['publications'] = [publication.key for publication in author['publications']]
+        assert author == old_parse_person(short)
+
+
+def test_full_person(pages):
+    persons, records = pages
+    homonyms = 0
+    for short, full in persons:
+        author = dblp.parse_full_person(full)._asdict()
+        author['publications'] = [(publication.key, publication.data._asdict())
+                                  for publication in author['publications']]
+        assert author == old_parse_full_person(full)
+        homonyms += len(author['homonyms'])
+    assert homonyms > 0
+
+
+def test_full_person_loads_publications():
+    xml = b'<dblpperson name="A" pid="1/2" n="1"><r>' + EDGE_RECORD[len(b'<dblp>'):-len(b'</dblp>')] + \
+          b'</r></dblpperson>'
+    publication = dblp.parse_full_person(xml).publications[0]
+    assert publication is dblp.Publication('journals/x/A1')
+    assert publication.data is not None
+    assert publication.title == ' start and '
+
+
+@pytest.fixture
+def parse_pool():
+    pool = dblp.start_parse_pool(2)
+    yield pool
+    dblp.set_parse_pool(None)
+    pool.shutdown()
+
+
+def test_parse_pool(pages, parse_pool):
+    persons, records = pages
+    batch = [(dblp.decode_person, short) for short, full in persons] + \
+            [(dblp.decode_full_person, full) for short, full in persons] + \
+            [(dblp.decode_publication, xml) for xml in records + [EDGE_RECORD]]
+    # the decoded values come back from the workers as they are decoded here, in order, whether they are asked for one
+    # at a time or all at once
+    pooled = [dblp.decode(fn, xml) for fn, xml in batch]
+    concurrent = [future.result() for future in [parse_pool.submit(dblp.pooled_decode, fn, xml) for fn, xml in batch]]
+    dblp.set_parse_pool(None)
+    assert pooled == [fn(xml) for fn, xml in batch]
+    assert concurrent == pooled
+
+    # and so do the objects built from them
+    dblp.set_parse_pool(parse_pool)
+    authors = [dblp.full_person_data(dblp.decode(dblp.decode_full_person, full)) for short, full in persons]
+    dblp.set_parse_pool(None)
+    dblp.publication_registry.clear()
+    for author, (short, full) in zip(authors, persons):
+        expected = dblp.parse_full_person(full)
+        assert author.name == expected.name and author.homonyms == expected.homonyms
+        assert [p.data for p in author.publications] == [p.data for p in expected.publications]
+
+
+def test_parse_pool_errors(parse_pool):
+    # errors raised in a worker are raised in the caller, with their type: the retry policy tells them apart
+    with pytest.raises(ValueError):
+        dblp.decode(dblp.decode_publication, b'<dblp></dblp>')
+    with pytest.raises(dblp.RecordError):
+        dblp.decode(dblp.decode_publication, b'<dblp><article key="journals/x/A"><title>A</title></article></dblp>')
+    with pytest.raises(SyntaxError):
+        dblp.decode(dblp.decode_person, b'<dblpperson name="A"')
+
+
+def test_author_search():
+    xml = b'<authors><author urlpt="a/b">A</author><author urlpt="c/d">C</author></authors>'
+    assert dblp.parse_author_search(xml) == ['a/b', 'c/d']
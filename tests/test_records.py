@@ -0,0 +1,142 @@
+import gc
+import time
+import threading
+
+import pytest
+
+import dblp
+from dblp.retry import RetryError
+
+
+RECORD = '''<dblp><inproceedings key="{key}" mdate="2020-01-01"><author>A. One</author><author>B. Two</author>
+<title>A Paper.</title><pages>1-12</pages><year>2019</year><booktitle>ISCA</booktitle><ee>http://a</ee>
+<crossref>conf/isca/2019</crossref></inproceedings></dblp>'''
+
+PERSON = '''<dblpperson name="A. One" n="2"><dblpkey type="person record">homepages/a/one</dblpkey>
+<dblpkey>conf/isca/One19</dblpkey><dblpkey>conf/isca/One20</dblpkey></dblpperson>'''
+
+
+class Fetches(list):
+    """What was fetched, in order; `failures` are the keys whose next fetch fails."""
+    def __init__(self):
+        super(Fetches, self).__init__()
+        self.failures = set()
+
+
+@pytest.fixture
+def fetches(monkeypatch, response):
+    """Replaces the requests to DBLP by the pages above, and returns the Fetches made."""
+    fetches = Fetches()
+
+    def fetch(url, params, parse, what, endpoint, loader):
+        fetches.append(what)
+        # long enough for the other threads of a test to ask for the same object meanwhile
+        time.sleep(0.05)
+        if what in fetches.failures:
+            fetches.failures.discard(what)
+            raise RetryError('failed to get {} from DBLP'.format(what))
+        return parse(response(PERSON if endpoint == dblp.stats.PERSON else RECORD.format(key=what)))
+    monkeypatch.setattr(dblp, '_fetch', fetch)
+    dblp.publication_registry.clear()
+    yield fetches
+    dblp.publication_registry.clear()
+
+
+def test_slotted():
+    publication = dblp.Publication('conf/isca/Slots19')
+    author = dblp.Author('a/one')
+    for obj in (publication, author):
+        assert not hasattr(obj, '__dict__')
+        with pytest.raises(AttributeError):
+            obj.not_a_field = 1
+    # the lazy fields are read-only: the data is a tuple
+    with pytest.raises(AttributeError):
+        publication.title = 'Another Title.'
+
+
+def test_lazy_publication(fetches):
+    publication = dblp.Publication('conf/isca/One19')
+    assert publication.data is None and fetches == []
+    assert publication.title == 'A Paper.'
+    assert publication.year == 2019
+    assert publication.authors == ['A. One', 'B. Two']
+    assert publication.journal is None
+    assert isinstance(publication.data, dblp.PublicationData)
+    assert fetches == ['conf/isca/One19']
+
+
+def test_lazy_author(fetches):
+    author = dblp.Author('a/one')
+    assert author.name == 'A. One'
+    assert [publication.key for publication in author.publications] == ['conf/isca/One19', 'conf/isca/One20']
+    assert author.homepages == ['homepages/a/one']
+    assert isinstance(author.data, dblp.AuthorData)
+    # the publications are loaded on their own, when used
+    assert fetches == ['a/one']
+    assert author.publications[1].booktitle == 'ISCA'
+    assert fetches == ['a/one', 'conf/isca/One20']
+
+
+def test_interned(fetches):
+    first, second = dblp.Publication('conf/isca/One19'), dblp.Publication('conf/isca/One20')
+    assert dblp.Publication('conf/isca/One19') is first
+    assert first.booktitle is second.booktitle
+    assert first.type is second.type
+    assert first.mdate is second.mdate
+
+
+def test_loaded_once_by_threads(fetches):
+    publication = dblp.Publication('conf/isca/One19')
+    titles = []
+    threads = [threading.Thread(target=lambda: titles.append(publication.title)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert titles == ['A Paper.'] * 8
+    assert fetches == ['conf/isca/One19']
+    # the lock is dropped once loaded
+    assert publication.lock is None
+
+
+def test_other_objects_not_blocked(fetches):
+    publications = [dblp.Publication('conf/isca/P{}'.format(i)) for i in range(8)]
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda p=p: p.title) for p in publications]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # the 8 fetches of 0.05 s overlap
+    assert time.monotonic() - start < 0.3
+    assert sorted(fetches) == sorted(p.key for p in publications)
+
+
+def test_failed_load_tried_again(fetches):
+    fetches.failures.add('conf/isca/One19')
+    publication = dblp.Publication('conf/isca/One19')
+    with pytest.raises(RetryError):
+        publication.title
+    assert publication.data is None
+    assert publication.title == 'A Paper.'
+    assert fetches == ['conf/isca/One19', 'conf/isca/One19']
+
+
+def test_registry_keeps_referenced_publications(fetches):
+    registry = dblp.publication_registry
+    max_size = registry.max_size
+    registry.max_size = 2
+    try:
+        kept = dblp.Publication('conf/isca/One19')
+        kept.title
+        for i in range(10):
+            dblp.Publication('conf/isca/P{}'.format(i))
+        gc.collect()
+        # the 2 recently used ones, and the one still referenced
+        assert registry.stats()['recent'] == 2
+        assert registry.stats()['size'] == 3
+        # still the registered one, with its data
+        assert dblp.Publication('conf/isca/One19') is kept
+        assert fetches == ['conf/isca/One19']
+    finally:
+        registry.max_size = max_size
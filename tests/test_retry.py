@@ -0,0 +1,181 @@
+import time
+import asyncio
+import email.utils
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import dblp
+import dblp.cache
+from dblp.retry import CircuitBreaker, ParseError, RetryError, RetryPolicy, TransientError, check_status, \
+    is_transport_error, parse_retry_after
+
+
+def policy(attempts=4):
+    # no backoff, and a breaker that never opens
+    return RetryPolicy(attempts=attempts, base=0.0, cap=0.0, breaker=CircuitBreaker(threshold=1000))
+
+
+def failing(*errors):
+    """Returns a function raising `errors` one after the other, then returning 'ok', and the list of its calls."""
+    calls = []
+
+    def fn():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return 'ok'
+    return fn, calls
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('-5') == 0.0
+    assert parse_retry_after('soon') is None
+    assert 50 < parse_retry_after(email.utils.formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+def test_check_status():
+    check_status(200)
+    with pytest.raises(TransientError) as e:
+        check_status(429, {'Retry-After': '7'})
+    assert e.value.retry_after == 7.0
+    with pytest.raises(TransientError):
+        check_status(503)
+    with pytest.raises(RetryError):
+        check_status(404, what='conf/x/A20')
+
+
+def test_transport_errors():
+    aiohttp = pytest.importorskip('aiohttp')
+    for error in (TransientError(503), ConnectionError(), TimeoutError(), asyncio.TimeoutError(),
+                  aiohttp.ClientError(), aiohttp.ServerDisconnectedError()):
+        assert is_transport_error(error), error
+    for error in (ValueError(), TypeError(), ParseError('x', ValueError()), BrokenProcessPool(), RetryError()):
+        assert not is_transport_error(error), error
+
+
+def test_transport_errors_retried():
+    fn, calls = failing(ConnectionError(), TransientError(503), asyncio.TimeoutError())
+    assert policy().call(fn) == 'ok'
+    assert len(calls) == 4
+
+
+def test_parse_errors_retried():
+    fn, calls = failing(ParseError('x', ValueError('cut short')))
+    assert policy().call(fn) == 'ok'
+    assert len(calls) == 2
+
+
+def test_every_attempt_failed():
+    fn, calls = failing(*[ConnectionError('down')] * 4)
+    with pytest.raises(RetryError) as e:
+        policy(attempts=4).call(fn, 'conf/x/A20')
+    assert len(calls) == 4
+    assert 'conf/x/A20' in str(e.value)
+
+
+@pytest.mark.parametrize('error', [TypeError("int() argument must be a string, not 'NoneType'"), KeyError('year'),
+                                   ValueError('in a cached answer'), BrokenProcessPool(), RetryError('HTTP 404')])
+def test_other_errors_not_retried(error):
+    fn, calls = failing(error)
+    with pytest.raises(type(error)):
+        policy().call(fn)
+    assert len(calls) == 1
+
+
+def test_call_async():
+    fn, calls = failing(ConnectionError(), ParseError('x', ValueError('cut short')))
+
+    async def afn():
+        return fn()
+    assert asyncio.run(policy().call_async(afn)) == 'ok'
+    assert len(calls) == 3
+
+    fn, calls = failing(*[asyncio.TimeoutError()] * 4)
+    with pytest.raises(RetryError):
+        asyncio.run(policy(attempts=4).call_async(afn, 'conf/x/A20'))
+    assert len(calls) == 4
+
+    fn, calls = failing(KeyError('year'))
+    with pytest.raises(KeyError):
+        asyncio.run(policy().call_async(afn))
+    assert len(calls) == 1
+
+
+def test_breaker():
+    breaker = CircuitBreaker(threshold=3, cooldown=60.0)
+    retry = RetryPolicy(attempts=1, base=0.0, cap=0.0, breaker=breaker)
+    # answers that cannot be parsed do not mean DBLP is down
+    for _ in range(5):
+        retry.failed(0, ParseError('x', ValueError()))
+    assert breaker.wait_time() == 0
+    retry.failed(0, ConnectionError())
+    retry.failed(0, asyncio.TimeoutError())
+    assert breaker.wait_time() == 0
+    breaker.success()
+    retry.failed(0, ConnectionError())
+    retry.failed(0, ConnectionError())
+    assert breaker.wait_time() == 0
+    retry.failed(0, TimeoutError())
+    assert 50 < breaker.wait_time() <= 60
+
+
+def test_breaker_retry_after():
+    breaker = CircuitBreaker(threshold=100)
+    RetryPolicy(breaker=breaker).failed(0, TransientError(429, retry_after=30.0))
+    assert 20 < breaker.wait_time() <= 30
+
+
+def test_delay():
+    retry = RetryPolicy(base=0.5, cap=4.0)
+    for attempt in range(10):
+        assert 0 <= retry.delay(attempt, ConnectionError()) <= min(4.0, 0.5 * 2 ** attempt)
+    assert retry.delay(0, TransientError(429, retry_after=10.0)) == 10.0
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """The shared client of the dblp module, without backoff and with an empty cache; its answers are taken from the
+    `answers` list of the fixture, and the requests it made are appended to its `requests` list."""
+    client = dblp._client
+    monkeypatch.setattr(client, 'retry', policy())
+    monkeypatch.setattr(client, 'cache', dblp.cache.SQLiteCache(str(tmp_path / 'cache.sqlite')))
+    monkeypatch.setattr(client, 'answers', [], raising=False)
+    monkeypatch.setattr(client, 'requests', [], raising=False)
+
+    def download(url, params=None):
+        client.requests.append(url)
+        resp = client.answers.pop(0)
+        if resp.status_code == 200 and resp.content:
+            client.cache.set(url, params, resp)
+        return resp
+    monkeypatch.setattr(dblp, '_get', lambda url, params=None: client.cache.get(url, params) or download(url, params))
+    return client
+
+
+def test_fetch_fresh_answer_cut_short(client, response):
+    hits = b'{"result": {"hits": {"@total": "1", "hit": [{"info": {"key": "conf/x/A20"}}]}}}'
+    client.answers.extend([response(hits[:30]), response(hits)])
+    assert dblp.search_pub_page('conf/x/2020')['@total'] == '1'
+    assert len(client.requests) == 2
+    assert client.cache.get(dblp.DBLP_PUBL_SEARCH_URL, {'q': 'conf/x/2020', 'format': 'json', 'h': 1000, 'f': 0})
+
+
+def test_fetch_cached_answer_not_retried(client, response):
+    params = {'q': 'conf/x/2020', 'format': 'json', 'h': 1000, 'f': 0}
+    client.cache.set(dblp.DBLP_PUBL_SEARCH_URL, params, response(b'{"result": {"hi'))
+    with pytest.raises(ValueError):
+        dblp.search_pub_page('conf/x/2020')
+    assert client.requests == []
+    # dropped from the cache: the next call gets it from DBLP
+    assert client.cache.get(dblp.DBLP_PUBL_SEARCH_URL, params) is None
+
+
+def test_fetch_not_found(client, response):
+    client.answers.append(response(b'', status_code=404))
+    with pytest.raises(RetryError):
+        dblp.search_pub_page('conf/x/2020')
+    assert len(client.requests) == 1
@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+import dblp
+from dblp.retry import CircuitBreaker, RetryError, RetryPolicy
+
+
+@pytest.fixture
+def pages(monkeypatch, response):
+    """A publication search answering `pages.total` hits (its keys are the hit numbers), like the DBLP API: `h` hits
+    from offset `f`, and "@total" on every page. The (f, h) of the requests are listed in `pages.requests`; offsets in
+    `pages.failing` are answered 404."""
+    class Pages(object):
+        total = 0
+        failing = ()
+
+    pages = Pages()
+    pages.requests = []
+    lock = threading.Lock()
+
+    def get(url, params=None):
+        assert url == dblp.DBLP_PUBL_SEARCH_URL
+        first, size = params['f'], params['h']
+        with lock:
+            pages.requests.append((first, size))
+        if first in pages.failing:
+            return response(b'', status_code=404)
+        page = [{'info': {'key': str(i)}} for i in range(first, min(first + size, pages.total))]
+        hits = {'@total': str(pages.total), '@sent': str(len(page)), '@first': str(first)}
+        if page:
+            hits['hit'] = page
+        return response(json.dumps({'result': {'hits': hits}}).encode('utf-8'))
+
+    monkeypatch.setattr(dblp._client, 'retry', RetryPolicy(attempts=1, breaker=CircuitBreaker(threshold=1000)))
+    monkeypatch.setattr(dblp._client, 'cache', None)
+    monkeypatch.setattr(dblp, '_get', get)
+    return pages
+
+
+@pytest.mark.parametrize('total, offsets', [
+    (0, [0]),
+    (7, [0]),
+    (10, [0]),
+    (11, [0, 10]),
+    # the last page is short
+    (35, [0, 10, 20, 30]),
+    (40, [0, 10, 20, 30]),
+])
+def test_search_pub_iter_pages(pages, total, offsets):
+    pages.total = total
+    keys = [info['key'] for info in dblp.search_pub_iter('conf/x/2020', page_size=10, workers=3)]
+    # every hit once, in the order of the API, and no request past the total
+    assert keys == [str(i) for i in range(total)]
+    assert sorted(pages.requests) == [(first, 10) for first in offsets]
+
+
+def test_search_pub_iter_default_page_size(pages):
+    pages.total = 2500
+    assert len(list(dblp.search_pub_iter('conf/x/2020'))) == 2500
+    assert sorted(pages.requests) == [(0, 1000), (1000, 1000), (2000, 1000)]
+
+
+def test_search_pub_iter_page_failed(pages):
+    # a page that cannot be fetched is an error, not a venue-year cut short
+    pages.total = 35
+    pages.failing = (20,)
+    hits = dblp.search_pub_iter('conf/x/2020', page_size=10)
+    with pytest.raises(RetryError):
+        list(hits)
@@ -0,0 +1,62 @@
+import os
+import gzip
+import json
+
+import pytest
+
+
+def ranking(rows):
+    return [{'anchor': 'ranking', 'num': i + 1, 'rank': i + 1, 'author': 'Author {}'.format(i), 'total': rows - i,
+             'recent': i % 3, 'affiliation': 'Université {}'.format(i % 7)} for i in range(rows)]
+
+
+def read(path):
+    """Returns the JSON of a shard, checking that its .gz copy holds the same bytes."""
+    with open(path, mode='rb') as f:
+        data = f.read()
+    with gzip.open(path + '.gz', mode='rb') as f:
+        assert f.read() == data
+    return json.loads(data.decode('utf-8'))
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch, dsn_ranking):
+    monkeypatch.setattr(dsn_ranking, 'RANKING_DIR', str(tmp_path / 'ranking'))
+    monkeypatch.setattr(dsn_ranking, 'RANKING_TOP', 10)
+    monkeypatch.setattr(dsn_ranking, 'RANKING_PAGE_SIZE', 25)
+    return str(tmp_path / 'ranking')
+
+
+def reassemble(directory):
+    """Returns (manifest, top rows, every row of the pages in order), as load.js reads them."""
+    manifest = read(os.path.join(directory, 'manifest.json'))
+    top = read(os.path.join(directory, manifest['top']))
+    rows = []
+    for page in manifest['pages']:
+        rows.extend(read(os.path.join(directory, page)))
+    return manifest, top, rows
+
+
+@pytest.mark.parametrize('rows', [0, 1, 10, 24, 25, 26, 60, 75])
+def test_shards_round_trip(shards, dsn_ranking, rows):
+    data = ranking(rows)
+    dsn_ranking.write_shards(data)
+    manifest, top, pages = reassemble(shards)
+    assert pages == data
+    assert top == data[:10]
+    assert manifest['total'] == rows
+    assert manifest['topSize'] == min(10, rows)
+    assert manifest['pageSize'] == 25
+    assert manifest['pages'] == ['page-{}.json'.format(i) for i in range(-(-rows // 25))]
+    # no temporary file left behind
+    assert not [name for name in os.listdir(shards) if name.endswith('.tmp')]
+
+
+def test_shards_shrink(shards, dsn_ranking):
+    dsn_ranking.write_shards(ranking(80))
+    data = ranking(30)
+    dsn_ranking.write_shards(data)
+    assert reassemble(shards)[2] == data
+    # the pages of the longer ranking are gone, with their .gz copies
+    assert sorted(os.listdir(shards)) == sorted(name + ext for name in ('manifest.json', 'top.json', 'page-0.json',
+                                                                        'page-1.json') for ext in ('', '.gz'))
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+import dblp
+import dblp.filters
+
+
+def hit(venue, i, pid=None):
+    year = venue[-4:]
+    return {'key': '{}/P{}'.format(venue, i), 'title': 'Paper {}.'.format(i), 'venue': 'DSN', 'year': year,
+            'pages': '1-12', 'doi': '10.1109/DSN.{}.{:05d}'.format(year, i),
+            'authors': {'author': {'@pid': pid or '{}/{}'.format(year, i), 'text': 'Author {}'.format(i)}}}
+
+
+@pytest.fixture
+def venues(tmp_path, monkeypatch, dsn_ranking):
+    """The venue-years DBLP answers, by venue; the venue-years fetched from it are listed in `venues.fetched`."""
+    class Venues(dict):
+        pass
+
+    venues = Venues()
+    venues.fetched = []
+
+    def search_pub_iter(venue):
+        venues.fetched.append(venue)
+        return iter(venues.get(venue, []))
+    monkeypatch.setattr(dblp, 'search_pub_iter', search_pub_iter)
+    monkeypatch.setattr(dsn_ranking, 'SNAPSHOT_DIR', str(tmp_path))
+    return venues
+
+
+def test_snapshot_reused(venues, dsn_ranking):
+    venues['conf/dsn/2019'] = [hit('conf/dsn/2019', i) for i in range(3)]
+    first = dsn_ranking.get_venue('conf/dsn/2019', refresh=False)
+    assert len(first['papers']) == 3
+    assert os.path.isfile(dsn_ranking.snapshot_path('conf/dsn/2019'))
+
+    # a later run reads it back instead of asking DBLP, even if DBLP changed meanwhile
+    venues['conf/dsn/2019'] = venues['conf/dsn/2019'][:1]
+    assert dsn_ranking.get_venue('conf/dsn/2019', refresh=False) == first
+    assert venues.fetched == ['conf/dsn/2019']
+
+
+def test_snapshot_refreshed(venues, dsn_ranking, monkeypatch):
+    venues['conf/dsn/2019'] = [hit('conf/dsn/2019', i) for i in range(3)]
+    dsn_ranking.get_venue('conf/dsn/2019', refresh=False)
+    venues['conf/dsn/2019'] = venues['conf/dsn/2019'][:2]
+
+    # --refresh (and the last REFRESH_YEARS years) always go to DBLP, and replace the snapshot
+    assert len(dsn_ranking.get_venue('conf/dsn/2019', refresh=True)['papers']) == 2
+    assert len(dsn_ranking.load_snapshot('conf/dsn/2019')['papers']) == 2
+
+    # so does a snapshot older than SNAPSHOT_TTL
+    venues['conf/dsn/2019'] = venues['conf/dsn/2019'][:1]
+    monkeypatch.setattr(dsn_ranking, 'SNAPSHOT_TTL', -1)
+    assert len(dsn_ranking.get_venue('conf/dsn/2019', refresh=False)['papers']) == 1
+    assert venues.fetched == ['conf/dsn/2019'] * 3
+
+
+def test_empty_answer_not_saved(venues, dsn_ranking):
+    # nothing accepted (here, a workshop DOI) is as good as no answer: it is asked again next time
+    workshop = dict(hit('conf/dsn/2019', 0), doi='10.1109/DSN-W.2019.00001')
+    venues['conf/dsn/2019'] = [workshop]
+    snapshot = dsn_ranking.get_venue('conf/dsn/2019', refresh=False)
+    assert snapshot['papers'] == [] and snapshot['rejected'] == {dblp.filters.REJECTED_DOI: 1}
+    assert dsn_ranking.load_snapshot('conf/dsn/2019') is None
+
+    venues['conf/dsn/2019'] = [hit('conf/dsn/2019', 0)]
+    assert len(dsn_ranking.get_venue('conf/dsn/2019', refresh=False)['papers']) == 1
+    assert venues.fetched == ['conf/dsn/2019'] * 2
+
+
+def test_dump_hits_not_saved(venues, dsn_ranking):
+    # authors of the dump without a person record are keyed by name, which must not leak into the API runs
+    hits = [hit('conf/dsn/2019', 0, pid='Author 0')]
+    snapshot = dsn_ranking.get_venue('conf/dsn/2019', hits, refresh=True)
+    assert snapshot['authors'] == [['Author 0', 'Author 0', 'conf/dsn/2019/P0']]
+    assert dsn_ranking.load_snapshot('conf/dsn/2019') is None
+    assert venues.fetched == []
@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+import dblp
+from dblp import stats
+from dblp.stats import Event, Stats
+
+
+def event(endpoint=stats.RECORD, loader='Publication.load_data', what='conf/x/A20', attempts=1, cached=False,
+          size=100, fetch=0.01, parse=0.001, retry=0.0, error=None):
+    return Event(endpoint, loader, what, attempts, cached, size, fetch, parse, retry, error)
+
+
+@pytest.fixture
+def events():
+    """Every event emitted while the test runs."""
+    events = []
+    stats.add_hook(events.append)
+    yield events
+    stats.remove_hook(events.append)
+
+
+def test_stats_counters():
+    counters = Stats()
+    counters(event())
+    counters(event(cached=True, fetch=0.0))
+    counters(event(attempts=3, retry=1.5, size=200))
+    counters(event(attempts=6, size=0, retry=40.0, error='HTTP 503'))
+    counters(event(endpoint=stats.PERSON, loader='search', what='s/Some', size=5000, fetch=0.3))
+    counters(event(endpoint=stats.PERSON, loader='search', attempts=0, size=0, fetch=0.0, parse=0.0,
+                   error='record conf/x/B has no valid year (None)'))
+
+    summary = counters.summary()
+    record = summary['endpoints'][stats.RECORD]
+    assert {name: record[name] for name in ('calls', 'requests', 'retries', 'failures', 'skipped', 'cached',
+                                            'bytes')} == \
+        {'calls': 4, 'requests': 1 + 0 + 3 + 6, 'retries': 2 + 5, 'failures': 1, 'skipped': 0, 'cached': 1,
+         'bytes': 400}
+    assert record['retry']['total'] == pytest.approx(41.5)
+    assert record['retry']['max'] == 40.0
+    assert sum(record['fetch']['counts']) == 4
+
+    # a record left out of a page is not a call of its own
+    person = summary['endpoints'][stats.PERSON]
+    assert (person['calls'], person['requests'], person['skipped'], person['failures']) == (1, 1, 1, 0)
+    assert summary['loaders'] == {'Publication.load_data': 4, 'search': 1}
+    assert summary['errors'] == {'HTTP 503': 1, 'record conf/x/B has no valid year (None)': 1}
+    # every endpoint is listed, even without calls
+    assert list(summary['endpoints']) == list(stats.ENDPOINTS)
+
+    lines = counters.format().splitlines()
+    assert lines[0].split()[:6] == ['endpoint', 'calls', 'requests', 'retries', 'fail', 'skip']
+    assert lines[1].split()[:7] == ['person', '1', '1', '0', '0', '1', '0']
+    assert lines[2].split()[:7] == ['record', '4', '10', '7', '1', '0', '1']
+    assert '1 x HTTP 503' in lines
+
+    counters.reset()
+    assert counters.summary()['endpoints'][stats.RECORD]['calls'] == 0
+
+
+def test_histogram():
+    histogram = stats.Histogram()
+    for seconds in (0.0005, 0.003, 0.003, 0.003, 0.15, 100):
+        histogram.add(seconds)
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(80) == 0.2
+    assert histogram.percentile(99) is None
+    assert histogram.to_dict()['max'] == 100
+    assert stats.Histogram().percentile(50) == 0.0
+
+
+def test_stats_dump(tmp_path):
+    counters = Stats()
+    counters(event(error='HTTP 404'))
+    path = str(tmp_path / 'stats.json')
+    counters.dump(path)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == json.loads(json.dumps(counters.summary()))
+
+
+def test_trace(tmp_path):
+    path = str(tmp_path / 'trace.jsonl')
+    trace = stats.trace(path)
+    try:
+        stats.emit(event())
+        stats.skipped(stats.PERSON, 'search', 'conf/x/B', 'no year')
+    finally:
+        stats.remove_hook(trace)
+        trace.close()
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [event()._asdict(), event(stats.PERSON, 'search', 'conf/x/B', 0, False, 0, 0.0, 0.0, 0.0,
+                                              'no year')._asdict()]
+
+
+def test_failing_hook(events, capsys):
+    def broken(event):
+        raise IOError('disk full')
+    stats.add_hook(broken)
+    try:
+        stats.emit(event())
+        stats.emit(event())
+    finally:
+        stats.remove_hook(broken)
+    # the other hooks still get every event, and the error is printed once
+    assert len(events) == 2
+    assert stats.hook_errors.pop(broken) == 2
+    assert capsys.readouterr().out.count('disk full') == 1
+
+
+PAGE = (b'<dblpperson name="Some One" pid="1/2" n="2"><person key="homepages/1/2"><author>Some One</author></person>'
+        b'<r><inproceedings key="conf/x/A20"><author>Some One</author><title>A.</title><year>2020</year>'
+        b'</inproceedings></r><r><inproceedings key="conf/x/B"><author>Some One</author><title>B.</title>'
+        b'</inproceedings></r></dblpperson>')
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_skipped_records_reported(events, capsys, workers):
+    # the records left out travel back from the parse pool with the decoded page, and are reported in this process
+    dblp.publication_registry.clear()
+    pool = dblp.start_parse_pool(workers) if workers else None
+    try:
+        author = dblp.full_person_data(dblp.decode(dblp.decode_full_person, PAGE), 'search')
+    finally:
+        if pool is not None:
+            dblp.set_parse_pool(None)
+            pool.shutdown()
+    assert [p.key for p in author.publications] == ['conf/x/A20']
+    assert events == [Event(stats.PERSON, 'search', 'conf/x/B', 0, False, 0, 0.0, 0.0, 0.0,
+                            'record conf/x/B has no valid year (None)')]
+    assert 'ERROR: record conf/x/B has no valid year (None), skipping' in capsys.readouterr().out
+    dblp.publication_registry.clear()